@@ -41,22 +41,26 @@ if os.name == 'nt':
              )
         raise
 
-
 ###########################################################################
 ### Basic Setups
 ## Setup Qt
-def __setup_Qt_backend():  # pylint: disable=invalid-name
+# When in vscode and in debug-mode, may want to comment
+# next line out, "os.environ["QT_API"] = "pyside2""
+os.environ["QT_API"] = "pyside2"
+
+
+def _setup_qt_backend():
     """Setup matplotlib to use Qt5's visualization.
 
+    Called when MetalGUI is first used, see __getattr__, and skipped when
+    QISKIT_METAL_HEADLESS is set.
+
     This function needs to remain in the __init__ of the library's root
     to prevent Qt windows from hanging.
     """
+    if os.getenv('QISKIT_METAL_HEADLESS', None):
+        return
     # pylint: disable=import-outside-toplevel
-
-    # When in vscode and in debug-mode, may want to comment
-    # next line out, "os.environ["QT_API"] = "pyside2""
-    os.environ["QT_API"] = "pyside2"
-
     from PySide2 import QtCore  #, QtWidgets
     from PySide2.QtCore import Qt
 
@@ -104,17 +108,12 @@ def __setup_Qt_backend():  # pylint: disable=invalid-name
             # AA_DontUseNativeMenuBar
             # AA_MacDontSwapCtrlAndMeta
 
-    if not os.getenv('QISKIT_METAL_HEADLESS', None):
-        # pylint: disable=import-outside-toplevel
-        import matplotlib as mpl
-        mpl.use("Qt5Agg")
-        # pylint: disable=redefined-outer-name
-        import matplotlib.pyplot as plt
-        plt.ion()  # interactive
-
+    import matplotlib as mpl
+    mpl.use("Qt5Agg")
+    # pylint: disable=redefined-outer-name
+    import matplotlib.pyplot as plt
+    plt.ion()  # interactive
 
-__setup_Qt_backend()
-del __setup_Qt_backend
 
 ## Setup logging
 from . import config
@@ -140,25 +139,57 @@ from .toolbox_metal.parsing import is_true
 from . import qlibrary
 from . import designs
 from . import draw
-from . import renderers
 from . import qgeometries
-from . import analyses
 from . import toolbox_python
 from . import toolbox_metal
 
-# Metal GUI
-from ._gui.main_window import MetalGUI
-
-# Utility modules
-# For plotting in matplotlib;  May be superseded by a renderer?
-from .renderers.renderer_mpl import mpl_toolbox as plt
-
 # Utility functions
 from .toolbox_python.display import Headings
 
-# Import default renderers
-from .renderers import setup_renderers
-
 # Common-use
 from .qlibrary import QComponent
 from .toolbox_metal.about import about, open_docs
+
+# Imported the first time they are used, see __getattr__.
+# key=attribute, value=(module, name in the module or None for the module)
+_LAZY_ATTRIBUTES = dict(
+    # Metal GUI
+    MetalGUI=('._gui.main_window', 'MetalGUI'),
+    renderers=('.renderers', None),
+    analyses=('.analyses', None),
+    # For plotting in matplotlib;  May be superseded by a renderer?
+    plt=('.renderers.renderer_mpl.mpl_toolbox', None),
+    # Import default renderers
+    setup_renderers=('.renderers', 'setup_renderers'),
+)
+
+
+def __getattr__(name: str):
+    """Import the GUI, renderers and analyses the first time they are used,
+    rather than with qiskit_metal (PEP 562).
+
+    Args:
+        name (str): Name of the attribute
+
+    Returns:
+        object: The module, or the object from the module
+
+    Raises:
+        AttributeError: The attribute does not exist
+    """
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    # pylint: disable=import-outside-toplevel
+    from importlib import import_module
+    if name == 'MetalGUI':
+        _setup_qt_backend()
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = import_module(module_name, __name__)
+    if attribute is not None:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -261,7 +261,7 @@ class QTableModel_Options(QAbstractTableModel):
                             f'; Used ast={used_ast}')
                         data[key] = processed_value
 
-                    self.component.rebuild()
+                    self.component.design.update_component(self.component.name)
                     self.gui.refresh()
 
                 # except and finally restore the value
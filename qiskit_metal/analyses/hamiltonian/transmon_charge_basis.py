@@ -25,6 +25,88 @@ import qutip as qt
 import scipy.linalg as linalg
 import scipy.optimize as opt
 
+__all__ = ['Hcpb', 'cpb_levels', 'cpb_charge_dispersion']
+
+# Number of Hamiltonians diagonalized together by cpb_levels
+_BATCH_SIZE = 256
+
+
+def cpb_levels(Ej, Ec, ng=0.5, nlevels: int = 15, num_levels: int = 3):
+    """Lowest eigenvalues of the Cooper pair box Hamiltonian in the charge
+    basis, for arrays of Ej, Ec and ng at once.
+
+    Same Hamiltonian as Hcpb: diagonal `4 Ec (n - ng)**2`, for the charge
+    states n in [-nlevels, nlevels], and off-diagonal `-Ej / 2`. The
+    Hamiltonian is symmetric in ng, so only the distinct points with ng
+    replaced by abs(ng) are diagonalized.  The tridiagonal Hamiltonians of
+    these points are built together and diagonalized in batches.
+
+    Args:
+        Ej (array_like): Josephson energy of the JJ
+        Ec (array_like): Charging energy of the CPB
+        ng (array_like): Offset charge of the CPB. Defaults to 0.5.
+        nlevels (int): Number of charge states of the CPB [-nlevels, nlevels+1].
+                       Defaults to 15.
+        num_levels (int): Number of eigenvalues returned, from the lowest.
+                          Defaults to 3.
+
+    Returns:
+        np.ndarray: Eigenvalues in ascending order, with the shape of Ej, Ec
+        and ng broadcast together, plus a last axis of length num_levels.
+
+    Example use:
+
+        .. code-block::
+
+            ng = np.linspace(-1, 1, 301)
+            levels = cpb_levels(13971.3, 295.2, ng)
+            f01 = levels[:, 1] - levels[:, 0]
+    """
+    Ej, Ec, ng = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (Ej, Ec, ng)))
+    shape = Ej.shape
+    points = np.stack((Ej.ravel(), Ec.ravel(), np.abs(ng.ravel())), axis=1)
+    inverse = np.arange(len(points))
+    if len(points) > 1:
+        points, inverse = np.unique(points, axis=0, return_inverse=True)
+
+    charge = np.arange(-nlevels, nlevels + 1)
+    dim = len(charge)
+    diag = np.arange(dim)
+    levels = np.empty((len(points), num_levels))
+    for start in range(0, len(points), _BATCH_SIZE):
+        batch = points[start:start + _BATCH_SIZE]
+        ham = np.zeros((len(batch), dim, dim))
+        ham[:, diag, diag] = 4 * batch[:, 1:2] * (charge - batch[:, 2:3])**2
+        ham[:, diag[1:], diag[:-1]] = -batch[:, 0:1] / 2.0
+        # eigvalsh only reads the lower triangle
+        levels[start:start +
+               _BATCH_SIZE] = np.linalg.eigvalsh(ham)[:, :num_levels]
+    return levels[inverse.ravel()].reshape(shape + (num_levels,))
+
+
+def cpb_charge_dispersion(Ej, Ec, nlevels: int = 15, num_levels: int = 2):
+    """Charge dispersion of the lowest levels of the Cooper pair box, for
+    arrays of Ej and Ec at once.
+
+    Args:
+        Ej (array_like): Josephson energy of the JJ
+        Ec (array_like): Charging energy of the CPB
+        nlevels (int): Number of charge states of the CPB [-nlevels, nlevels+1].
+                       Defaults to 15.
+        num_levels (int): Number of levels, from the lowest. Defaults to 2.
+
+    Returns:
+        np.ndarray: `E_k(ng=0.5) - E_k(ng=0)` for each level k, with the shape
+        of Ej and Ec broadcast together, plus a last axis of length
+        num_levels.
+    """
+    levels = cpb_levels(np.expand_dims(Ej, -1),
+                        np.expand_dims(Ec, -1), [0., 0.5],
+                        nlevels=nlevels,
+                        num_levels=num_levels)
+    return levels[..., 1, :] - levels[..., 0, :]
+
 
 class Hcpb:
     """Hamiltonian-model Cooper pair box (Hcpb) class.
@@ -35,9 +117,12 @@ class Hcpb:
 
     As long as nlevels remains fixed the number of charge states
     considered does not change and it does not recreate the arrays,
-    just recomputes the properties
+    just recomputes the properties. The Hamiltonian is only diagonalized
+    when the eigenvalues or eigenvectors are next used.
 
     Returns all properties of interest for the CPB.
+
+    To solve many values of Ej, Ec or ng at once, see cpb_levels.
     """
 
     def __init__(self,
@@ -82,8 +167,8 @@ class Hcpb:
         self._Ej = Ej
         self._Ec = Ec
         self._ng = ng
-        self.evals = None
-        self.evecs = None
+        self._evals = None
+        self._evecs = None
         # Generate the diagonal and offdiagonal components of the Hamiltonian
         self._gen_operators()
         # compute the eigenvectors and eigenvalues of the CPB
@@ -98,14 +183,10 @@ class Hcpb:
         self._off = np.ones(len(self._diag) - 1)
 
     def _calc_H(self):
-        """Only diagonalize the Hamiltonian if the CPB is supplied with the
-        three mandatory parameters Ej, Ec, ng, but allow for them to not be set
-        at initialization."""
-        if (self._Ej is None) or (self._Ec is None) or (self._ng is None):
-            self.evals = None
-            self.evecs = None
-        else:
-            self._diagonalize_H()
+        """Forget the eigenvalues and eigenvectors, after a change of Ej, Ec
+        or ng.  They are recomputed when next used, see evals."""
+        self._evals = None
+        self._evecs = None
 
     def _diagonalize_H(self):
         """Diagonalize the CPB Hamiltonian using symmetric tridiagonal
@@ -113,8 +194,29 @@ class Hcpb:
         ham_diag = 4 * self._Ec * (self._diag - self._ng)**2
         ham_off = -(self._Ej / 2.0) * self._off
         evals, evecs = linalg.eigh_tridiagonal(ham_diag, ham_off)
-        self.evals = np.real(np.array(evals))
-        self.evecs = np.array(evecs)
+        self._evals = np.real(np.array(evals))
+        self._evecs = np.array(evecs)
+
+    @property
+    def evals(self):
+        """Eigenvalues of the CPB Hamiltonian, in ascending order.
+
+        Only diagonalize the Hamiltonian if the CPB is supplied with the
+        three mandatory parameters Ej, Ec, ng, but allow for them to not be set
+        at initialization.  None until then.
+        """
+        if self._evals is None and not ((self._Ej is None) or
+                                        (self._Ec is None) or
+                                        (self._ng is None)):
+            self._diagonalize_H()
+        return self._evals
+
+    @property
+    def evecs(self):
+        """Eigenvectors of the CPB Hamiltonian, as columns.  See evals."""
+        if self.evals is None:
+            return None
+        return self._evecs
 
     def evalue_k(self, k: int):
         """Return the eigenvalue of the Hamiltonian for level k.
@@ -274,10 +376,10 @@ class Hcpb:
             anharm = -anharm
 
         def fun(x):
-            self.Ej = x[0]
-            self.Ec = x[1]
+            # Only the three lowest eigenvalues are needed
+            e_0, e_1, e_2 = cpb_levels(x[0], x[1], self.ng, self.nlevels)
             # the 10 on the anharmonicity allows faster convergnce, see Minev
-            return (self.fij(0, 1) - f01)**2 + 10 * (self.anharm() - anharm)**2
+            return (e_1 - e_0 - f01)**2 + 10 * (e_2 - 2 * e_1 + e_0 - anharm)**2
 
         # Initial guesses from
         # f01 ~ sqrt(8*Ej*Ec) - Ec
@@ -303,10 +405,9 @@ class Hcpb:
         """
 
         def fun(x):
-            self.Ej = x[0]
-            self.Ec = Ec
+            e_0, e_1, e_2 = cpb_levels(x[0], Ec, self.ng, self.nlevels)
             # the 15 on the anharmonicity allows faster convergnce, see Minev
-            return (self.fij(0, 1) - f01)**2 + 15 * (self.anharm() - Ec)**2
+            return (e_1 - e_0 - f01)**2 + 15 * (e_2 - 2 * e_1 + e_0 - Ec)**2
 
         x0 = [(f01 - Ec)**2 / (8 * (Ec))]
         # can converge slowly if cost function not set up well, or alpha<<freq
@@ -33,6 +33,7 @@ from pint import UnitRegistry
 
 from pyEPR.calcs.convert import Convert
 from .constants import (e, h, hbar, phinot, phi0)
+from ..hamiltonian.transmon_charge_basis import cpb_levels
 
 __all__ = [
     'Ic_from_Lj', 'Ic_from_Ej', 'Cs_from_Ec', 'transmon_props', 'chi',
@@ -437,44 +438,21 @@ def levels_vs_ng_real_units(Cq, IC, N=301, do_disp=0, do_plots=0):
         tuple: fqubitGHz, anharMHz, disp, tphi_ms
 
     Raises:
-        ValueError: If the matrix is not Hermitian
+        ValueError: If N is negative
     """
     C = Cq * 1e-15
     IC = IC * 1e-9
     Ec = e**2 / 2 / C
 
     nmax = 40
-    dim = 2 * nmax + 1
-    nmat = np.zeros([dim, dim])
-    V = nmat
     charge = np.linspace(-1., 1., N)
 
-    # KE
-    for ii in range(dim):
-        nmat[ii, ii] = ii - nmax
-
-    # PE
-    V = np.diag(-0.5 * np.ones([dim - 1]), 1)
-    V = (V + np.transpose(np.conj(V)))
-
     varphi = hbar / 2 / e
     EJ = IC * varphi
 
-    elvls = np.zeros([dim, N])
-
-    for iindex in range(N):
-        ng = charge[iindex]
-
-        H = 4 * Ec * (nmat - ng * np.eye(dim))**2 + EJ * V
-
-        if (not np.array_equal(H, np.transpose(np.conj(H)))):
-            raise ValueError('Matrix is not Hermitian')
-
-        [d, v] = np.linalg.eig(H)
-        sortIX = np.argsort(d)
-        sorted_d = d[sortIX]
-
-        elvls[:, iindex] = (sorted_d - sorted_d[0])
+    # Levels 0 to 3 at every charge, solved together and in units of Ec
+    levels = cpb_levels(EJ / Ec, 1., charge, nlevels=nmax, num_levels=4) * Ec
+    elvls = (levels - levels[:, :1]).T
 
     if do_plots:
 
@@ -75,6 +75,7 @@ InterfaceComponents
     :toctree: ../stubs/
 
     Components
+    Renderers
 """
 
 from .. import Dict
@@ -85,3 +86,4 @@ from .design_multiplanar import MultiPlanar
 from .design_flipchip import DesignFlipChip
 from .net_info import QNet
 from .interface_components import Components
+from .interface_renderers import Renderers
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2017, 2021.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+"""Run the make of components in worker processes, for QDesign.rebuild.
+
+Each worker holds a copy of the design without components or renderers:
+its variables, chips, metadata and template options. A worker recreates
+the components it is sent, runs their make, and returns the calls to
+add_qgeometry and add_pin made by make. The design then repeats these
+calls, in its own process and order, when it rebuilds the components.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from typing import TYPE_CHECKING, Dict as Dict_, Iterable, List, Union
+
+from qiskit_metal import logger
+from qiskit_metal.toolbox_metal.import_export import _import_class
+from qiskit_metal.toolbox_python.utility_functions import to_hashable
+
+if TYPE_CHECKING:
+    # For linting, avoids circular imports.
+    from qiskit_metal.designs.design_base import QDesign
+
+# Copy of the design, in a worker process. See _init_worker.
+_worker_design = None
+
+
+def _init_worker(state: dict):
+    """Create the copy of the design in a worker process.
+
+    Args:
+        state (dict): From _get_design_state()
+    """
+    # pylint: disable=global-statement, protected-access
+    global _worker_design
+    design = _import_class(state['class_name'])(enable_renderers=False)
+    design._metadata = state['metadata']
+    design._variables = state['variables']
+    design._chips = state['chips']
+    design._template_options = state['template_options']
+    _worker_design = design
+
+
+def _get_design_state(design: 'QDesign') -> dict:
+    """What a worker needs to make components like the design would.
+
+    Args:
+        design (QDesign): The design
+
+    Returns:
+        dict: Passed to _init_worker()
+    """
+    # pylint: disable=protected-access
+    return dict(class_name=f'{design.__class__.__module__}.'
+                f'{design.__class__.__name__}',
+                metadata=design._metadata,
+                variables=design._variables,
+                chips=design._chips,
+                template_options=design._template_options)
+
+
+def _make_components(specs: List[tuple]) -> List[Union[list, None]]:
+    """Make components in a worker process.
+
+    Args:
+        specs (List[tuple]): For each component, its class name, name,
+            options and the other arguments of its init.
+
+    Returns:
+        List[Union[list, None]]: For each component, the calls made by its
+        make, or None if make failed or changed the options.
+    """
+    # pylint: disable=protected-access
+    design = _worker_design
+    records = []
+    for class_name, name, options, kwargs in specs:
+        try:
+            component = _import_class(class_name)(design,
+                                                  name,
+                                                  options=deepcopy(options),
+                                                  make=False,
+                                                  **kwargs)
+            component.options = options
+            before = to_hashable(options)
+            component._make_record = []
+            component.make()
+            record = component._make_record
+            component._make_record = None
+            records.append(record if to_hashable(component.options) ==
+                           before else None)
+        except Exception:  # pylint: disable=broad-except
+            # The design remakes the component, and reports the issue.
+            records.append(None)
+    design.delete_all_components()
+    return records
+
+
+def make_in_processes(design: 'QDesign', component_ids: Iterable[int],
+                      processes: int) -> Dict_[int, list]:
+    """Run the make of components in worker processes.
+
+    Args:
+        design (QDesign): The design
+        component_ids (Iterable[int]): Ids of the components to make. They
+            must not depend on other components.
+        processes (int): Number of worker processes
+
+    Returns:
+        Dict_[int, list]: key=component id, value=calls made by its make.
+        Components which could not be made in a worker are left out.
+    """
+    # pylint: disable=protected-access
+    component_ids = list(component_ids)
+    specs = []
+    for comp_id in component_ids:
+        component = design._components[comp_id]
+        kwargs = dict()
+        if hasattr(component, 'type'):
+            # Route type, passed to the init of QRoute
+            kwargs['type'] = component.type
+        specs.append(
+            (component.class_name, component.name, component.options, kwargs))
+    if not specs:
+        return dict()
+
+    # A few chunks per worker, to balance the load
+    size = -(-len(specs) // (4 * processes))
+    chunks = [specs[n:n + size] for n in range(0, len(specs), size)]
+    try:
+        with ProcessPoolExecutor(processes,
+                                 initializer=_init_worker,
+                                 initargs=(_get_design_state(design),)) as pool:
+            records = [
+                record for chunk in pool.map(_make_components, chunks)
+                for record in chunk
+            ]
+    except Exception as error:  # pylint: disable=broad-except
+        logger.warning('Could not make the components in worker processes, '
+                       f'they are made one at a time: {error}')
+        return dict()
+
+    return {
+        comp_id: record
+        for comp_id, record in zip(component_ids, records)
+        if record is not None
+    }
@@ -13,9 +13,11 @@
 # that they have been altered from the originals.
 """The base class of all QDesigns in Qiskit Metal."""
 
+import heapq
 import importlib
 #import inspect
 #import os
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Any, Dict as Dict_, Iterable, List, TYPE_CHECKING, Union
 
@@ -24,13 +26,16 @@ import pandas as pd
 from qiskit_metal.qgeometries.qgeometries_handler import QGeometryTables
 from qiskit_metal.toolbox_metal.parsing import is_true, parse_options, parse_value
 from qiskit_metal.designs.interface_components import Components
+from qiskit_metal.designs.interface_renderers import Renderers
 from qiskit_metal.designs.net_info import QNet
+from qiskit_metal.renderers.renderer_metadata import renderers_metadata
 from qiskit_metal import Dict, config, logger
 from qiskit_metal.config import DefaultMetalOptions, DefaultOptionsRenderer
 from qiskit_metal.toolbox_metal.exceptions import QiskitMetalDesignError
 
 if not config.is_building_docs():
     from qiskit_metal.toolbox_metal.import_export import load_metal_design, save_metal
+    from qiskit_metal.designs._parallel_build import make_in_processes
     from qiskit_metal.toolbox_python._logging import LogStore
 
 if TYPE_CHECKING:
@@ -112,6 +117,24 @@ class QDesign():
         # Cache for component ids.  Hold the reverse of _components dict,
         self.name_to_id = Dict()
 
+        # Explicit dependencies added by add_dependency().
+        # i.e. key=id of parent and value=set of ids of children.
+        # Dependencies through pins are read from the components and net_info.
+        self._dependencies = Dict()
+
+        # Nesting depth of batch(), and the ids of the components whose build
+        # is deferred until the outermost batch() exits.
+        self._batch_depth = 0
+        self._batch_pending = dict()
+
+        # Geometry and pins made by components, reused by identical
+        # components at other positions. See QComponent.reuse_geometry.
+        self._geometry_cache = dict()
+
+        # Calls of make recorded in worker processes by rebuild, consumed by
+        # QComponent.rebuild. i.e. key=id and value=list of calls.
+        self._made_in_workers = dict()
+
         self._variables = Dict()
         self._chips = Dict()
 
@@ -146,8 +169,8 @@ class QDesign():
         # junction, poly etc.
         self.renderer_defaults_by_table = Dict()
 
-        # Instantiate and register renderers to Qdesign.renderers
-        self._renderers = Dict()
+        # Register renderers to Qdesign.renderers, instantiated when first used
+        self._renderers = Renderers(self)
         if enable_renderers:
             self._start_renderers()
 
@@ -201,8 +224,11 @@ class QDesign():
         return self._template_options
 
     @property
-    def renderers(self) -> Dict:
-        """Return a Dict of all the renderers registered within QDesign."""
+    def renderers(self) -> Renderers:
+        """Return a Dict of all the renderers registered within QDesign.
+
+        Each renderer is instantiated the first time it is looked up.
+        """
 
         return self._renderers
 
@@ -417,6 +443,19 @@ class QDesign():
         Returns:
             Set: Set of net IDs removed
         """
+        # Pins of other components, on the nets to remove, are no longer
+        # connected either.
+        df_net_info = self._qnet._net_info
+        nets_of_comp = df_net_info.loc[df_net_info['component_id'] == comp_id,
+                                       'net_id']
+        df_other_pins = df_net_info[df_net_info['net_id'].isin(nets_of_comp) &
+                                    (df_net_info['component_id'] != comp_id)]
+        for other_id, pin_name in zip(df_other_pins['component_id'],
+                                      df_other_pins['pin_name']):
+            if other_id in self._components and pin_name in self._components[
+                    other_id].pins:
+                self._components[other_id].pins[pin_name].net_id = 0
+
         all_net_id_removed = self._qnet.delete_all_pins_for_component(comp_id)
 
         # reset all pins to be 0 (zero),
@@ -437,6 +476,7 @@ class QDesign():
         self.delete_all_pins()
         self.name_to_id.clear()
         self._components.clear()
+        self._dependencies.clear()
 
         self._qgeometry.clear_all_tables()
 
@@ -463,10 +503,173 @@ class QDesign():
 
         return self._qcomponent_latest_name_id[prefix]
 
-    def rebuild(self):  # remake_all_components
-        """Remakes all components with their current parameters."""
-        for _, obj in self._components.items():  # pylint: disable=unused-variable
-            obj.rebuild()
+    def rebuild(self,
+                force: bool = False,
+                processes: int = 1):  # remake_all_components
+        """Remakes all components with their current parameters.
+
+        Components are remade in dependency order, see
+        `get_dependency_graph`, so that, for example, a route is
+        remade after the qubits it is connected to. Components whose
+        options, and other inputs, are unchanged since their last build
+        are skipped, unless force is True.
+
+        With more than one process, the make of the components which do not
+        depend on any other, such as qubits and launch pads, first runs in
+        that many worker processes. Their QGeometry and pins are then added to
+        the design in the same order, and with the same result, as without
+        workers. The components depending on others are made afterwards, in
+        this process.
+
+        Args:
+            force (bool): Remake every component.  Defaults to False.
+            processes (int): Number of worker processes, such as
+                os.cpu_count().  Defaults to 1, which makes every component
+                in this process.
+        """
+        graph = self.get_dependency_graph()
+        order = self._order_for_rebuild(self._components.keys(), graph)
+        if processes > 1:
+            self._made_in_workers = make_in_processes(
+                self, self._get_independent_to_make(order, graph, force),
+                processes)
+        try:
+            for comp_id in order:
+                self._components[comp_id].rebuild(force=force)
+        finally:
+            self._made_in_workers = dict()
+
+    def _get_independent_to_make(self, order: List[int], graph: Dict_[int, set],
+                                 force: bool) -> List[int]:
+        """Components which rebuild would make, and which depend on no other
+        component, see `get_dependency_graph`.
+
+        Components taking their geometry from an identical component, see
+        QComponent.reuse_geometry, are left out, but for the first of them.
+
+        Args:
+            order (List[int]): Ids of the components, from _order_for_rebuild
+            graph (Dict_[int, set]): Graph from `get_dependency_graph`
+            force (bool): Passed to rebuild
+
+        Returns:
+            List[int]: Ids of the components
+        """
+        # pylint: disable=protected-access
+        children = set().union(*graph.values())
+        cache_keys = set(self._geometry_cache)
+        independent = []
+        for comp_id in order:
+            component = self._components[comp_id]
+            if comp_id in children or component.make_uses_design_state:
+                continue
+            fingerprint = component._get_build_fingerprint()
+            if not force and component._is_build_current(fingerprint):
+                continue
+            cache_key, _ = component._get_geometry_cache_key(fingerprint)
+            if cache_key is not None and not force:
+                if cache_key in cache_keys:
+                    continue
+                cache_keys.add(cache_key)
+            independent.append(comp_id)
+        return independent
+
+    @contextmanager
+    def batch(self):
+        """Context manager to add many components at once.
+
+        Components created within the block are added to the design, but
+        are not built.  When the outermost block exits, they are all built
+        in dependency order, see `get_dependency_graph`, and the QGeometry
+        they add is committed to the tables once, rather than once per
+        component.  Blocks can be nested.
+
+        The pins given in `options.pin_inputs` may belong to components
+        created earlier in the same block; they are checked at exit.  A
+        component whose pin_inputs are found to be invalid at exit is
+        removed from the design, with a warning.
+
+        If the block raises, the components created within it are removed
+        from the design without being built, and the exception is raised.
+
+        Example:
+            .. code-block:: python
+
+                with design.batch():
+                    for i in range(100):
+                        TransmonPocket(design, f'Q{i}', options=dict(pos_x=f'{i}mm'))
+
+        Yields:
+            QDesign: The design
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._discard_batch()
+            raise
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self._build_batch()
+
+    def _defer_build(self, component: 'QComponent') -> bool:
+        """Defer the build of a new component to the exit of `batch`.
+
+        Args:
+            component (QComponent): Component which was just added.
+
+        Returns:
+            bool: True if a batch is open and the build was deferred.
+        """
+        if self._batch_depth == 0:
+            return False
+        self._batch_pending[component.id] = None
+        return True
+
+    def _is_build_deferred(self, component_id: int) -> bool:
+        """Whether the build of a component waits for the exit of `batch`.
+
+        Args:
+            component_id (int): ID of the component
+
+        Returns:
+            bool: True if the component has not been built yet.
+        """
+        return component_id in self._batch_pending
+
+    def _build_batch(self):
+        """Build the components deferred by `batch`, parents first, then
+        commit their QGeometry to the tables."""
+        pending = [
+            comp_id for comp_id in self._batch_pending
+            if comp_id in self._components
+        ]
+        order = self._order_for_rebuild(pending)
+        self._batch_pending = dict()
+        for comp_id in order:
+            comp = self._components[comp_id]
+            if comp._check_pin_inputs():  # pylint: disable=protected-access
+                self.logger.warning(comp._error_message)  # pylint: disable=protected-access
+                self._delete_component(comp_id)
+                comp.status = 'Not Built'
+                continue
+            comp.rebuild()
+        self._qgeometry.flush()
+
+    def _discard_batch(self):
+        """Remove the components deferred by `batch` from the design,
+        without building them."""
+        pending = [
+            comp_id for comp_id in self._batch_pending
+            if comp_id in self._components
+        ]
+        self._batch_pending = dict()
+        for comp_id in pending:
+            comp = self._components[comp_id]
+            self._delete_component(comp_id)
+            comp.status = 'Not Built'
 
     def rename_component(self, component_id: int, new_component_name: str):
         """Rename component.  The component_id is expected.  However, if user
@@ -623,6 +826,11 @@ class QDesign():
 
             # remove from design dict of components
             self._components.pop(component_id, None)
+
+            # remove explicit dependencies of, and on, the component
+            self._dependencies.pop(component_id, None)
+            for children in self._dependencies.values():
+                children.discard(component_id)
         else:
             # if not in components dict
             logger.warning(
@@ -669,14 +877,17 @@ class QDesign():
         if num_options > 0 and num_options != length:
             return copied_info
 
-        for index, item in enumerate(original_qcomponents):
-            if num_options > 0:
-                a_copy = self.copy_qcomponent(item, new_component_names[index],
-                                              all_options_superimpose[index])
-            else:
-                a_copy = self.copy_qcomponent(item, new_component_names[index])
+        with self.batch():
+            for index, item in enumerate(original_qcomponents):
+                if num_options > 0:
+                    a_copy = self.copy_qcomponent(
+                        item, new_component_names[index],
+                        all_options_superimpose[index])
+                else:
+                    a_copy = self.copy_qcomponent(item,
+                                                  new_component_names[index])
 
-            copied_info[new_component_names[index]] = a_copy
+                copied_info[new_component_names[index]] = a_copy
 
         return copied_info
 
@@ -722,18 +933,21 @@ class QDesign():
 #########I/O###############################################################
 
     @classmethod
-    def load_design(cls, path: str):
+    def load_design(cls, path: str, geometry: str = 'load'):
         """Load a Metal design from a saved Metal file. Will also update
         default dictionaries. (Class method).
 
         Args:
             path (str): Path to saved Metal design.
+            geometry (str): 'load' to read the qgeometry tables, 'lazy' to
+                only read each table when it is first used, or 'rebuild' to
+                remake the components from their options.  Defaults to 'load'.
 
         Returns:
             QDesign: Loaded metal design.
         """
         logger.warning("Loading is a beta feature.")
-        design = load_metal_design(path)
+        design = load_metal_design(path, geometry=geometry)
         return design
 
     def save_design(self, path: str = None):
@@ -862,32 +1076,223 @@ class QDesign():
 ####################################################################################
 # Dependencies
 
+    def _get_component_id(self, component: Union[int, str]) -> int:
+        """Return the id of a component given either its id or its name.
+
+        Args:
+            component (Union[int, str]): Id or name of the component.
+
+        Returns:
+            int: Id of the component, or None if it is not in the design.
+        """
+        if isinstance(component, str):
+            return self.name_to_id.get(component, None)
+        if component in self._components:
+            return component
+        return None
+
     def add_dependency(self, parent: str, child: str):
         """Add a dependency between one component and another.
 
+        Dependencies through pins, such as a route connected to a qubit,
+        do not need to be added; they are found by `get_dependency_graph`.
+
         Args:
             parent (str): The component on which the child depends.
             child (str): The child cannot live without the parent.
         """
+        parent_id = self._get_component_id(parent)
+        child_id = self._get_component_id(child)
+        if parent_id is None or child_id is None:
+            self.logger.warning(
+                f'Called add_dependency, parent={parent}, child={child}, '
+                'but both need to be in design.components.')
+            return
+        if parent_id == child_id:
+            self.logger.warning(
+                f'Called add_dependency, but component {parent} cannot '
+                'depend on itself.')
+            return
+        self._dependencies.setdefault(parent_id, set()).add(child_id)
 
     def remove_dependency(self, parent: str, child: str):
         """Remove a dependency between one component and another.
 
+        Only dependencies added with `add_dependency` can be removed.
+
         Args:
             parent (str): The component on which the child depends.
             child (str): The child cannot live without the parent.
         """
+        parent_id = self._get_component_id(parent)
+        child_id = self._get_component_id(child)
+        if parent_id in self._dependencies:
+            self._dependencies[parent_id].discard(child_id)
+            if not self._dependencies[parent_id]:
+                self._dependencies.pop(parent_id)
+
+    def get_dependency_graph(self) -> Dict_[int, set]:
+        """Return the dependency graph of the components within the design.
+
+        A child depends on a parent when:
+            * the child lists the parent in its `options.pin_inputs`, such as
+              a route and the qubits it attaches to,
+            * the two are connected in net_info; the parent is the component
+              which was passed first to `connect_pins`,
+            * or the dependency was added with `add_dependency`.
+
+        Returns:
+            Dict_[int, set]: key=id of parent, value=set of ids of its children.
+            Every component in the design is a key.
+        """
+        graph = {comp_id: set() for comp_id in self._components}
+
+        def add_edge(parent_id, child_id):
+            if parent_id in graph and child_id in graph and parent_id != child_id:
+                graph[parent_id].add(child_id)
+
+        for parent_id, children in self._dependencies.items():
+            for child_id in children:
+                add_edge(parent_id, child_id)
+
+        for child_id, comp in self._components.items():
+            pin_inputs = comp.options.get('pin_inputs', None)
+            if not pin_inputs:
+                continue
+            for pin_check in pin_inputs.values():
+                if isinstance(pin_check, dict) and 'component' in pin_check:
+                    add_edge(self._get_component_id(pin_check['component']),
+                             child_id)
+
+        # Each net holds two rows, the first row being the parent.
+        # pylint: disable=protected-access
+        first_of_net = dict()
+        for net_id, comp_id in zip(self._qnet._net_info['net_id'],
+                                   self._qnet._net_info['component_id']):
+            if net_id in first_of_net:
+                add_edge(first_of_net[net_id], comp_id)
+            else:
+                first_of_net[net_id] = comp_id
+
+        return graph
+
+    def get_dependents(self,
+                       component_name: str,
+                       graph: Dict_[int, set] = None) -> set:
+        """Return the ids of all the components which depend, directly or
+        transitively, on a component.
+
+        Args:
+            component_name (str): Name, or id, of the component.
+            graph (Dict_[int, set]): Graph from `get_dependency_graph`.
+                Defaults to None, in which case it is computed.
+
+        Returns:
+            set: Ids of the dependents; does not include the component itself.
+        """
+        if graph is None:
+            graph = self.get_dependency_graph()
+        comp_id = self._get_component_id(component_name)
+        dependents = set()
+        stack = [comp_id]
+        while stack:
+            for child_id in graph.get(stack.pop(), ()):
+                if child_id not in dependents:
+                    dependents.add(child_id)
+                    stack.append(child_id)
+        dependents.discard(comp_id)
+        return dependents
+
+    def _order_for_rebuild(self,
+                           component_ids: Iterable[int],
+                           graph: Dict_[int, set] = None) -> List[int]:
+        """Sort component ids so that every parent comes before its children.
+
+        Ties are broken by the order in which the components were added to
+        the design. Components in a dependency cycle are appended in that
+        same order, with a warning.
+
+        Args:
+            component_ids (Iterable[int]): Ids of the components to sort.
+            graph (Dict_[int, set]): Graph from `get_dependency_graph`.
+                Defaults to None, in which case it is computed.
 
-    def update_component(self, component_name: str, dependencies: bool = True):
+        Returns:
+            List[int]: The sorted ids.
+        """
+        if graph is None:
+            graph = self.get_dependency_graph()
+        position = {comp_id: n for n, comp_id in enumerate(self._components)}
+        subset = set(component_ids)
+
+        num_parents = {comp_id: 0 for comp_id in subset}
+        for parent_id in subset:
+            for child_id in graph.get(parent_id, ()):
+                if child_id in subset:
+                    num_parents[child_id] += 1
+
+        ready = [(position[comp_id], comp_id)
+                 for comp_id, count in num_parents.items()
+                 if count == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, parent_id = heapq.heappop(ready)
+            order.append(parent_id)
+            for child_id in graph.get(parent_id, ()):
+                if child_id in subset:
+                    num_parents[child_id] -= 1
+                    if num_parents[child_id] == 0:
+                        heapq.heappush(ready, (position[child_id], child_id))
+
+        if len(order) < len(subset):
+            in_cycle = sorted(subset.difference(order), key=position.get)
+            self.logger.warning(
+                'The dependencies between components '
+                f'{[self._components[comp_id].name for comp_id in in_cycle]} '
+                'form a cycle. They are rebuilt in the order they were added.')
+            order.extend(in_cycle)
+
+        return order
+
+    def update_component(self,
+                         component_name: str,
+                         dependencies: bool = True) -> List[str]:
         """Update the component and any dependencies it may have. Mediator type
         function to update all children.
 
+        Only the component and the components that depend on it, directly or
+        transitively, are rebuilt; parents before children. All other
+        components in the design are left untouched.
+
         Args:
             component_name (str): Component name to update
             dependencies (bool): True to update all dependencies.  Defaults to True.
+
+        Returns:
+            List[str]: Names of the components which were rebuilt, in order.
+            Components found to be unchanged are not rebuilt.
         """
-        # Get dependency graph
+        comp_id = self._get_component_id(component_name)
+        if comp_id is None:
+            self.logger.warning(
+                f'Called update_component, component_name={component_name}, '
+                'but component_name is not in design.components dictionary.')
+            return []
+
+        # Get dependency graph, before rebuilding, since a rebuild removes
+        # the pins of the component from net_info.
+        graph = self.get_dependency_graph()
+        to_update = {comp_id}
+        if dependencies:
+            to_update.update(self.get_dependents(comp_id, graph))
+
         # Remake components in order
+        rebuilt = []
+        for an_id in self._order_for_rebuild(to_update, graph):
+            if self._components[an_id].rebuild():
+                rebuilt.append(self._components[an_id].name)
+        return rebuilt
 
 
 ######### Renderers ###############################################################
@@ -898,6 +1303,12 @@ class QDesign():
         First import the renderers identified in
         config.renderers_to_load. Then register them into QDesign.
         Finally populate self.renderer_defaults_by_table
+
+        The renderers are not imported or instantiated here. Their columns
+        of the QGeometry tables, and their default values, are added from
+        renderers.renderer_metadata, or from the class attributes of the
+        renderers not listed there. Each renderer is instantiated the first
+        time it is looked up in self.renderers.
         """
 
         for renderer_key, import_info in config.renderers_to_load.items():
@@ -919,17 +1330,20 @@ class QDesign():
                 )
                 continue
 
+            metadata = renderers_metadata.get(f'{path_name}.{class_name}')
+            if metadata is not None:
+                # Not imported until the renderer is first used
+                renderer_name = metadata['name']
+                element_table_data = metadata['element_table_data']
             # check if module_name exists
-            if importlib.util.find_spec(path_name):
+            elif importlib.util.find_spec(path_name):
                 class_renderer = getattr(importlib.import_module(path_name),
                                          class_name, None)
 
                 # check if class_name is in module
                 if class_renderer is not None:
-                    a_renderer = class_renderer(self, initiate=False)
-
-                    # register renderers here.
-                    self._renderers[renderer_key] = a_renderer
+                    renderer_name = class_renderer.name
+                    element_table_data = class_renderer.element_table_data
                 else:
                     self.logger.warning(
                         f'Renderer={renderer_key} is not registered in QDesign.  '
@@ -941,8 +1355,24 @@ class QDesign():
                     f'The module_name={path_name} was not found.')
                 continue
 
-        for _, a_render in self._renderers.items():
-            a_render.add_table_data_to_QDesign(a_render.name)
+            # Add the columns of the renderer to QGeometry tables,
+            # as QRenderer.load() would.
+            if element_table_data:
+                QGeometryTables.add_renderer_extension(
+                    renderer_name, {
+                        table: {
+                            col_name: type(col_value)
+                            for col_name, col_value in a_dict.items()
+                        } for table, a_dict in element_table_data.items()
+                    })
+
+            # register renderers here.
+            self._renderers.register(renderer_key, path_name, class_name)
+
+            for table, a_dict in element_table_data.items():
+                for col_name, col_value in a_dict.items():
+                    self.add_default_data_for_qgeometry_tables(
+                        table, renderer_name, col_name, col_value)
 
     def add_default_data_for_qgeometry_tables(self, table_name: str,
                                               renderer_name: str,
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2017, 2021.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+"""Module containing the Dict of the renderers of a design."""
+
+import importlib
+from typing import TYPE_CHECKING
+
+from qiskit_metal import Dict
+
+if TYPE_CHECKING:
+    # For linting, avoids circular imports.
+    from qiskit_metal.designs.design_base import QDesign
+
+
+class Renderers(Dict):
+    """The Dict of design.renderers.
+
+    The renderers are registered by the module and name of their class.
+    Each renderer is only imported and instantiated the first time it is
+    looked up, such as with design.renderers['gds'] or design.renderers.gds.
+    Listing the renderers, with keys(), values(), items() or by iteration,
+    instantiates all of them.
+    """
+
+    def __init__(self, design: 'QDesign' = None):
+        """
+        Args:
+            design (QDesign): The design the renderers are created for.
+                Defaults to None.
+        """
+        super().__init__()
+        # Set as attributes rather than keys of the Dict
+        object.__setattr__(self, '_design', design)
+        object.__setattr__(self, '_classes', dict())
+
+    def register(self, name: str, path_name: str, class_name: str):
+        """Register a renderer class, to be imported and instantiated when
+        first used.
+
+        Args:
+            name (str): Key of the renderer, such as 'gds'
+            path_name (str): Module of the renderer class
+            class_name (str): Name of the renderer class in the module
+        """
+        self.pop(name, None)
+        self._classes[name] = (path_name, class_name)
+
+    def is_instantiated(self, name: str) -> bool:
+        """Is the renderer instantiated.
+
+        Args:
+            name (str): Key of the renderer
+
+        Returns:
+            bool: True if the renderer has been instantiated
+        """
+        return super().__contains__(name)
+
+    def __missing__(self, name):
+        if name not in self._classes:
+            # Same as Dict, an empty Dict
+            return Dict(__parent=self, __key=name)
+        path_name, class_name = self._classes[name]
+        renderer_class = getattr(importlib.import_module(path_name), class_name)
+        renderer = renderer_class(self._design, initiate=False)
+        del self._classes[name]
+        self[name] = renderer
+        return renderer
+
+    def _instantiate_all(self):
+        for name in list(self._classes):
+            self[name]  # pylint: disable=pointless-statement
+
+    def __contains__(self, name) -> bool:
+        return name in self._classes or super().__contains__(name)
+
+    def get(self, name, default=None):
+        if name in self._classes:
+            return self[name]
+        return super().get(name, default)
+
+    def __iter__(self):
+        self._instantiate_all()
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        return len(self._classes) + super().__len__()
+
+    def keys(self):
+        self._instantiate_all()
+        return super().keys()
+
+    def values(self):
+        self._instantiate_all()
+        return super().values()
+
+    def items(self):
+        self._instantiate_all()
+        return super().items()
@@ -113,17 +113,15 @@ class QNet():
             return 0
 
         # Confirm the component-pin combination is NOT in _net_info, before adding them.
-        for (net_identity, component_id,
-             pin_name) in self._net_info.itertuples(index=False):
-            if ((component_id == comp1_id) and (pin_name == pin1_name)):
-                self.logger.warning(
-                    f'Component: {comp1_id} and pin: {pin1_name} are '
-                    f'already in net_info with net_id {net_identity}')
-                return 0
-            if ((component_id == comp2_id) and (pin_name == pin2_name)):
+        net_ids = self._net_info['net_id'].to_numpy()
+        component_ids = self._net_info['component_id'].to_numpy()
+        pin_names = self._net_info['pin_name'].to_numpy()
+        for comp_id, pin_name in ((comp1_id, pin1_name), (comp2_id, pin2_name)):
+            in_use = (component_ids == comp_id) & (pin_names == pin_name)
+            if in_use.any():
                 self.logger.warning(
-                    f'Component: {comp2_id} and pin: {pin2_name} are '
-                    f'already in net_info with net_id {net_identity}')
+                    f'Component: {comp_id} and pin: {pin_name} are '
+                    f'already in net_info with net_id {net_ids[in_use][0]}')
                 return 0
 
         net_id = self._get_new_net_id()
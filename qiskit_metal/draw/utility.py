@@ -22,7 +22,6 @@ from typing import List, Tuple, Union
 
 import numpy as np
 import shapely
-import shapely.wkt
 from numpy import array
 from numpy.linalg import norm
 from shapely.geometry import MultiPolygon, Polygon
@@ -177,11 +176,39 @@ def round_coordinate_sequence(geom_ref, precision):
     Returns:
         shapely.geometry : A shapely geometry with rounded coordinates
     """
+    return round_coordinates([geom_ref], precision)[0]
 
-    new_geom_ref = shapely.wkt.loads(
-        shapely.wkt.dumps(geom_ref, rounding_precision=precision))
 
-    return new_geom_ref
+def round_coordinates(geometries: Iterable, precision: int) -> np.ndarray:
+    """Rounds the vertices of shapely geometries of any kind, including the
+    interiors of polygons, with a single pass over all their coordinates.
+
+    Each coordinate is rounded to the nearest multiple of 10**-precision, the
+    same as python's round(), or a round trip through WKT text with
+    rounding_precision.  numpy.round is used, except for the few coordinates
+    close to a tie, where it can differ.
+
+    Args:
+        geometries (Iterable) : Shapely geometries
+        precision (int) : The decimal precision to round to (eg. 3 -> 0.001)
+
+    Returns:
+        np.ndarray: The shapely geometries with rounded coordinates
+    """
+    precision = int(precision)
+
+    def round_array(coords: np.ndarray) -> np.ndarray:
+        rounded = np.round(coords, precision)
+        scaled = np.abs(coords) * 10.0**precision
+        near_tie = np.abs(scaled - np.floor(scaled) -
+                          0.5) <= (1e-6 + 4 * np.finfo(float).eps * scaled)
+        for idx in zip(*np.nonzero(near_tie)):
+            rounded[idx] = round(float(coords[idx]), precision)
+        return rounded
+
+    return shapely.transform(np.asarray(geometries, dtype=object),
+                             round_array,
+                             include_z=True)
 
 
 #########################################################################
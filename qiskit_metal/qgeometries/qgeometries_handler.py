@@ -18,17 +18,19 @@ See the docstring of `QGeometryTables`
 
 import inspect
 import logging
+import numpy as np
 import pandas as pd
 import shapely
 
 from typing import TYPE_CHECKING
 from typing import Dict as Dict_
-from typing import List, Tuple, Union, Any, Iterable
+from typing import List, Tuple, Union, Any, Iterable, Callable
 from geopandas import GeoDataFrame, GeoSeries
 
 from .. import Dict
 from ..draw import BaseGeometry
-from qiskit_metal.draw.utility import round_coordinate_sequence
+from .spatial_index import QGeometrySpatialIndex
+from qiskit_metal.draw.utility import round_coordinates
 
 from shapely.geometry.multipolygon import MultiPolygon  #to avoid MultiPolygons
 from .. import config
@@ -254,6 +256,35 @@ class QGeometryTables(object):
 
         self._tables = Dict()
 
+        # Rows added by `add_qgeometry` are staged here, as plain dict records
+        # per table and per component id, and are only concatenated into
+        # `self._tables` when the tables are read or `flush` is called. This
+        # avoids a full `pd.concat` of the table for every component that adds
+        # qgeometry. i.e. self._buffers[table_name][component_id] = [rows]
+        self._buffers = dict()
+
+        # Component ids whose rows in `self._tables` are to be dropped at the
+        # next flush. i.e. self._deleted[table_name] = {component_id, ...}
+        self._deleted = dict()
+
+        # Row positions of each component in `self._tables`, built lazily
+        # and only valid for the table object in `self._indexed_tables`.
+        # i.e. self._row_index[table_name][component_id] = np.ndarray
+        self._row_index = dict()
+        self._indexed_tables = dict()
+
+        # Tables whose rows are only loaded when the table is first used, see
+        # `defer_table`. i.e. self._deferred[table_name] = loader
+        self._deferred = dict()
+
+        # Counter bumped whenever qgeometry is added or deleted, and the value
+        # it had at the last change of each component. Used to invalidate
+        # caches derived from the tables, such as the spatial index.
+        # i.e. self._component_revisions[component_id] = int
+        self._revision = 0
+        self._component_revisions = dict()
+        self._spatial_index = None
+
         # Need to call after columns are added by add_renderer_extension is run by all the renderers.
         # self.create_tables()
 
@@ -271,12 +302,221 @@ class QGeometryTables(object):
     def tables(self) -> Dict_[str, GeoDataFrame]:
         """The dictionary of tables containing qgeometry.
 
+        Any rows still staged by `add_qgeometry` are committed to the
+        tables before they are returned.
+
         Returns:
             Dict_[str, GeoDataFrame]: The keys of this dictionary are
             also obtained from `self.get_element_types()`
         """
+        for table_name in list(self._deferred):
+            self._get_table(table_name)
+        self.flush()
         return self._tables
 
+    @property
+    def spatial_index(self) -> QGeometrySpatialIndex:
+        """Spatial index of the components' bounding boxes, kept up to
+        date with the tables.
+
+        Returns:
+            QGeometrySpatialIndex: The spatial index
+        """
+        if self._spatial_index is None:
+            self._spatial_index = QGeometrySpatialIndex(self)
+        return self._spatial_index
+
+    def get_revision(self) -> int:
+        """Revision of the qgeometry, which changes whenever qgeometry is
+        added or deleted.
+
+        Returns:
+            int: Revision number
+        """
+        return self._revision
+
+    def get_component_revision(self, component_id: int) -> int:
+        """Revision of the qgeometry of a component, which changes whenever
+        qgeometry of the component is added or deleted.
+
+        Args:
+            component_id (int): Unique number to describe the component.
+
+        Returns:
+            int: Revision number
+        """
+        return self._component_revisions.get(component_id, 0)
+
+    def _bump_revision(self, component_id: int = None):
+        """Record a change of the qgeometry.
+
+        Args:
+            component_id (int): Component which changed.  Defaults to None,
+                                for a change of all the tables.
+        """
+        self._revision += 1
+        if component_id is None:
+            self._component_revisions.clear()
+        else:
+            self._component_revisions[component_id] = self._revision
+
+    def flush(self):
+        """Commit all rows staged by `add_qgeometry` and all pending deletes
+        to the tables.
+
+        The staged rows of each table are converted to a single GeoDataFrame
+        and concatenated to the table once, rather than once per call to
+        `add_qgeometry`. Called automatically when `tables` is read.
+
+        Tables which are still deferred keep their staged rows and deletes
+        until they are loaded, see `defer_table`.
+        """
+        for table_name in set(self._buffers) | set(self._deleted):
+            if table_name not in self._deferred:
+                self._flush_table(table_name)
+
+    def _flush_table(self, table_name: str):
+        """Commit the pending deletes and staged rows for a single table.
+
+        Args:
+            table_name (str): Element table name ('poly', 'path', etc.)
+        """
+        deleted = self._deleted.pop(table_name, None)
+        blocks = self._buffers.pop(table_name, None)
+        rows = [row for block in blocks.values() for row in block
+               ] if blocks else []
+        if not deleted and not rows:
+            return
+
+        table = self._get_table(table_name)
+        # Keep the row index up to date, rather than regroup the new table
+        row_index = self._get_row_index(table_name)
+
+        if deleted:
+            keep = np.ones(len(table), dtype=bool)
+            for comp_id in deleted:
+                keep[row_index.pop(comp_id, [])] = False
+            table = table[keep]
+            # New position of each kept row
+            new_positions = np.cumsum(keep) - 1
+            row_index = {
+                comp_id: new_positions[positions]
+                for comp_id, positions in row_index.items()
+            }
+
+        if rows:
+            start = len(table)
+            table = pd.concat([table, self._rows_to_frame(rows)],
+                              axis=0,
+                              join='outer',
+                              ignore_index=True,
+                              sort=False,
+                              verify_integrity=False,
+                              copy=False)
+            for comp_id, block in blocks.items():
+                if not block:
+                    continue
+                positions = np.arange(start, start + len(block))
+                start += len(block)
+                if comp_id in row_index:
+                    positions = np.concatenate([row_index[comp_id], positions])
+                row_index[comp_id] = positions
+
+        self._tables[table_name] = table
+        self._row_index[table_name] = row_index
+        self._indexed_tables[table_name] = table
+
+    def _get_table(self, table_name: str) -> GeoDataFrame:
+        """Return a committed table, first loading it if it was deferred.
+
+        Args:
+            table_name (str): Element table name ('poly', 'path', etc.)
+
+        Returns:
+            GeoDataFrame: The table, without the staged rows.
+        """
+        loader = self._deferred.pop(table_name, None)
+        if loader is not None:
+            self._tables[table_name] = loader()
+        return self._tables[table_name]
+
+    def defer_table(self, table_name: str, loader: Callable[[], GeoDataFrame]):
+        """Replace the content of a table by rows that are only loaded, by
+        calling loader, when the table is first used.
+
+        Used when loading a saved design, so that the geometry of large
+        designs is only decoded if it is needed.
+
+        Args:
+            table_name (str): Element table name ('poly', 'path', etc.)
+            loader (Callable[[], GeoDataFrame]): Returns the full table.
+        """
+        self._buffers.pop(table_name, None)
+        self._deleted.pop(table_name, None)
+        self._deferred[table_name] = loader
+        self._bump_revision()
+
+    def _get_row_index(self, table_name: str) -> Dict_[Any, np.ndarray]:
+        """Return the row positions of each component in a committed table.
+
+        The index is rebuilt, with a single groupby, only when the table
+        object has changed since it was last indexed.
+
+        Args:
+            table_name (str): Element table name ('poly', 'path', etc.)
+
+        Returns:
+            Dict_[Any, np.ndarray]: Keys are component ids, values are row
+            positions (for use with iloc) in self._tables[table_name].
+        """
+        table = self._get_table(table_name)
+        if self._indexed_tables.get(table_name) is not table:
+            self._row_index[table_name] = table.groupby('component',
+                                                        sort=False).indices
+            self._indexed_tables[table_name] = table
+        return self._row_index[table_name]
+
+    def _get_component_rows(self, table_name: str,
+                            component_id: Any) -> GeoDataFrame:
+        """Return the rows of one component in a table, including rows that
+        are staged or pending deletion, without flushing the table.
+
+        Args:
+            table_name (str): Element table name ('poly', 'path', etc.)
+            component_id (Any): Value of the component column, i.e. the id.
+
+        Returns:
+            GeoDataFrame: Rows of the component.
+        """
+        table = self._get_table(table_name)
+        if component_id in self._deleted.get(table_name, ()):
+            positions = []
+        else:
+            positions = self._get_row_index(table_name).get(component_id, [])
+        df = table.iloc[positions]
+
+        # Rows staged, but not yet flushed, for this component.
+        rows = self._buffers.get(table_name, {}).get(component_id)
+        if rows:
+            df = pd.concat([df, self._rows_to_frame(rows)],
+                           axis=0,
+                           join='outer',
+                           ignore_index=True,
+                           sort=False)
+        return df
+
+    @staticmethod
+    def _rows_to_frame(rows: List[dict]) -> GeoDataFrame:
+        """Convert staged row records to a GeoDataFrame.
+
+        Args:
+            rows (List[dict]): Records, as staged by `add_qgeometry`.
+
+        Returns:
+            GeoDataFrame: One row per record.
+        """
+        return GeoDataFrame(rows)
+
     @classmethod
     def add_renderer_extension(cls, renderer_name: str, qgeometry: dict):
         """Add renderer element extension to ELEMENT_COLUMNS. Called when the
@@ -375,7 +615,12 @@ class QGeometryTables(object):
             table.name = table_name
 
             # Assign
-            self.tables[table_name] = table
+            self._tables[table_name] = table
+            self._buffers.pop(table_name, None)
+            self._deleted.pop(table_name, None)
+            self._deferred.pop(table_name, None)
+
+        self._bump_revision()
 
     def _validate_column_dictionary(self, table_name: str, column_dict: dict):
         """Validate A possible error here is if the user did not pass a valid
@@ -484,14 +729,15 @@ class QGeometryTables(object):
                 temp_multi = geometry[key]
                 shape_count = 0
                 for shape_temp in temp_multi.geoms:
-                    new_dict[key + '_' +
-                             str(shape_count)] = round_coordinate_sequence(
-                                 shape_temp, rounding_val)
+                    new_dict[key + '_' + str(shape_count)] = shape_temp
                     shape_count += 1
             else:
-                new_dict[key] = round_coordinate_sequence(item, rounding_val)
+                new_dict[key] = item
 
-        geometry = new_dict
+        # Round all the geometries of the call at once
+        geometry = Dict(
+            zip(new_dict.keys(),
+                round_coordinates(list(new_dict.values()), rounding_val)))
 
         # Create options TODO: Might want to modify this (component_name -> component_id)
         # Give warning if length is to be fillet's and not long enough.
@@ -511,27 +757,12 @@ class QGeometryTables(object):
         #        options[keyC] = ???[keyC] -> alternative manner to pass options to the add_qgeometry function?
         #                                       instead have the add_qeometry in baseComponent generate the dict?
 
-        #Could we just append rather than make a new table each time? This seems slow
-        table = self.tables[kind]
-
-        # assert that all names in options are in table columns! TODO: New approach will not be wanting
-        #to do this (maybe check that all columns are in options?)
-        df = GeoDataFrame.from_dict(geometry,
-                                    orient='index',
-                                    columns=['geometry'])
-        df.index.name = 'name'
-        df = df.reset_index()
-
-        df = df.assign(**options)
-
-        # Set new table. Unfortunately, this creates a new instance. Can just direct append
-        self.tables[kind] = pd.concat([table, df],
-                                      axis=0,
-                                      join='outer',
-                                      ignore_index=True,
-                                      sort=False,
-                                      verify_integrity=False,
-                                      copy=False)
+        # Stage one record per geometry. The table itself is only rebuilt
+        # when the rows are flushed, see `flush`.
+        rows = self._buffers.setdefault(kind, {}).setdefault(component_name, [])
+        for name, geom in geometry.items():
+            rows.append(dict(name=name, geometry=geom, **options))
+        self._bump_revision(component_name)
 
     def check_lengths(self, geometry: shapely.geometry.base.BaseGeometry,
                       kind: str, component_name: str, **other_options):
@@ -579,7 +810,12 @@ class QGeometryTables(object):
 
         Use when clearing a design and starting from scratch.
         """
-        self.tables.clear()
+        self._tables.clear()
+        self._buffers.clear()
+        self._deleted.clear()
+        self._deferred.clear()
+        self._row_index.clear()
+        self._indexed_tables.clear()
         self.create_tables()  # remake all tables
 
     def delete_component(self, name: str):
@@ -589,24 +825,29 @@ class QGeometryTables(object):
             name (str): Name of component (case sensitive)
         """
         # TODO: Add unit test
-        # TODO: is this the best way to do this, or is there a faster way?
         a_comp = self.design.components[name]
         if a_comp is not None:
-            for table_name in self.tables:
-                df = self.tables[table_name]
-                self.tables[table_name] = df[df['component'] != a_comp.id]
+            self.delete_component_id(a_comp.id)
 
     def delete_component_id(self, component_id: int):
         """Drop the components within the qgeometry.tables.
 
+        Staged rows of the component are discarded right away. Committed rows
+        are only marked, and are dropped from the tables in one pass at the
+        next flush, so deleting a component does not reallocate every table.
+
         Args:
             component_id (int): Unique number to describe the component.
         """
-        for table_name in self.tables:
-            df_table_name = self.tables[table_name]
-            # self.tables[table_name] = df_table_name.drop(df_table_name[df_table_name['component'] == component_id].index)
-            self.tables[table_name] = df_table_name[df_table_name['component']
-                                                    != component_id]
+        for table_name in self._tables:
+            self._buffers.get(table_name, {}).pop(component_id, None)
+            if table_name in self._deferred:
+                # Dropped once the table is loaded, without loading it now
+                self._deleted.setdefault(table_name, set()).add(component_id)
+                continue
+            if component_id in self._get_row_index(table_name):
+                self._deleted.setdefault(table_name, set()).add(component_id)
+        self._bump_revision(component_id)
 
     def get_component(
         self,
@@ -633,13 +874,12 @@ class QGeometryTables(object):
                 tables[table_name] = self.get_component(name, table_name)
             return tables
         else:
-            df = self.tables[table_name]
             a_comp = self.design.components[name]
             if a_comp is None:
                 # Component not found.
                 return None
             else:
-                return df[df.component == a_comp.id]
+                return self._get_component_rows(table_name, a_comp.id)
 
             # comp_id = self.design.components[name].id
             # return df[df.component == comp_id]
@@ -679,6 +919,8 @@ class QGeometryTables(object):
             for table_name in self.tables:
                 table = self.tables[table_name]
                 table.component[table.component == a_comp.id] = new_name
+                # The component column changed in place.
+                self._indexed_tables.pop(table_name, None)
 
     def get_component_geometry_list(self,
                                     name: str,
@@ -701,9 +943,9 @@ class QGeometryTables(object):
                 qgeometry += self.get_component_geometry_list(name, table)
 
         else:
-            table = self.tables[table_name]
             comp_id = self.design.components[name].id
-            qgeometry = table.geometry[table.component == comp_id].to_list()
+            qgeometry = self._get_component_rows(table_name,
+                                                 comp_id).geometry.to_list()
 
         return qgeometry
 
@@ -719,8 +961,8 @@ class QGeometryTables(object):
         comp_id = self.design.components[name].id
         qgeometry = {}
         for table_name in self.get_element_types():
-            table = self.tables[table_name]
-            qgeometry[table_name] = table.geometry[table.component == comp_id]
+            qgeometry[table_name] = self._get_component_rows(
+                table_name, comp_id).geometry
         qgeometry = pd.concat(qgeometry)
 
         # when concatenating empty GeoSeries, returns Series (ugly fix)
@@ -751,12 +993,10 @@ class QGeometryTables(object):
             return qgeometry  # return pd.concat(qgeometry, axis=0)
 
         else:
-            table = self.tables[table_name]
-
-            # mask the rows nad get only 2 columns
+            # get only the rows of the component, and only 2 columns
             comp_id = self.design.components[name].id
-            df_comp_id = table.loc[table.component == comp_id,
-                                   ['name', 'geometry']]
+            df_comp_id = self._get_component_rows(table_name,
+                                                  comp_id)[['name', 'geometry']]
             df_geometry = df_comp_id.geometry
             df_geometry.index = df_comp_id.name
             return df_geometry.to_dict()
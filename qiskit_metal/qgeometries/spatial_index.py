@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2017, 2021.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+"""Spatial index over the bounding boxes of the components in the
+qgeometry tables, used for obstacle queries, such as when routing."""
+
+from typing import TYPE_CHECKING, List, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import CAP_STYLE
+from shapely.ops import unary_union
+
+from .. import Dict
+
+if TYPE_CHECKING:
+    # For linting, avoids circular imports.
+    from .qgeometries_handler import QGeometryTables
+
+__all__ = ['QGeometrySpatialIndex']
+
+
+class QGeometrySpatialIndex():
+    """STRtree of the bounding boxes of the components in the qgeometry
+    tables.
+
+    The bounds and outline of each component are cached, and are only
+    recomputed after the component's qgeometry changes, see
+    `QGeometryTables.get_component_revision`. The tree itself is rebuilt,
+    from the cached bounds, the first time it is queried after a change.
+
+    Access through `design.qgeometry.spatial_index`.
+    """
+
+    def __init__(self, qgeometry: 'QGeometryTables'):
+        """
+        Args:
+            qgeometry (QGeometryTables): The qgeometry tables to index
+        """
+        self._qgeometry = qgeometry
+
+        # Cache per component.
+        # i.e. self._entries[component_id] = Dict(revision, bounds, empty, outline)
+        self._entries = dict()
+
+        self._tree = None
+        self._tree_ids = np.array([], dtype=int)
+        self._tree_revision = None
+
+    def _get_entry(self, component_id: int) -> Dict:
+        """Cached bounds and outline of a component, refreshed if the
+        qgeometry of the component changed since they were computed.
+
+        Args:
+            component_id (int): Unique id of the component
+
+        Returns:
+            Dict: With keys revision, bounds, empty and outline.  The outline is
+            computed on demand, see `get_outline`.
+        """
+        revision = self._qgeometry.get_component_revision(component_id)
+        entry = self._entries.get(component_id)
+        if entry is None or entry.revision != revision:
+            # pylint: disable=protected-access
+            name = self._qgeometry.design._components[component_id].name
+            empty = all(
+                self._qgeometry._get_component_rows(table_name,
+                                                    component_id).empty
+                for table_name in self._qgeometry.get_element_types())
+            entry = Dict(revision=revision,
+                         bounds=tuple(
+                             self._qgeometry.get_component_bounds(name)),
+                         empty=empty,
+                         outline=None)
+            self._entries[component_id] = entry
+        return entry
+
+    def _refresh_entries(self, component_ids: List[int]):
+        """Recompute, in bulk, the cached bounds of the given components.
+        Same as `_get_entry`, but with one pass over each table.
+
+        Args:
+            component_ids (List[int]): Ids of the components to refresh
+        """
+        if not component_ids:
+            return
+        # pylint: disable=protected-access
+        tables = self._qgeometry.tables  # Commits the staged rows
+        geometry = {component_id: [] for component_id in component_ids}
+        for table_name, table in tables.items():
+            row_index = self._qgeometry._get_row_index(table_name)
+            values = np.asarray(table.geometry, dtype=object)
+            for component_id in component_ids:
+                if component_id in row_index:
+                    geometry[component_id].append(
+                        values[row_index[component_id]])
+
+        for component_id, arrays in geometry.items():
+            empty = not any(len(array) for array in arrays)
+            bounds = (0, 0, 0, 0) if empty else tuple(
+                shapely.total_bounds(np.concatenate(arrays)))
+            self._entries[component_id] = Dict(
+                revision=self._qgeometry.get_component_revision(component_id),
+                bounds=bounds,
+                empty=empty,
+                outline=None)
+
+    def _update_tree(self):
+        """Rebuild the tree if any qgeometry changed since it was built."""
+        revision = self._qgeometry.get_revision()
+        if self._tree is not None and self._tree_revision == revision:
+            return
+
+        components = self._qgeometry.design._components  # pylint: disable=protected-access
+        for component_id in set(self._entries) - set(components):
+            del self._entries[component_id]
+        self._refresh_entries([
+            component_id for component_id in components
+            if component_id not in self._entries or self._entries[component_id].
+            revision != self._qgeometry.get_component_revision(component_id)
+        ])
+
+        ids = []
+        bounds = []
+        for component_id in components:
+            entry = self._get_entry(component_id)
+            if not entry.empty:
+                ids.append(component_id)
+                bounds.append(entry.bounds)
+
+        self._tree_ids = np.array(ids, dtype=int)
+        self._tree = shapely.STRtree(
+            shapely.box(*np.array(bounds, dtype=float).reshape(-1, 4).T))
+        self._tree_revision = revision
+
+    def query(self, geometry: shapely.geometry.base.BaseGeometry) -> List[int]:
+        """Components whose bounding box intersects the bounding box of the
+        given geometry.  Components without qgeometry are not included.
+
+        Args:
+            geometry (BaseGeometry): Shapely geometry, such as a LineString
+
+        Returns:
+            List[int]: Ids of the components, in ascending order
+        """
+        self._update_tree()
+        return sorted(self._tree_ids[self._tree.query(geometry)].tolist())
+
+    def get_bounds(self,
+                   component_id: int) -> Tuple[float, float, float, float]:
+        """Bounds of the component, same as `get_component_bounds`.
+
+        Args:
+            component_id (int): Unique id of the component
+
+        Returns:
+            tuple: (minx, miny, maxx, maxy)
+        """
+        return self._get_entry(component_id).bounds
+
+    def get_outline(self, component_id: int) -> List[Tuple[float, float]]:
+        """Coordinates of the exterior of the union of the component's
+        polygons and its paths, buffered to their width.
+
+        Args:
+            component_id (int): Unique id of the component
+
+        Returns:
+            List[Tuple[float, float]]: Coordinates of the outline
+        """
+        # pylint: disable=protected-access
+        entry = self._get_entry(component_id)
+        if entry.outline is None:
+            paths = self._qgeometry._get_component_rows('path', component_id)
+            paths_converted = [
+                geometry.buffer(width / 2, cap_style=CAP_STYLE.flat)
+                for geometry, width in zip(paths['geometry'], paths['width'])
+            ]
+            polygons = self._qgeometry._get_component_rows(
+                'poly', component_id).geometry.to_list()
+            boundary = unary_union(polygons + paths_converted)
+            entry.outline = list(boundary.exterior.coords)
+        return entry.outline
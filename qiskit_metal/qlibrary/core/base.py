@@ -27,6 +27,7 @@ from datetime import datetime
 import pandas as pd
 import numpy as np
 import pprint
+import shapely
 from inspect import signature
 
 from qiskit_metal import draw
@@ -37,6 +38,7 @@ from qiskit_metal import config
 from qiskit_metal.draw import BaseGeometry
 from qiskit_metal.toolbox_python.attr_dict import Dict
 from qiskit_metal.toolbox_python.display import format_dict_ala_z
+from qiskit_metal.toolbox_python.utility_functions import to_hashable
 from qiskit_metal.qlibrary.core._parsed_dynamic_attrs import ParsedDynamicAttributes_Component
 
 if not config.is_building_docs():
@@ -44,6 +46,10 @@ if not config.is_building_docs():
 
 __all__ = ['QComponent']
 
+# Number of entries kept in the geometry cache of a design, see
+# QComponent.reuse_geometry.
+_GEOMETRY_CACHE_SIZE = 256
+
 if TYPE_CHECKING:
     # For linting typechecking, import modules that can't be loaded here under normal conditions.
     # For example, I can't import QDesign, because it requires QComponent first. We have the
@@ -128,6 +134,19 @@ class QComponent():
 
     TOOLTIP = """QComponent"""
 
+    make_uses_design_state = False
+    """Set to True in components whose make function reads the design
+    beyond their own options and the pins given in pin_inputs, such as
+    the geometry of other components. These are remade on every rebuild."""
+
+    reuse_geometry = True
+    """Components of the same class, whose parsed options only differ by
+    pos_x and pos_y, reuse the geometry and pins made by the first of them,
+    translated, instead of running make again. Set to False in components
+    whose make does more than add QGeometry and pins, or whose geometry is
+    not simply moved by pos_x and pos_y. Components with make_uses_design_state,
+    or with pin_inputs, never reuse geometry."""
+
     options = {}
     """A dictionary of the component-designer-defined options.
     These options are used in the make function to create the QGeometry and QPins.
@@ -185,6 +204,15 @@ class QComponent():
         self._id = None
         self._made = False
 
+        # Inputs of the last successful make, see _get_build_fingerprint(),
+        # and the pins which were connected by it.
+        self._build_fingerprint = None
+        self._built_connected_pins = set()
+
+        # Calls to add_qgeometry and add_pin recorded during make, see
+        # reuse_geometry.
+        self._make_record = None
+
         self._component_template = component_template
 
         # Status: used to handle building of a component and checking if it succeeded or failed.
@@ -257,8 +285,8 @@ class QComponent():
         self.qgeometry_table_usage = Dict()
         self.populate_to_track_table_usage()
 
-        # Make the component geometry
-        if make:
+        # Make the component geometry, or leave it to the open design.batch()
+        if make and not self.design._defer_build(self):
             self.rebuild()
 
     @classmethod
@@ -678,7 +706,7 @@ name='{strname}'{other_args}
 
         return full_import, body
 
-    def rebuild(self):
+    def rebuild(self, force: bool = False) -> bool:
         """Builds the QComponent.
 
         This is the main action function of a
@@ -690,16 +718,46 @@ name='{strname}'{other_args}
         which is written by the component developer to implement the logic (using the metal.
         draw module) to convert the qc.options into the QGeometry.
 
+        The build is skipped when the component was already built successfully
+        and the inputs of make are unchanged since; see _get_build_fingerprint().
+        Make is also skipped when an identical component, but for its position,
+        was made before; see reuse_geometry.
+
         *Build status:*
         The function also sets the build status of the component.
         It sets to `failed` when the component is created, and then it sets to `good` when it is
         done with no errors. The user can also set other statuses, which can appear if the code
         fails to reach the final line of the build, where the build status is set to `good`.
 
+        Args:
+            force (bool): Remake the component even if it is unchanged.  Defaults to False.
+
+        Returns:
+            bool: True if the component was remade, False if it was skipped.
+
         Raises:
             Exception: Component build failure
         """
+        fingerprint = self._get_build_fingerprint()
+        if not force and self._is_build_current(fingerprint):
+            return False
+
+        cache_key, position = self._get_geometry_cache_key(fingerprint)
+        # Calls of make recorded by a worker process of design.rebuild, or
+        # by an identical component at another position.
+        # pylint: disable=protected-access
+        record = self.design._made_in_workers.pop(self.id, None)
+        offset = (0., 0.)
+        from_cache = record is None and cache_key is not None and not force
+        if from_cache:
+            made_at, record = self.design._geometry_cache.get(
+                cache_key, (None, None))
+            from_cache = record is not None
+            if from_cache:
+                offset = np.subtract(position, made_at)
+
         self.status = 'failed'
+        self._build_fingerprint = None
         try:
             if self._made:  # already made, just remaking
                 self.design.qgeometry.delete_component_id(self.id)
@@ -707,9 +765,25 @@ name='{strname}'{other_args}
                 # pylint: disable=protected-access
                 self.design._delete_all_pins_for_component(self.id)
 
-            self.make()
+            if record is not None:
+                self._replay_make(record, offset)
+                self._build_fingerprint = fingerprint
+            else:
+                self._make_record = [] if cache_key is not None else None
+                try:
+                    self.make()
+                finally:
+                    record, self._make_record = self._make_record, None
+                # Taken after make, since make can store results in the options.
+                self._build_fingerprint = self._get_build_fingerprint()
             self._made = True
             self.status = 'good'
+            if (cache_key is not None and not from_cache and
+                    self._build_fingerprint == fingerprint):
+                self._remember_geometry(cache_key, position, record)
+            self._built_connected_pins = {
+                name for name, pin in self.pins.items() if pin.net_id
+            }
 
             self.design.build_logs.add_success(
                 f"{str(datetime.now())} -- Component: {self.name} successfully built"
@@ -723,6 +797,142 @@ name='{strname}'{other_args}
             )
             raise error
 
+        return True
+
+    def _get_build_fingerprint(self) -> Union[tuple, None]:
+        """Summarize the inputs of make, so that rebuild can tell whether
+        remaking the component would change anything.
+
+        The fingerprint holds the parsed options, which also captures the
+        values of the design variables they reference and the design units,
+        the design precision, and the geometry of the pins, of other
+        components, given in options.pin_inputs.
+
+        Components can extend the fingerprint with other inputs of their make.
+
+        Returns:
+            Union[tuple, None]: The fingerprint, or None if the component has
+            to be remade regardless, see make_uses_design_state.
+        """
+        if self.make_uses_design_state:
+            return None
+
+        # pylint: disable=protected-access
+        try:
+            pins_used = []
+            for pin_check in self.options.get('pin_inputs', Dict()).values():
+                comp_id = self.design._get_component_id(pin_check.component)
+                pin = self.design._components[comp_id].pins[pin_check.pin]
+                pins_used.append(
+                    (comp_id, pin_check.pin,
+                     to_hashable(
+                         [pin.points, pin.normal, pin.width, pin.gap,
+                          pin.chip])))
+
+            return (to_hashable(self.parse_options()),
+                    self.design.template_options.PRECISION, tuple(pins_used))
+
+        except Exception:  # pylint: disable=broad-except
+            # Let make find, and report, the issue.
+            return None
+
+    def _get_geometry_cache_key(
+        self, fingerprint: Union[tuple, None]
+    ) -> Tuple[Union[tuple, None], Union[Tuple[float, float], None]]:
+        """Key of the geometry made by this component in the geometry cache
+        of the design, see reuse_geometry.
+
+        Args:
+            fingerprint (Union[tuple, None]): Result of _get_build_fingerprint()
+
+        Returns:
+            Tuple[Union[tuple, None], Union[Tuple[float, float], None]]: The key,
+            made of the class and of the fingerprint without pos_x and pos_y,
+            and the position (pos_x, pos_y). Both are None if the geometry
+            cannot be reused.
+        """
+        if not self.reuse_geometry or fingerprint is None or fingerprint[2]:
+            return None, None
+        options = dict(fingerprint[0])
+        position = (options.pop('pos_x', None), options.pop('pos_y', None))
+        if not all(
+                isinstance(value, (int, float)) and not isinstance(value, bool)
+                for value in position):
+            return None, None
+        return (type(self), tuple(options.items()), fingerprint[1:]), position
+
+    def _remember_geometry(self, cache_key: tuple,
+                           position: Tuple[float, float], record: list):
+        """Store the calls to add_qgeometry and add_pin just made by make in
+        the geometry cache of the design.
+
+        Args:
+            cache_key (tuple): Key from _get_geometry_cache_key()
+            position (Tuple[float, float]): (pos_x, pos_y) of this component
+            record (list): Calls made by make, as (method name, arguments)
+        """
+        if not record or not all(
+                isinstance(geom, BaseGeometry)
+                for method, args in record if method == 'add_qgeometry'
+                for geom in args[1].values()):
+            return
+        # pylint: disable=protected-access
+        cache = self.design._geometry_cache
+        cache[cache_key] = (position, record)
+        if len(cache) > _GEOMETRY_CACHE_SIZE:
+            cache.pop(next(iter(cache)))
+
+    def _replay_make(self, record: list, offset: Tuple[float, float]):
+        """Repeat the calls to add_qgeometry and add_pin recorded during a
+        make, moved by offset, in place of make.
+
+        Args:
+            record (list): Calls made by make, as (method name, arguments)
+            offset (Tuple[float, float]): Translation of the geometry and pins
+        """
+        offset = np.asarray(offset, dtype=float)
+        geoms = [
+            geom for method, args in record if method == 'add_qgeometry'
+            for geom in args[1].values()
+        ]
+        if offset.any():
+            geoms = shapely.transform(geoms, lambda coords: coords + offset)
+        geoms = iter(geoms)
+
+        for method, args in record:
+            if method == 'add_qgeometry':
+                kind, geometry, subtract, helper, layer, chip, kwargs = args
+                self.add_qgeometry(kind,
+                                   {name: next(geoms) for name in geometry},
+                                   subtract=subtract,
+                                   helper=helper,
+                                   layer=layer,
+                                   chip=chip,
+                                   **kwargs)
+            else:
+                name, points, width, input_as_norm, chip, gap = args
+                self.add_pin(name, points + offset, width, input_as_norm, chip,
+                             gap)
+
+    def _is_build_current(self, fingerprint: Union[tuple, None]) -> bool:
+        """Check if the last build of the component is still current.
+
+        Args:
+            fingerprint (Union[tuple, None]): Result of _get_build_fingerprint()
+
+        Returns:
+            bool: True if the component was built successfully with the same
+            fingerprint, and the pins connected by that build are still connected.
+        """
+        if fingerprint is None or not self._made or self.status != 'good':
+            return False
+        if fingerprint != self._build_fingerprint:
+            return False
+        # A rebuild of a component on the other side of a connection removes
+        # the connection from net_info.
+        return all(name in self.pins and self.pins[name].net_id
+                   for name in self._built_connected_pins)
+
     def delete(self):
         """Delete the QComponent.
 
@@ -892,6 +1102,10 @@ name='{strname}'{other_args}
             ..........|
         """
         assert len(points) == 2
+        if self._make_record is not None:
+            self._make_record.append(
+                ('add_pin', (name, np.array(points, dtype=float), width,
+                             input_as_norm, chip, gap)))
 
         if gap is None:
             gap = width * 0.6
@@ -970,18 +1184,21 @@ name='{strname}'{other_args}
         for pin_check in self.options.pin_inputs.values():
             component = pin_check['component']
             pin = pin_check['pin']
+            # The pins of a component not yet built by design.batch() are
+            # checked when it is built.
             if isinstance(component, str):
                 if component not in self.design.components:
                     false_component = True
                 elif pin not in self.design.components[component].pins:
-                    false_pin = True
+                    false_pin = not self.design._is_build_deferred(
+                        self.design.components[component].id)
                 elif self.design.components[component].pins[pin].net_id:
                     pin_in_use = True
             elif isinstance(component, int):
                 if component not in self.design._components:
                     false_component = True
                 elif pin not in self.design._components[component].pins:
-                    false_pin = True
+                    false_pin = not self.design._is_build_deferred(component)
                 elif self.design._components[component].pins[pin].net_id:
                     pin_in_use = True
             # Should modify to allow for multiple error messages to be returned.
@@ -1106,6 +1323,11 @@ name='{strname}'{other_args}
         # assert (subtract and helper) == False, "The object can't be a subtracted helper. Please"\
         #    " choose it to either be a helper or a a subtracted layer, but not both. Thank you."
 
+        if self._make_record is not None:
+            self._make_record.append(
+                ('add_qgeometry', (kind, dict(geometry), subtract, helper,
+                                   layer, chip, kwargs)))
+
         if layer is None:
             layer = self.options.layer
         if chip is None:
@@ -1324,5 +1546,6 @@ name='{strname}'{other_args}
         add_qgeometry(). This dict is used to get a summary tables used
         for this component.
         """
-        for table_name in self.design.qgeometry.tables.keys():
+        # Not qgeometry.tables, which would commit the staged rows.
+        for table_name in self.design.qgeometry.get_element_types():
             self.qgeometry_table_usage[table_name] = False
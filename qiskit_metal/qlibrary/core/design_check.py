@@ -1,7 +1,13 @@
 ### BASIC PROGRAM THAT LOOKS FOR OVERLAP BETWEEN QCOMPONENTS
-from numpy import size
-import geopandas as gpd
+from typing import TYPE_CHECKING, Iterable
+
+import numpy as np
 import pandas as pd
+import shapely
+
+if TYPE_CHECKING:
+    # For linting, avoids circular imports.
+    from qiskit_metal.designs.design_base import QDesign
 
 
 class QDesignCheck():
@@ -10,77 +16,209 @@ class QDesignCheck():
     between components and/or connections between components.
     """
 
+    VIOLATION_COLUMNS = [
+        'component_id_1', 'component_1', 'element_1', 'table_1',
+        'component_id_2', 'component_2', 'element_2', 'table_2', 'chip',
+        'layer', 'distance', 'violation'
+    ]
+    """Columns of the DataFrame returned by check_overlaps"""
+
     def __init__(self, design: 'QDesign'):
         self.design = design
 
     def update_design(self, design: 'QDesign'):
         self.design = design
 
-    def overlap_tester(self):
-        design = self
+    def _get_check_geometries(self, table_names: Iterable[str]) -> pd.DataFrame:
+        """Gather the non-helper qgeometry rows of the given tables, with the
+        paths buffered by half their width.
+
+        Args:
+            table_names (Iterable[str]): Names of the qgeometry tables
+
+        Returns:
+            pd.DataFrame: One row per qgeometry, with columns component, name,
+            table, subtract, chip, layer and geometry.
+        """
+        frames = []
+        for table_name in table_names:
+            table = self.design.qgeometry.tables[table_name]
+            table = table[~table['helper'].astype(bool)]
+            geometry = np.asarray(table.geometry, dtype=object)
+            if 'width' in table.columns:
+                width = table['width'].to_numpy(dtype=float)
+                is_line = shapely.get_dimensions(geometry) == 1
+                to_buffer = is_line & (width > 0)
+                geometry = geometry.copy()
+                geometry[to_buffer] = shapely.buffer(geometry[to_buffer],
+                                                     width[to_buffer] / 2,
+                                                     cap_style='flat')
+            frames.append(
+                pd.DataFrame(
+                    dict(component=table['component'].to_numpy(),
+                         name=table['name'].to_numpy(),
+                         table=table_name,
+                         subtract=table['subtract'].to_numpy(dtype=bool),
+                         chip=table['chip'].to_numpy(),
+                         layer=table['layer'].to_numpy(),
+                         geometry=geometry)))
+        if not frames:
+            return pd.DataFrame(columns=[
+                'component', 'name', 'table', 'subtract', 'chip', 'layer',
+                'geometry'
+            ])
+        return pd.concat(frames, ignore_index=True)
+
+    def _get_connection_regions(self, min_spacing: float) -> dict:
+        """Regions around the pins connected in net_info, where the
+        geometries of the two connected components are expected to meet.
+
+        Args:
+            min_spacing (float): Minimum spacing checked
+
+        Returns:
+            dict: Keys are pairs of component ids, in ascending order, and
+            values are the union of the disks around their connected pins.
+        """
+        regions = dict()
+        net_info = self.design.net_info
+        for _, net in net_info.groupby('net_id'):
+            pins = list(zip(net['component_id'], net['pin_name']))
+            disks = []
+            for component_id, pin_name in pins:
+                pin = self.design._components[component_id].pins[pin_name]
+                disks.append(
+                    shapely.buffer(shapely.points(pin.middle),
+                                   pin.width / 2 + pin.gap + min_spacing))
+            disk = shapely.union_all(disks)
+            for num, (id_1, _) in enumerate(pins):
+                for id_2, _ in pins[num + 1:]:
+                    key = (min(id_1, id_2), max(id_1, id_2))
+                    regions[key] = shapely.union(regions[key], disk) \
+                        if key in regions else disk
+        return regions
+
+    def check_overlaps(
+        self,
+        min_spacing: float = 0,
+        table_names: Iterable[str] = ('poly', 'path')
+    ) -> pd.DataFrame:
+        """Find the geometries of different components which overlap, or
+        are closer than min_spacing, on the same chip and layer.
+
+        All the non-helper geometries are put in one spatial index, with the
+        paths buffered by half their width, and are queried in bulk. Pairs of
+        subtract geometries are not reported. Where two components are
+        connected by a net in net_info, their geometries are allowed to meet
+        around the connected pins.
+
+        Args:
+            min_spacing (float): Minimum spacing between geometries, in
+                                 design units.  Defaults to 0, which only
+                                 reports overlaps.
+            table_names (Iterable[str]): Names of the qgeometry tables to
+                                         check.  Defaults to ('poly', 'path').
+
+        Returns:
+            pd.DataFrame: One row per violation, with the columns in
+            VIOLATION_COLUMNS. The violation is 'overlap' when the geometries
+            intersect, else 'spacing'.
+        """
+        elements = self._get_check_geometries(table_names)
+        if elements.empty:
+            return pd.DataFrame(columns=self.VIOLATION_COLUMNS)
+        geometry = elements['geometry'].to_numpy()
+
+        tree = shapely.STRtree(geometry)
+        if min_spacing > 0:
+            first, second = tree.query(geometry,
+                                       predicate='dwithin',
+                                       distance=min_spacing)
+        else:
+            first, second = tree.query(geometry, predicate='intersects')
+
+        component = elements['component'].to_numpy()
+        subtract = elements['subtract'].to_numpy()
+        chip = elements['chip'].to_numpy()
+        layer = elements['layer'].to_numpy()
+        keep = ((first < second) & (component[first] != component[second]) &
+                (chip[first] == chip[second]) &
+                (layer[first] == layer[second]) &
+                ~(subtract[first] & subtract[second]))
+        first, second = first[keep], second[keep]
+        # Report the component with the lower id first
+        swap = component[first] > component[second]
+        first[swap], second[swap] = second[swap], first[swap]
+        distance = shapely.distance(geometry[first], geometry[second])
+
+        # Allow the connected components to meet at their pins
+        regions = self._get_connection_regions(min_spacing)
+        if regions:
+            region = np.array([
+                regions.get((min(id_1, id_2), max(id_1, id_2)))
+                for id_1, id_2 in zip(component[first], component[second])
+            ],
+                              dtype=object)
+            connected = np.array([item is not None for item in region],
+                                 dtype=bool)
+            # Where the geometries meet: their intersection, or the shortest
+            # line between them if they do not intersect
+            contact = np.empty(len(first), dtype=object)
+            touching = connected & (distance == 0)
+            contact[touching] = shapely.intersection(geometry[first[touching]],
+                                                     geometry[second[touching]])
+            apart = connected & (distance > 0)
+            contact[apart] = shapely.shortest_line(geometry[first[apart]],
+                                                   geometry[second[apart]])
+            allowed = np.zeros(len(first), dtype=bool)
+            allowed[connected] = shapely.covered_by(contact[connected],
+                                                    region[connected])
+            first, second = first[~allowed], second[~allowed]
+            distance = distance[~allowed]
+
+        names = {
+            comp_id: comp.name
+            for comp_id, comp in self.design._components.items()
+        }
+        violations = pd.DataFrame(dict(
+            component_id_1=component[first],
+            component_1=[names.get(i) for i in component[first]],
+            element_1=elements['name'].to_numpy()[first],
+            table_1=elements['table'].to_numpy()[first],
+            component_id_2=component[second],
+            component_2=[names.get(i) for i in component[second]],
+            element_2=elements['name'].to_numpy()[second],
+            table_2=elements['table'].to_numpy()[second],
+            chip=chip[first],
+            layer=layer[first],
+            distance=distance,
+            violation=np.where(distance > 0, 'spacing', 'overlap')),
+                                  columns=self.VIOLATION_COLUMNS)
+        return violations.sort_values(['component_id_1', 'component_id_2'],
+                                      ignore_index=True)
+
+    def overlap_tester(self) -> pd.DataFrame:
         """This particular function tests for overlap amongst qcomponents
         and CPWs. It will catch qubit/qubit overlap, qubit, CPW overlap
         and CPW/CPW overlap.
-        """
 
-        for unique_int in self.design._components:
+        Prints, for each component, the components it collides with.
+        See check_overlaps.
+
+        Returns:
+            pd.DataFrame: The overlaps found by check_overlaps
+        """
+        violations = self.check_overlaps()
+        for comp_id in self.design._components:
             print(" ")
             print("Component ID:")
-            print(unique_int)
-            comp = unique_int
-
-            # Get the GeoSeries tables separately for polys and paths, then combine.
-            poly = self.design._components[unique_int].qgeometry_table('poly')
-            path = self.design._components[unique_int].qgeometry_table('path')
-            combined = gpd.GeoDataFrame(
-                pd.concat([poly, path], ignore_index=True))
-            combined_geo = combined["geometry"]
-
-            # loop within a loop to calculate distance between components
-            for unique_int in self.design._components:
-
-                main_counter = 0.0
-
-                # don't calculate distance between a component and itself
-                if unique_int == comp:
-                    #print("Don't check for collisions between component and itself.")
-                    pass
-                else:
-                    poly_inner = self.design._components[
-                        unique_int].qgeometry_table('poly')
-                    path_inner = self.design._components[
-                        unique_int].qgeometry_table('path')
-                    combined_inner = gpd.GeoDataFrame(
-                        pd.concat([poly_inner, path_inner], ignore_index=True))
-                    combined_geo_inner = combined_inner["geometry"]
-
-                    collision_counter_outer = 0.0
-
-                    n = int(size(combined_geo_inner))
-                    for i in range(0, n):
-
-                        #print("inner element:", i)
-                        el_inner = combined_geo.crosses(combined_geo_inner[i])
-
-                        m = int(size(el_inner))
-                        collision_counter = 0.0
-                        for j in range(0, m):
-                            if el_inner[j] == 1:
-                                collision_counter = collision_counter + 1.0
-                            else:
-                                pass
-                        if collision_counter > 0.0:
-                            collision_counter_outer = collision_counter_outer + 1.0
-                        else:
-                            pass
-
-                    if collision_counter_outer > 0.0:
-                        main_counter = main_counter + 1.0
-                    else:
-                        pass
-
-                if main_counter > 0.0:
-                    print("Has a collision with the following QComponent:",
-                          unique_int)
-                else:
-                    pass
+            print(comp_id)
+            others = set(
+                violations.loc[violations['component_id_1'] == comp_id,
+                               'component_id_2']) | set(violations.loc[
+                                   violations['component_id_2'] == comp_id,
+                                   'component_id_1'])
+            for other_id in sorted(others):
+                print("Has a collision with the following QComponent:",
+                      other_id)
+        return violations
@@ -74,7 +74,7 @@ class BaseQubit(QComponent):
             raise Exception(
                 f"Unable to create connection pads using given parameters: {options_connection_pads}.\n\n If given parameters is None, check to make sure you don't have any invalid child parameters in your connection_pads parameter.\n\n If you don't want any pads, ensure neither options_connection_pads nor options[connection_pads] are parameters\n\n Exception is: {e} "
             )
-        if make:
+        if make and not self.design._defer_build(self):
             self.rebuild()
 
     def _set_options_connection_pads(self):
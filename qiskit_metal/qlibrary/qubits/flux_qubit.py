@@ -29,6 +29,11 @@ class FluxQubit4jj(BaseQubit):  # pylint: disable=invalid-name
         )
     """Default drawing options"""
 
+    reuse_geometry = False
+    """Its unions split into pieces differently at different positions,
+    because of float noise, so its geometry translated from another position
+    is not equal to the geometry made by make"""
+
     def make(self):
         """Define the way the options are turned into QGeometry.
 
@@ -42,6 +42,9 @@ class SmileyFace(QComponent):
 
     TOOLTIP = """TEST COMPONENT It is for fun only"""
 
+    reuse_geometry = False
+    """The face is drawn at the origin, whatever pos_x and pos_y"""
+
     def make(self):
         """Build the component."""
         face = draw.shapely.geometry.Point(0, 0).buffer(1)
@@ -21,9 +21,7 @@ from qiskit_metal.qlibrary.core import QRoute, QRoutePoint
 from qiskit_metal.toolbox_metal import math_and_overrides as mao
 from qiskit_metal.toolbox_metal.exceptions import QiskitMetalDesignError
 from collections.abc import Mapping
-from shapely.ops import unary_union
-from shapely.geometry import CAP_STYLE
-import geopandas as gpd
+from shapely.geometry import LineString
 
 
 def intersecting(a: np.array, b: np.array, c: np.array, d: np.array) -> bool:
@@ -136,6 +134,9 @@ class RouteAnchors(QRoute):
 
     TOOLTIP = """Creates and connects a series of anchors through which the Route passes."""
 
+    make_uses_design_state = True
+    """Collision avoidance reads the geometry of all the other components"""
+
     from shapely.ops import unary_union
     from matplotlib import pyplot as plt
     import geopandas as gpd
@@ -153,16 +154,9 @@ class RouteAnchors(QRoute):
         Returns:
             bool: True is no obstacles
         """
-        # transform path to polygons
-        paths_converted = []
-        paths = self.design.components[component_name].qgeometry_table('path')
-        for _, row in paths.iterrows():
-            paths_converted.append(row['geometry'].buffer(
-                row['width'] / 2, cap_style=CAP_STYLE.flat))
-        # merge all the polygons
-        polygons = self.design.components[component_name].qgeometry_list('poly')
-        boundary = gpd.GeoSeries(unary_union(polygons + paths_converted))
-        boundary_coords = list(boundary.geometry.exterior[0].coords)
+        # contour of the merged polygons and paths, cached until the component changes
+        boundary_coords = self.design.qgeometry.spatial_index.get_outline(
+            self.design.components[component_name].id)
         if any(
                 intersecting(segment[0], segment[1], boundary_coords[i],
                              boundary_coords[i + 1])
@@ -183,12 +177,15 @@ class RouteAnchors(QRoute):
             bool: True is no obstacles
         """
 
-        # assumes rectangular bounding boxes
-        for component in self.design.components:
+        # only the components whose bounding box overlaps that of the segment
+        # can intersect it
+        spatial_index = self.design.qgeometry.spatial_index
+        for component_id in spatial_index.query(LineString(segment)):
+            component = self.design._components[component_id].name
             if component == self.name:
                 continue
-            xmin, ymin, xmax, ymax = self.design.components[
-                component].qgeometry_bounds()
+            # assumes rectangular bounding boxes
+            xmin, ymin, xmax, ymax = spatial_index.get_bounds(component_id)
             # p, q, r, s are corner coordinates of each bounding box
             p, q, r, s = [
                 np.array([xmin, ymin]),
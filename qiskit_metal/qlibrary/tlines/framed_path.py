@@ -45,6 +45,22 @@ class RouteFramed(QRoute):
 
     TOOLTIP = """A non-meandered basic CPW that is auto-generated between 2 components."""
 
+    def _get_build_fingerprint(self):
+        """Extend the fingerprint with the bounding boxes of the two
+        components connected by the CPW, which make uses to frame the
+        route."""
+        fingerprint = super()._get_build_fingerprint()
+        if fingerprint is None:
+            return None
+        try:
+            bounds = tuple(
+                tuple(self.design.components[
+                    pin_check.component].qgeometry_bounds())
+                for pin_check in self.options.pin_inputs.values())
+        except Exception:  # pylint: disable=broad-except
+            return None
+        return fingerprint + (bounds,)
+
     def make(self):
         """Use user-specified parameters and geometric orientation of
         components to determine whether the CPW connecting the pins on either
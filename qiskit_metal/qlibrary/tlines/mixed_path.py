@@ -55,6 +55,7 @@ class RouteMixed(RoutePathfinder, RouteMeander):
 
     RoutePathfinder Default Options:
         * step_size: '0.25mm' -- Length of the step for the A* pathfinding algorithm
+        * engine: 'astar' -- 'astar' or 'grid', the pathfinding engine
         * advanced: Dict
             * avoid_collision: 'true' -- true/false, defines if the route needs to avoid collisions.  Defaults to 'true'.
 
@@ -199,6 +200,6 @@ class RouteMixed(RoutePathfinder, RouteMeander):
         if type_connect == "S":
             return self.connect_simple
         if type_connect == "PF":
-            return self.connect_astar_or_simple
+            return self.connect_pathfinder
         if type_connect == "M":
             return self.connect_meandered
@@ -14,6 +14,7 @@
 
 import heapq
 import numpy as np
+import shapely
 from qiskit_metal import Dict
 from qiskit_metal.qlibrary.core import QRoutePoint
 from .anchored_path import RouteAnchors
@@ -40,11 +41,15 @@ class RoutePathfinder(RouteAnchors):
 
     Default Options:
         * step_size: '0.25mm' -- Length of the step for the A* pathfinding algorithm
+        * engine: 'astar' -- 'astar' or 'grid'. The 'grid' engine maps the obstacles onto a
+          grid of pitch step_size once, and runs A* on that grid, see connect_grid_or_simple.
+          Much faster on large designs.
         * advanced: Dict
             * avoid_collision: 'true' -- true/false, defines if the route needs to avoid collisions
     """
 
     default_options = Dict(step_size='0.25mm',
+                           engine='astar',
                            advanced=Dict(avoid_collision='true'))
     """Default options"""
 
@@ -158,6 +163,281 @@ class RoutePathfinder(RouteAnchors):
         return [
         ]  # Shouldn't actually reach here - if it fails, there's a convergence issue
 
+    # Unit displacements of the grid engine, and direction index of each
+    _GRID_MOVES = np.array([[1, 0], [-1, 0], [0, 1], [0, -1]])
+
+    def connect_pathfinder(self, start_pt: QRoutePoint,
+                           end_pt: QRoutePoint) -> list:
+        """Connect start and end with the engine selected by options.engine.
+
+        Args:
+            start_pt (QRoutePoint): QRoutePoint of the start
+            end_pt (QRoutePoint): QRoutePoint of the end
+
+        Returns:
+            List of vertices of a CPW going from start to end
+        """
+        engine = self.parse_options().engine
+        if engine == 'grid':
+            return self.connect_grid_or_simple(start_pt, end_pt)
+        if engine != 'astar':
+            self.logger.warning(
+                f'Unknown engine="{engine}" for component={self.name}. '
+                'Using engine="astar" instead.')
+        return self.connect_astar_or_simple(start_pt, end_pt)
+
+    def _get_grid_occupancy(self, origin: np.ndarray, step_size: float,
+                            index_min: np.ndarray, shape: tuple) -> tuple:
+        """Map the obstacles onto the edges of a grid of nodes.
+
+        The nodes are at origin + step_size * (index_min + (i, j)). An edge between two
+        adjacent nodes is blocked if it intersects the outline of any other component,
+        the same test as `unobstructed`.
+
+        Args:
+            origin (np.ndarray): Coordinates of the node with index -index_min
+            step_size (float): Pitch of the grid
+            index_min (np.ndarray): Offset of the grid indices
+            shape (tuple): Number of nodes along x and y
+
+        Returns:
+            tuple: Boolean arrays of the blocked edges along x, of shape (nx-1, ny),
+            and along y, of shape (nx, ny-1)
+        """
+        xs = origin[0] + step_size * (index_min[0] + np.arange(shape[0]))
+        ys = origin[1] + step_size * (index_min[1] + np.arange(shape[1]))
+        nodes = np.stack(np.meshgrid(xs, ys, indexing='ij'), axis=-1)
+        region = shapely.box(xs[0], ys[0], xs[-1], ys[-1])
+
+        spatial_index = self.design.qgeometry.spatial_index
+        outlines = []
+        for component_id in spatial_index.query(region):
+            if self.design._components[component_id].name == self.name:
+                continue
+            try:
+                outline = spatial_index.get_outline(component_id)
+            except AttributeError:
+                # Not a single polygon, fall back on the bounding box.
+                outline = shapely.box(
+                    *spatial_index.get_bounds(component_id)).exterior.coords
+            outlines.append(shapely.linestrings(outline))
+        tree = shapely.STRtree(outlines)
+
+        blocked = []
+        for starts, ends in [(nodes[:-1, :], nodes[1:, :]),
+                             (nodes[:, :-1], nodes[:, 1:])]:
+            edges = shapely.linestrings(
+                np.stack([starts, ends], axis=-2).reshape(-1, 2, 2))
+            is_blocked = np.zeros(len(edges), dtype=bool)
+            is_blocked[tree.query(edges, predicate='intersects')[0]] = True
+            blocked.append(is_blocked.reshape(starts.shape[:2]))
+        return tuple(blocked)
+
+    def _search_grid(self, start_pt: QRoutePoint, end_pt: QRoutePoint,
+                     step_size: float, low: np.ndarray,
+                     high: np.ndarray) -> list:
+        """A* from start to end, on a grid of pitch step_size aligned to the start,
+        covering the box from low to high plus two steps.
+
+        The states are (i, j, direction of arrival), where (i, j) are the indices of
+        the node relative to the start, and direction is the index of the move in
+        _GRID_MOVES, or 4 for the start direction.  Turns are penalized by one
+        step_size.  The cost and parent of the states are only kept for the states
+        reached.
+
+        Args:
+            start_pt (QRoutePoint): QRoutePoint of the start
+            end_pt (QRoutePoint): QRoutePoint of the end
+            step_size (float): Pitch of the grid
+            low (np.ndarray): Lower corner of the box to cover
+            high (np.ndarray): Upper corner of the box to cover
+
+        Returns:
+            list: States from the start to the end, or None if no path was found.
+        """
+        start_direction = start_pt.direction
+        start = start_pt.position
+        end_direction = end_pt.direction
+        end = end_pt.position
+
+        index_min = np.floor((low - start) / step_size).astype(int) - 2
+        index_max = np.ceil((high - start) / step_size).astype(int) + 2
+        nx, ny = index_max - index_min + 1
+        blocked_x, blocked_y = self._get_grid_occupancy(start, step_size,
+                                                        index_min, (nx, ny))
+
+        # A* over the states (node, direction of arrival), with the node indices
+        # of the grid.  Direction 4 is the start direction.
+        start_node = -index_min
+        goal_node = np.rint((end - start) / step_size).astype(int)
+        if end_direction is not None and mao.dot(
+                end_direction, start + step_size * goal_node - end) < 0:
+            # Approach the end from the side it faces, not from behind
+            goal_node += np.sign(np.round(end_direction, 9)).astype(int)
+        goal_node = tuple(np.clip(goal_node - index_min, 0, [nx - 1, ny - 1]))
+        moves = self._GRID_MOVES
+        move_vectors = np.vstack(
+            [moves, [start_direction / np.linalg.norm(start_direction)]])
+        # For each direction of arrival, the moves allowed and whether they turn
+        dots = np.round(move_vectors @ moves.T, 9)
+        allowed_moves = [[(new_direction, di, dj,
+                           dots[direction, new_direction] < 1)
+                          for new_direction, (di, dj) in enumerate(moves)
+                          if dots[direction, new_direction] >= 0]
+                         for direction in range(5)]
+
+        start_state = (int(start_node[0]), int(start_node[1]), 4)
+        cost = {start_state: 0}
+        parent = dict()
+        priority_queue = [(sum(abs(end - start)), 0, start_state)]
+        counter = 1
+        goal_state = None
+        while priority_queue:
+            _, _, state = heapq.heappop(priority_queue)
+            i, j, direction = state
+            if (i, j) == goal_node:
+                goal_state = state
+                break
+            for new_direction, di, dj, turn in allowed_moves[direction]:
+                new_i, new_j = i + di, j + dj
+                if not (0 <= new_i < nx and 0 <= new_j < ny):
+                    continue
+                if di and blocked_x[min(i, new_i), j]:
+                    continue
+                if dj and blocked_y[i, min(j, new_j)]:
+                    continue
+                new_cost = cost[state] + step_size
+                if turn:
+                    # Turn penalty
+                    new_cost += step_size
+                new_state = (new_i, new_j, new_direction)
+                if new_cost < cost.get(new_state, np.inf):
+                    cost[new_state] = new_cost
+                    parent[new_state] = state
+                    position = start + step_size * (np.array([new_i, new_j]) -
+                                                    start_node)
+                    heapq.heappush(priority_queue,
+                                   (new_cost + sum(abs(end - position)),
+                                    counter, new_state))
+                    counter += 1
+
+        if goal_state is None:
+            return None
+
+        # Walk back the parent pointers
+        states = [goal_state]
+        while states[-1] != start_state:
+            states.append(parent[states[-1]])
+        states.reverse()
+        return [(i - start_node[0], j - start_node[1], direction)
+                for i, j, direction in states]
+
+    def connect_grid_or_simple(self, start_pt: QRoutePoint,
+                               end_pt: QRoutePoint) -> list:
+        """Connect start and end via A* on an occupancy grid if
+        connect_simple doesn't work.
+
+        The obstacles are mapped onto a grid of pitch step_size aligned to the
+        start, see `_get_grid_occupancy`, and A* runs on the grid, see `_search_grid`.
+        The grid covers the start and the end plus a margin, which is doubled while
+        no path is found, up to the bounds of all the components. The path found is
+        then shortened with the first of its nodes from which connect_simple reaches
+        the end, and its segments are verified with `unobstructed`.
+
+        Args:
+            start_pt (QRoutePoint): QRoutePoint of the start
+            end_pt (QRoutePoint): QRoutePoint of the end
+
+        Returns:
+            List of vertices of a CPW going from start to end
+        """
+        start_direction = start_pt.direction
+        start = start_pt.position
+        end_direction = end_pt.direction
+        end = end_pt.position
+
+        step_size = self.parse_options().step_size
+
+        def try_simple(position, direction):
+            try:
+                simple_path = self.connect_simple(
+                    QRoutePoint(position, direction),
+                    QRoutePoint(end, end_direction))
+            except QiskitMetalDesignError:
+                return None
+            # connect_simple does not check straight connections
+            points = [position] + list(simple_path) + [end]
+            if all(
+                    self.unobstructed([points[num], points[num + 1]])
+                    for num in range(len(points) - 1)):
+                return simple_path
+            return None
+
+        simple_path = try_simple(start, start_direction)
+        if simple_path is not None:
+            return [start] + list(simple_path)
+
+        # Grid covering the start and the end, plus a margin.  The margin is grown
+        # while no path is found, until the grid covers all the components.
+        bounds = [start, end]
+        spatial_index = self.design.qgeometry.spatial_index
+        for component_id in spatial_index.query(
+                shapely.box(-np.inf, -np.inf, np.inf, np.inf)):
+            bounds.extend(
+                np.reshape(spatial_index.get_bounds(component_id), (2, 2)))
+        bounds = np.array(bounds)
+        design_min, design_max = bounds.min(axis=0), bounds.max(axis=0)
+        margin = max(np.max(np.abs(end - start)) / 2, 4 * step_size)
+        while True:
+            low = np.maximum(np.minimum(start, end) - margin, design_min)
+            high = np.minimum(np.maximum(start, end) + margin, design_max)
+            states = self._search_grid(start_pt, end_pt, step_size, low, high)
+            if states is not None or (all(low <= design_min) and
+                                      all(high >= design_max)):
+                break
+            margin *= 2
+
+        if states is None:
+            self.logger.warning(
+                f'The grid engine found no path for component={self.name}.'
+                ' Using engine="astar" instead.')
+            return self.connect_astar_or_simple(start_pt, end_pt)
+
+        move_vectors = np.vstack([
+            self._GRID_MOVES,
+            [start_direction / np.linalg.norm(start_direction)]
+        ])
+        nodes = [start + step_size * np.array(state[:2]) for state in states]
+
+        path = None
+        for num, node in enumerate(nodes):
+            if sum(abs(end - node)) < 10**-8:
+                # Destination has been reached within acceptable error tolerance.
+                # Replace the node with end since they're basically the same
+                nodes, path = nodes[:num] + [end], []
+                break
+            simple_path = try_simple(node, move_vectors[states[num][2]])
+            if simple_path is not None:
+                nodes, path = nodes[:num + 1], list(simple_path)
+                break
+
+        # Keep only the corners of the grid part of the path, and verify it
+        corners = [nodes[0]]
+        for num in range(1, len(nodes) - 1):
+            if states[num][2] != states[num + 1][2]:
+                corners.append(nodes[num])
+        if len(nodes) > 1:
+            corners.append(nodes[-1])
+        if path is None or not all(
+                self.unobstructed([corners[num], corners[num + 1]])
+                for num in range(len(corners) - 1)):
+            self.logger.warning(
+                f'The grid engine could not reach the end for component={self.name}.'
+                ' Using engine="astar" instead.')
+            return self.connect_astar_or_simple(start_pt, end_pt)
+
+        return corners + path
+
     def make(self):
         """Generates path from start pin to end pin."""
         p = self.parse_options()
@@ -173,14 +453,14 @@ class RoutePathfinder(RouteAnchors):
 
         self.intermediate_pts = OrderedDict()
         for arc_num, coord in anchors.items():
-            arc_pts = self.connect_astar_or_simple(self.get_tip(),
-                                                   QRoutePoint(coord))
+            arc_pts = self.connect_pathfinder(self.get_tip(),
+                                              QRoutePoint(coord))
             if arc_pts is None:
                 self.intermediate_pts[arc_num] = [coord]
             else:
                 self.intermediate_pts[arc_num] = np.concatenate(
                     [arc_pts, [coord]], axis=0)
-        arc_pts = self.connect_astar_or_simple(self.get_tip(), end_point)
+        arc_pts = self.connect_pathfinder(self.get_tip(), end_point)
         if arc_pts is not None:
             self.intermediate_pts[len(anchors)] = np.array(arc_pts)
 
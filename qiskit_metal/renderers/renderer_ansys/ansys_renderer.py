@@ -34,6 +34,7 @@ from pyEPR.ansys import parse_units, HfssApp, release
 from qiskit_metal.draw.utility import to_vec3D
 from qiskit_metal.draw.basic import is_rectangle
 from qiskit_metal.renderers.renderer_base import QRendererAnalysis
+from qiskit_metal.renderers.renderer_metadata import ansys_element_table_data
 from qiskit_metal.toolbox_metal.parsing import is_true
 from qiskit_metal.designs.design_base import QDesign
 
@@ -217,15 +218,9 @@ class QAnsysRenderer(QRendererAnalysis):
     # Keeping this as a cls dict so could be edited before renderer is instantiated.
     # To update component.options junction table.
 
-    element_table_data = dict(
-        path=dict(wire_bonds=False),
-        junction=dict(
-            inductance=default_options["Lj"],
-            capacitance=default_options["Cj"],
-            resistance=default_options["_Rj"],
-            mesh_kw_jj=parse_units(default_options["max_mesh_length_jj"]),
-        ),
-    )
+    # Kept in renderer_metadata, so that a design can add the columns
+    # without importing this module.
+    element_table_data = ansys_element_table_data
     """Element table data."""
 
     def __init__(self, design: "QDesign", initiate=True, options: Dict = None):
@@ -18,6 +18,7 @@ from pyaedt import constants
 
 #from qiskit_metal.renderers.renderer_base import QRenderer
 from qiskit_metal.renderers.renderer_base import QRendererAnalysis
+from qiskit_metal.renderers.renderer_metadata import pyaedt_element_table_data
 
 #The below imports are for typecheck and will probably be removed if move to the open side.
 from qiskit_metal.designs import QDesign, is_design
@@ -112,12 +113,9 @@ class QPyaedt(QRendererAnalysis):
     # Keeping this as a cls dict so could be edited before renderer is instantiated.
     # To update component.options junction table.
 
-    element_table_data = dict(
-        path=dict(wire_bonds=False),
-        junction=dict(inductance=default_options["Lj"],
-                      capacitance=default_options["Cj"]),
-        #resistance=default_options["_Rj"]),
-    )
+    # Kept in renderer_metadata, so that a design can add the columns
+    # without importing this module.
+    element_table_data = pyaedt_element_table_data
     """Element table data."""
 
     @classmethod
@@ -1,11 +1,13 @@
 from typing import Union, Optional
+from concurrent.futures import ProcessPoolExecutor
+import copy
 import os
 import pandas as pd
 
 from qiskit_metal import Dict, draw
 from qiskit_metal.renderers.renderer_base import QRendererAnalysis
 from qiskit_metal.renderers.renderer_gmsh.gmsh_renderer import QGmshRenderer
-from qiskit_metal.renderers.renderer_elmer.elmer_runner import ElmerRunner
+from qiskit_metal.renderers.renderer_elmer.elmer_runner import ElmerRunner, run_elmer_case
 
 
 def load_capacitance_matrix_from_file(filename: str) -> pd.DataFrame:
@@ -440,6 +442,159 @@ class QElmerRenderer(QRendererAnalysis):
         if display_cap_matrix:
             return self.capacitance_matrix
 
+    def run_sweep(self,
+                  variants: list[dict],
+                  sweep_dir: str = "./sweep",
+                  num_workers: Optional[int] = None,
+                  elmersolver_mpi: Optional[str] = None,
+                  num_ranks: int = 1,
+                  render_options: Optional[dict] = None,
+                  setup_options: Optional[dict] = None) -> pd.DataFrame:
+        """Runs a capacitance simulation for each variant of the component
+        options, and collects the capacitance matrices.
+
+        Each variant is rendered and meshed with Gmsh, one after the other,
+        into its own folder, sweep_dir/variant_<i>.  ElmerGrid and ElmerSolver
+        are then run for all the variants on a pool of processes.  The options
+        of the components are restored at the end.
+
+        Example:
+
+        ```
+        variants = [dict(Q1=dict(pad_gap=gap)) for gap in ['20um', '30um']]
+        table = design.renderers.elmer.run_sweep(variants, num_workers=8)
+        ```
+
+        Args:
+            variants (list[dict]): Each variant is a dict with the names of
+                                    components as keys and the options to
+                                    update as values.
+            sweep_dir (str, optional): Directory for the folders of the
+                                        variants. Defaults to "./sweep".
+            num_workers (Optional[int], optional): Number of variants solved
+                                        at the same time. Defaults to None,
+                                        which uses the number of CPUs divided
+                                        by num_ranks.
+            elmersolver_mpi (Optional[str], optional): Path to the
+                                        ElmerSolver_mpi executable, used if
+                                        num_ranks > 1. Defaults to None.
+            num_ranks (int, optional): Number of MPI processes per variant.
+                                        Defaults to 1, which runs ElmerSolver
+                                        without MPI.
+            render_options (Optional[dict], optional): Arguments passed to
+                                        render_design. Defaults to None.
+            setup_options (Optional[dict], optional): Arguments passed to
+                                        add_solution_setup. Defaults to None.
+
+        Returns:
+            pd.DataFrame: One row per variant and pair of nets, with the
+            columns variant, one column per swept option named
+            <component>.<option>, net_1, net_2 and capacitance.
+        """
+        render_options = render_options or dict()
+        setup_options = setup_options or dict()
+        if num_workers is None:
+            num_workers = max(1, (os.cpu_count() or 1) // max(1, num_ranks))
+
+        meshfile = os.path.basename(self._options["mesh_file"])
+        sim_dir_name = os.path.basename(
+            os.path.normpath(self._options["simulation_dir"]))
+        sif_name = self._options["simulation_input_file"]
+        cap_matrix_name = self.default_setup["capacitance"][
+            "Capacitance_Matrix_Filename"]
+
+        # Render and mesh the variants, one at a time, since Gmsh holds a
+        # single model.
+        names = {name for variant in variants for name in variant}
+        original_options = {
+            name: copy.deepcopy(self.design.components[name].options)
+            for name in names
+        }
+        original_sim_dir = self._options["simulation_dir"]
+        cases = []
+        try:
+            for i, variant in enumerate(variants):
+                for name, options in variant.items():
+                    self.design.components[name].options.update(
+                        copy.deepcopy(options))
+                self.design.rebuild()
+
+                variant_dir = os.path.join(sweep_dir, f"variant_{i}")
+                os.makedirs(variant_dir, exist_ok=True)
+                self.render_design(**render_options)
+                self.gmsh.export_mesh(os.path.join(variant_dir, meshfile))
+
+                sim_dir = os.path.join(variant_dir, sim_dir_name)
+                self._options["simulation_dir"] = sim_dir
+                self._elmer_runner = ElmerRunner()
+                self.add_solution_setup(**setup_options)
+                cases.append((sim_dir, self.nets))
+        finally:
+            self._options["simulation_dir"] = original_sim_dir
+            for name, options in original_options.items():
+                self.design.components[name].options.clear()
+                self.design.components[name].options.update(options)
+            self.design.rebuild()
+
+        self.logger.info(f"Running ElmerGrid and ElmerSolver for "
+                         f"{len(cases)} variants on {num_workers} processes")
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = [
+                executor.submit(run_elmer_case,
+                                sim_dir,
+                                meshfile,
+                                sif_name,
+                                elmersolver_mpi=elmersolver_mpi,
+                                num_procs=num_ranks) for sim_dir, _ in cases
+            ]
+
+            tables = []
+            for i, (future, (sim_dir, nets)) in enumerate(zip(futures, cases)):
+                try:
+                    future.result()
+                    matrix = self._get_capacitance_matrix(
+                        os.path.join(sim_dir, cap_matrix_name), nets)
+                except Exception as error:  # pylint: disable=broad-except
+                    self.logger.error(f"Variant {i} failed: {error}")
+                    continue
+
+                table = matrix.stack().rename_axis(
+                    ["net_1", "net_2"]).reset_index(name="capacitance")
+                for column, value in reversed(
+                        self._flatten_variant(variants[i]).items()):
+                    table.insert(0, column, [value] * len(table))
+                table.insert(0, "variant", i)
+                tables.append(table)
+
+        if not tables:
+            return pd.DataFrame(
+                columns=["variant", "net_1", "net_2", "capacitance"])
+        return pd.concat(tables, ignore_index=True)
+
+    @staticmethod
+    def _flatten_variant(variant: dict) -> dict:
+        """Flatten the nested options of a sweep variant.
+
+        Args:
+            variant (dict): Component names as keys, options as values.
+
+        Returns:
+            dict: Keys are <component>.<option>, with nested options joined
+            by dots.
+        """
+        flat = dict()
+
+        def flatten(prefix: str, value):
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    flatten(f"{prefix}.{key}", item)
+            else:
+                flat[prefix] = value
+
+        for name, options in variant.items():
+            flatten(name, options)
+        return flat
+
     def save_capacitance_matrix(self, path: str):
         """Saves capacitance matrix to file.
 
@@ -448,12 +603,17 @@ class QElmerRenderer(QRendererAnalysis):
         """
         self.capacitance_matrix.to_csv(path, sep=' ', header=True)
 
-    def _get_capacitance_matrix(self, filename: str) -> pd.DataFrame:
+    def _get_capacitance_matrix(self,
+                                filename: str,
+                                nets: Optional[dict] = None) -> pd.DataFrame:
         """Reads SPICE capacitance matrix file generated by ElmerFEM, converts
         and returns Maxwell capacitance matrix
 
         Args:
             filename (str): Name of capacitance matrix file generated by ElmerFEM
+            nets (Optional[dict]): Nets of the simulation, used to name the
+                                    rows and columns. Defaults to None, which
+                                    uses self.nets.
 
         Returns:
              pd.DataFrame: Maxwell capacitance matrix
@@ -476,7 +636,8 @@ class QElmerRenderer(QRendererAnalysis):
         for i, s in enumerate(row_sum):
             df2[i][i] = -s
 
-        name_cap = {k: v[-1] for k, v in self.nets.items() if k != "gnd"}
+        nets = self.nets if nets is None else nets
+        name_cap = {k: v[-1] for k, v in nets.items() if k != "gnd"}
         df2.rename(index=name_cap, columns=name_cap, inplace=True)
 
         gnd_caps = -1 * df2.sum(axis=0)
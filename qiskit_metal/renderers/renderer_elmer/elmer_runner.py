@@ -566,14 +566,19 @@ class ElmerRunner:
                   encoding="utf-8") as f:
             subprocess.run(args, cwd=sim_dir, stdout=f, stderr=f)
 
-        mesh_dir = meshfile.split(".")[-2]
+        # ElmerGrid writes the mesh in a folder named after the mesh file,
+        # next to the mesh file, i.e. in the parent of sim_dir.
+        mesh_dir = os.path.join(sim_dir, "..", os.path.splitext(meshfile)[0])
         files = os.listdir(mesh_dir)
 
         if not os.path.exists(sim_dir):
             os.mkdir(sim_dir)
 
         for f in files:
-            if os.path.exists(os.path.join(sim_dir, f)):
+            if os.path.isdir(os.path.join(sim_dir, f)):
+                # Such as the partitioning.N folder of a partitioned mesh
+                shutil.rmtree(os.path.join(sim_dir, f))
+            elif os.path.exists(os.path.join(sim_dir, f)):
                 os.remove(os.path.join(sim_dir, f))
             shutil.move(os.path.join(mesh_dir, f), sim_dir)
         shutil.rmtree(mesh_dir)
@@ -605,37 +610,97 @@ class ElmerRunner:
             else:
                 elmersolver = "ElmerSolver"
 
-            args = [elmersolver, sif_file] + options
-            with open(os.path.join(sim_dir, "elmersolver.log"),
-                      "w+",
-                      encoding="utf=8") as f:
-                subprocess.run(args, cwd=sim_dir, stdout=f, stderr=f)
-
-            # for f in out_files:
-            #     out_file = os.path.join(sim_dir, f)
-            #     if os.path.exists(os.path.join(".", f)):
-            #         os.remove(os.path.join(".", f))
-            #     shutil.move(out_file, ".")
-
-    # def run_elmersolver_mpi(self,
-    #                     sim_dir: str,
-    #                     sif_file: str,
-    #                     elmersolver: str = None,
-    #                     num_procs: int = 8,
-    #                     options: list = []):
-
-    #     os_platform = platform.system()
-    #     if elmersolver is None:
-    #         # On Windows ElmerSolver.exe is not found once gmsh.initialize() was executed.
-    #         # Try to use abs-path instead.
-    #         if os_platform == 'Windows' and os.path.exists(
-    #                 "C:/Program Files/Elmer 9.0-Release/bin/ElmerSolver_mpi.exe"):
-    #             elmersolver = "C:/Program Files/Elmer 9.0-Release/bin/ElmerSolver_mpi.exe"
-    #         else:
-    #             elmersolver = "ElmerSolver_mpi"
-
-    #         # TODO: how to specify number of processes?
-    #         args = [elmersolver, sif_file] + options
-    #         with open(os.path.join(sim_dir, "elmersolver.log", "w+"),
-    #                   encoding="utf=8") as f:
-    #             subprocess.run(args, cwd=sim_dir, stdout=f, stderr=f)
+        args = [elmersolver, sif_file] + options
+        with open(os.path.join(sim_dir, "elmersolver.log"),
+                  "w+",
+                  encoding="utf=8") as f:
+            subprocess.run(args, cwd=sim_dir, stdout=f, stderr=f)
+
+        # for f in out_files:
+        #     out_file = os.path.join(sim_dir, f)
+        #     if os.path.exists(os.path.join(".", f)):
+        #         os.remove(os.path.join(".", f))
+        #     shutil.move(out_file, ".")
+
+    def run_elmersolver_mpi(self,
+                            sim_dir: str,
+                            sif_file: str,
+                            elmersolver: str = None,
+                            num_procs: int = 8,
+                            mpiexec: str = "mpirun",
+                            options: list = []):
+        """Function to run the MPI version of the ElmerSolver executable, on
+        a mesh partitioned by ElmerGrid into num_procs parts.
+
+        Args:
+            sim_dir (str): Directory for storing simulation data.
+            sif_file (str): Simulation Input File (SIF) path
+            elmersolver (str): Path to ElmerSolver_mpi executable (if not installed
+                                using the default procedure). Defaults to None.
+            num_procs (int): Number of MPI processes. Defaults to 8.
+            mpiexec (str): MPI launcher. Defaults to "mpirun".
+            options (list): ElmerSolver additional options.
+        """
+        os_platform = platform.system()
+        if elmersolver is None:
+            # On Windows ElmerSolver.exe is not found once gmsh.initialize() was executed.
+            # Try to use abs-path instead.
+            if os_platform == 'Windows' and os.path.exists(
+                    "C:/Program Files/Elmer 9.0-Release/bin/ElmerSolver_mpi.exe"
+            ):
+                elmersolver = "C:/Program Files/Elmer 9.0-Release/bin/ElmerSolver_mpi.exe"
+            else:
+                elmersolver = "ElmerSolver_mpi"
+
+        args = [mpiexec, "-np", str(num_procs), elmersolver, sif_file] + options
+        with open(os.path.join(sim_dir, "elmersolver.log"),
+                  "w+",
+                  encoding="utf=8") as f:
+            subprocess.run(args, cwd=sim_dir, stdout=f, stderr=f)
+
+
+def run_elmer_case(sim_dir: str,
+                   meshfile: str,
+                   sif_file: str,
+                   elmergrid: str = None,
+                   elmersolver: str = None,
+                   elmersolver_mpi: str = None,
+                   num_procs: int = 1,
+                   mpiexec: str = "mpirun") -> str:
+    """Run ElmerGrid and then ElmerSolver for a simulation whose SIF is
+    already written in sim_dir, and whose Gmsh mesh is in the parent of
+    sim_dir.  Used by QElmerRenderer.run_sweep, in worker processes, so each
+    case must have its own directory.
+
+    Args:
+        sim_dir (str): Directory for storing simulation data.
+        meshfile (str): Gmsh mesh file name, in the parent of sim_dir.
+        sif_file (str): Simulation Input File (SIF) name, in sim_dir.
+        elmergrid (str): Path to ElmerGrid executable. Defaults to None.
+        elmersolver (str): Path to ElmerSolver executable. Defaults to None.
+        elmersolver_mpi (str): Path to ElmerSolver_mpi executable, used
+                                when num_procs > 1. Defaults to None.
+        num_procs (int): Number of MPI processes.  The mesh is partitioned
+                            in as many parts.  Defaults to 1, which runs
+                            ElmerSolver without MPI.
+        mpiexec (str): MPI launcher. Defaults to "mpirun".
+
+    Returns:
+        str: sim_dir
+    """
+    runner = ElmerRunner()
+    if num_procs > 1:
+        runner.run_elmergrid(sim_dir,
+                             meshfile,
+                             elmergrid=elmergrid,
+                             options=["-metiskway",
+                                      str(num_procs)])
+        runner.run_elmersolver_mpi(sim_dir,
+                                   sif_file,
+                                   elmersolver=elmersolver_mpi,
+                                   num_procs=num_procs,
+                                   mpiexec=mpiexec)
+    else:
+        runner.run_elmergrid(sim_dir, meshfile, elmergrid=elmergrid)
+        runner.run_elmersolver(sim_dir, sif_file, elmersolver=elmersolver)
+    return sim_dir
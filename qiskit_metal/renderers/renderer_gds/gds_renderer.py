@@ -14,11 +14,13 @@
 """ This module has a QRenderer to export QDesign to a GDS file."""
 # pylint: disable=too-many-lines
 
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 from operator import itemgetter
+import hashlib
 from typing import TYPE_CHECKING
 #from typing import Dict as Dict_
-from typing import Tuple, Union
+from typing import Callable, Tuple, Union
 #from typing import List, Any, Iterable
 import math
 import os
@@ -33,7 +35,8 @@ import pandas as pd
 import numpy as np
 
 from qiskit_metal.renderers.renderer_base import QRenderer
-from qiskit_metal.renderers.renderer_gds.make_cheese import Cheesing
+from qiskit_metal.renderers.renderer_gds.make_cheese import Cheesing, cheese_booleans
+from qiskit_metal.renderers.renderer_metadata import gds_element_table_data
 from qiskit_metal.toolbox_metal.parsing import is_true
 from qiskit_metal import draw
 
@@ -43,6 +46,7 @@ from .. import config
 if not config.is_building_docs():
     from qiskit_metal.toolbox_python.utility_functions import can_write_to_path
     from qiskit_metal.toolbox_python.utility_functions import get_range_of_vertex_to_not_fillet
+    from qiskit_metal.toolbox_python.utility_functions import to_hashable
 
 if TYPE_CHECKING:
     # For linting typechecking, import modules that can't be loaded here under normal conditions.
@@ -51,6 +55,38 @@ if TYPE_CHECKING:
     from qiskit_metal.designs import QDesign
 
 
+def gds_boolean_not(elements_1: list, elements_2: list, layer: int,
+                    precision: float,
+                    max_points: int) -> Union[gdspy.PolygonSet, None]:
+    """The gdspy.boolean 'not' of the polygons of two lists of gdspy elements.
+
+    Defined at module level, so that it can run in a process pool.  See
+    QGDSRenderer._map_booleans().
+
+    Args:
+        elements_1 (list): gdspy elements to subtract from.
+        elements_2 (list): gdspy elements to subtract.
+        layer (int): Layer of the result.
+        precision (float): Used for gdspy.
+        max_points (int): Used for gdspy. GDSpy uses 199 as the default.
+
+    Returns:
+        Union[gdspy.PolygonSet, None]: The difference, None if it is empty.
+    """
+    all_polygons = []
+    for elements in (elements_1, elements_2):
+        a_cell = gdspy.Cell('BOOLEAN_OPERAND', exclude_from_current=True)
+        a_cell.add(elements)
+        all_polygons.append(a_cell.get_polygons())
+
+    return gdspy.boolean(all_polygons[0],
+                         all_polygons[1],
+                         'not',
+                         max_points=max_points,
+                         precision=precision,
+                         layer=layer)
+
+
 class QGDSRenderer(QRenderer):
     """Extends QRenderer to export GDS formatted files. The methods which a
     user will need for GDS export should be found within this class.
@@ -94,6 +130,9 @@ class QGDSRenderer(QRenderer):
         * junction_pad_overlap: '5um'
         * max_points: '199'
         * fabricate: 'False'
+        * num_workers: '1'
+        * hierarchical: 'False'
+        * streaming: 'False'
         * cheese: Dict
             * datatype: '100'
             * shape: '0'
@@ -257,6 +296,24 @@ class QGDSRenderer(QRenderer):
             view_in_file=Dict(main={1: True}),
         ),
 
+        # Number of processes used for the boolean operations of the ground
+        # plane, masks and cheesing, which are independent for every chip and
+        # layer.  With '1', they all run in this process.
+        num_workers='1',
+
+        # If true, the QComponents of the same class, with the same options
+        # apart from pos_x, pos_y and orientation, and the same geometry, are
+        # each placed as a reference to one cell per layer.  Only used for
+        # the geometries which are not subtracted from the ground, of layers
+        # with a positive mask.  The ground is still computed from the
+        # flattened geometry.
+        hierarchical='False',
+
+        # If true, export_to_gds() builds and writes one chip at a time,
+        # using a gdspy.GdsWriter, so that self.lib never holds more than one
+        # chip.  Afterwards, self.lib only holds the TOP cell.
+        streaming='False',
+
         # (float): Scale box of components to render.
         # Should be greater than 1.0.  For benefit of the GUI, keep this the
         # last entry in the dict.  GUI shows a note regarding bound_box.
@@ -286,9 +343,9 @@ class QGDSRenderer(QRenderer):
     # Keeping this as a cls dict so could be edited before renderer is
     # instantiated.  To update component.options junction table.
 
-    element_table_data = dict(
-        # Cell_name must exist in gds file with: path_filename
-        junction=dict(cell_name='my_other_junction'))
+    # Kept in renderer_metadata, so that a design can add the columns
+    # without importing this module.
+    element_table_data = gds_element_table_data
     """Element table data"""
 
     def __init__(self,
@@ -322,6 +379,17 @@ class QGDSRenderer(QRenderer):
         # Updated each time export_to_gds() is called.
         self.chip_info = dict()
 
+        # Kept between calls of export_to_gds(), so that only the changed
+        # QComponents are converted again.  See _convert_layer_with_cache().
+        self._gds_cache = dict()
+        self._gds_cache_options = None
+        self._mask_boolean_cache = dict()
+
+        # When streaming, the tables of each chip are only converted to gdspy
+        # when the chip is written.  See _write_gds_by_chip().
+        # i.e. self._ground_plane_tables[chip_name] = (subtracts, no_subtracts)
+        self._ground_plane_tables = dict()
+
         # check the scale
         self._check_bounding_box_scale()
 
@@ -658,8 +726,12 @@ class QGDSRenderer(QRenderer):
                         f' using the size calculated from QGeometry, '
                         f'({max_bound}) will be used. ')
             if is_true(self.options.ground_plane):
-                self._handle_ground_plane(chip_name, all_table_subtracts,
-                                          all_table_no_subtracts)
+                if is_true(self.options.streaming):
+                    self._ground_plane_tables[chip_name] = (
+                        all_table_subtracts, all_table_no_subtracts)
+                else:
+                    self._handle_ground_plane(chip_name, all_table_subtracts,
+                                              all_table_no_subtracts)
 
         return 0
 
@@ -674,59 +746,177 @@ class QGDSRenderer(QRenderer):
         segments get fillet'ed.  Add the multiple LINESTRINGS back to table.
         Also remove "bad" LINESTRING from table.
 
-        Then use _qgeometry_to_gds() to convert the QGeometry elements to gdspy
-        elements.  The gdspy elements are placed in
+        Then use _qgeometry_table_to_gds() to convert the QGeometry elements
+        to gdspy elements.  The gdspy elements are placed in
         self.chip_info[chip_name]['q_subtract_true'].
 
+        Both steps are cached for each QComponent, see
+        _convert_layer_with_cache().
+
         Args:
             chip_name (str): Chip_name that is being processed.
             all_table_subtracts (list): Add to self.chip_info by layer number.
             all_table_no_subtracts (list): Add to self.chip_info by layer number.
         """
 
-        fix_short_segments = self.parse_value(
-            self.options.short_segments_to_not_fillet)
+        fix_short_segments = is_true(
+            self.parse_value(self.options.short_segments_to_not_fillet))
+        conversion_options = self._get_conversion_options()
         all_layers = self.design.qgeometry.get_all_unique_layers(chip_name)
 
+        # The cached elements are only valid for the same options.
+        cache_options = (to_hashable(conversion_options), fix_short_segments)
+        if cache_options != self._gds_cache_options:
+            self._gds_cache.clear()
+            self._gds_cache_options = cache_options
+        # pylint: disable=protected-access
+        for key in [
+                key for key in self._gds_cache
+                if key[3] not in self.design._components
+        ]:
+            del self._gds_cache[key]
+
+        subtract_by_layer = self._partition_by_layer(all_table_subtracts,
+                                                     all_layers)
+        no_subtract_by_layer = self._partition_by_layer(all_table_no_subtracts,
+                                                        all_layers)
+
         for chip_layer in all_layers:
-            copy_subtract = []
-            copy_no_subtract = []
-            copy_subtract = deepcopy(all_table_subtracts)
-            copy_no_subtract = deepcopy(all_table_no_subtracts)
+            self._convert_layer_with_cache(chip_name, chip_layer, 'true',
+                                           subtract_by_layer[chip_layer],
+                                           fix_short_segments,
+                                           conversion_options)
+            self._convert_layer_with_cache(chip_name, chip_layer, 'false',
+                                           no_subtract_by_layer[chip_layer],
+                                           fix_short_segments,
+                                           conversion_options)
+
+    def _convert_layer_with_cache(self, chip_name: str, chip_layer: int,
+                                  subtract: str, table: geopandas.GeoDataFrame,
+                                  fix_short_segments: bool,
+                                  conversion_options: Dict):
+        """Place the rows of one chip and layer into
+        self.chip_info[chip_name][chip_layer][f'all_subtract_{subtract}'], and
+        their gdspy elements into [f'q_subtract_{subtract}'].
+
+        The rows of each QComponent, after the short segments are fixed, and
+        their gdspy elements are kept in self._gds_cache along with a hash of
+        the qgeometry of the QComponent.  Only the QComponents whose
+        qgeometry changed since the last export are fixed and converted again.
+        The hashes are placed in [f'qgeometry_hash_{subtract}'].
 
-            for item in copy_subtract:
-                item.drop(item.index[item['layer'] != chip_layer], inplace=True)
+        Args:
+            chip_name (str): Name of chip.
+            chip_layer (int): Layer of the chip.
+            subtract (str): Either 'true' or 'false'.
+            table (geopandas.GeoDataFrame): The rows of the qgeometry tables
+                        for the chip, layer and subtract.
+            fix_short_segments (bool): If the short segments of the fillet
+                        LineStrings should not be fillet'ed.
+            conversion_options (Dict): The options from
+                        _get_conversion_options().
+        """
+        # pylint: disable=too-many-arguments
+        layer_info = self.chip_info[chip_name][chip_layer]
+        table_key = f'all_subtract_{subtract}'
+
+        positions = table.groupby('component', sort=False).indices
+        hashes = self._get_qgeometry_hashes(table, positions)
+        layer_info[f'qgeometry_hash_{subtract}'] = tuple(hashes.items())
+
+        cache_keys = {
+            component: (chip_name, chip_layer, subtract, component)
+            for component in hashes
+        }
+        to_convert = [
+            component for component, a_hash in hashes.items()
+            if self._gds_cache.get(cache_keys[component], (None,))[0] != a_hash
+        ]
+        if to_convert:
+            layer_info[table_key] = table.iloc[np.concatenate(
+                [positions[component] for component in to_convert])]
+            if fix_short_segments:
+                self._fix_short_segments_within_table(chip_name, chip_layer,
+                                                      table_key)
+            rows = layer_info[table_key]
+
+            group_of = {
+                component: num for num, component in enumerate(to_convert)
+            }
+            gds_elements = self._qgeometry_table_to_gds_by_group(
+                rows, rows['component'].map(group_of).to_numpy(dtype=int),
+                len(to_convert), conversion_options)
+            fixed_positions = rows.groupby('component', sort=False).indices
+            for component, elements in zip(to_convert, gds_elements):
+                self._gds_cache[cache_keys[component]] = (
+                    hashes[component], rows.iloc[fixed_positions[component]],
+                    elements)
+
+        entries = [
+            self._gds_cache[cache_keys[component]] for component in hashes
+        ]
+        if entries:
+            layer_info[table_key] = pd.concat([entry[1] for entry in entries],
+                                              ignore_index=False)
+        else:
+            layer_info[table_key] = table
+        layer_info[f'q_subtract_{subtract}'] = [
+            element for entry in entries for element in entry[2]
+        ]
 
-            for item_no in copy_no_subtract:
-                item_no.drop(item_no.index[item_no['layer'] != chip_layer],
-                             inplace=True)
+    @staticmethod
+    def _get_qgeometry_hashes(table: geopandas.GeoDataFrame,
+                              positions: dict) -> dict:
+        """Hash the qgeometry of each QComponent in the table: the geometry,
+        name, layer, width and fillet of its rows.
 
-            self.chip_info[chip_name][chip_layer][
-                'all_subtract_true'] = geopandas.GeoDataFrame(
-                    pd.concat(copy_subtract, ignore_index=False))
+        Args:
+            table (geopandas.GeoDataFrame): Rows of the qgeometry tables.
+            positions (dict): For each QComponent id, the positions of its
+                        rows in the table.
 
-            self.chip_info[chip_name][chip_layer][
-                'all_subtract_false'] = geopandas.GeoDataFrame(
-                    pd.concat(copy_no_subtract, ignore_index=False))
+        Returns:
+            dict: For each QComponent id, the hash of its rows.
+        """
+        wkb = shapely.to_wkb(np.asarray(table.geometry, dtype=object))
+        columns = [
+            column for column in ('name', 'layer', 'width', 'fillet')
+            if column in table.columns
+        ]
+        values = table[columns].to_numpy()
 
-            self.chip_info[chip_name][chip_layer][
-                'all_subtract_true'].reset_index(inplace=True)
-            self.chip_info[chip_name][chip_layer][
-                'all_subtract_false'].reset_index(inplace=True)
+        hashes = dict()
+        for component, rows in positions.items():
+            a_hash = hashlib.sha1(repr(values[rows].tolist()).encode())
+            for row in rows:
+                a_hash.update(wkb[row])
+            hashes[component] = a_hash.hexdigest()
+        return hashes
 
-            if is_true(fix_short_segments):
-                self._fix_short_segments_within_table(chip_name, chip_layer,
-                                                      'all_subtract_true')
-                self._fix_short_segments_within_table(chip_name, chip_layer,
-                                                      'all_subtract_false')
+    @staticmethod
+    def _partition_by_layer(tables: list, all_layers: list) -> dict:
+        """Concatenate the tables and split their rows by layer, in a single
+        groupby pass, rather than filtering a copy of every table for each
+        layer.
 
-            self.chip_info[chip_name][chip_layer][
-                'q_subtract_true'] = self.chip_info[chip_name][chip_layer][
-                    'all_subtract_true'].apply(self._qgeometry_to_gds, axis=1)
+        Args:
+            tables (list): The GeoDataFrames of one chip, either all subtract
+                           or all no-subtract.
+            all_layers (list): The layers used in the chip.
 
-            self.chip_info[chip_name][chip_layer][
-                'q_subtract_false'] = self.chip_info[chip_name][chip_layer][
-                    'all_subtract_false'].apply(self._qgeometry_to_gds, axis=1)
+        Returns:
+            dict: For each layer, a GeoDataFrame with the rows of the
+            tables on that layer.  The original index is kept in the 'index'
+            column.
+        """
+        all_rows = pd.concat(tables, ignore_index=False)
+        positions = all_rows.groupby('layer', sort=False).indices
+
+        by_layer = dict()
+        for chip_layer in all_layers:
+            rows = all_rows.iloc[positions.get(chip_layer, [])]
+            by_layer[chip_layer] = geopandas.GeoDataFrame(rows).reset_index()
+        return by_layer
 
     # Handling Fillet issues.
 
@@ -763,24 +953,24 @@ class QGDSRenderer(QRenderer):
                 if status > 0:
                     edit_index[index] = all_shapelys
 
-            df_copy = self.chip_info[chip_name][chip_layer][
-                all_sub_true_or_false].copy(deep=True)
+            # Replace each row with one row per shorter LineString,
+            # appended at the end of the table.
+            new_rows = []
             for del_key, the_shapes in edit_index.items():
-                # copy row "index" into a new data-frame "status" times.
-                # Then replace the LONG shapely with all_shapelys.
-                # For any entries in edit_index, edit table here.
-                orig_row = df_copy.loc[del_key].copy(deep=True)
-                df_copy = df_copy.drop(index=del_key)
-
-                for dummy_new_row, short_shape in the_shapes.items():
-                    orig_row['geometry'] = short_shape['line']
-                    orig_row['fillet'] = short_shape['fillet']
-                    # Keep ignore_index=False, otherwise,
-                    # the other del_key will not be found.
-                    df_copy = df_copy.append(orig_row, ignore_index=False)
+                rows = data_frame.loc[[del_key] * len(the_shapes)].copy()
+                rows['geometry'] = [
+                    short_shape['line'] for short_shape in the_shapes.values()
+                ]
+                rows['fillet'] = [
+                    short_shape['fillet']
+                    for short_shape in the_shapes.values()
+                ]
+                new_rows.append(rows)
 
             self.chip_info[chip_name][chip_layer][
-                all_sub_true_or_false] = df_copy.copy(deep=True)
+                all_sub_true_or_false] = pd.concat(
+                    [data_frame.drop(index=list(edit_index))] + new_rows,
+                    ignore_index=False)
 
     def _check_length(self, a_shapely: shapely.geometry.LineString,
                       a_fillet: float) -> Tuple[int, Dict]:
@@ -986,13 +1176,9 @@ class QGDSRenderer(QRenderer):
         all_idx_bad_fillet['reduced_idx'] = get_range_of_vertex_to_not_fillet(
             coords, a_fillet, qdesign_precision, add_endpoints=True)
 
-        midpoints = list()
-        midpoints = [
-            QGDSRenderer._midpoint_xy(coords[idx - 1][0], coords[idx - 1][1],
-                                      vertex2[0], vertex2[1])
-            for idx, vertex2 in enumerate(coords)
-            if idx > 0
-        ]
+        # Midpoint of every segment at once, same as _midpoint_xy.
+        xy_array = np.asarray(coords, dtype=float)[:, :2]
+        midpoints = list(map(tuple, ((xy_array[:-1] + xy_array[1:]) / 2)))
         all_idx_bad_fillet['midpoints'] = midpoints
 
     # Move data around to be useful for GDS
@@ -1220,16 +1406,28 @@ class QGDSRenderer(QRenderer):
 
         return code
 
-    def _populate_cheese(self):
+    def _populate_cheese(self, chip_names: list = None):
         """Iterate through each chip, then layer to determine the cheesing
-        geometry."""
+        geometry.
+
+        The booleans of the cheesing are independent for every chip and
+        layer, so they run in a process pool when options.num_workers is
+        more than one.  The cells are then added to self.lib in order.
+
+        Args:
+            chip_names (list): Names of the chips to process.  Defaults to
+                               None, for all the chips in self.chip_info.
+        """
 
         # lib = self.lib
+        if chip_names is None:
+            chip_names = list(self.chip_info)
         cheese_sub_layer = int(self.parse_value(self.options.cheese.datatype))
         nocheese_sub_layer = int(
             self.parse_value(self.options.no_cheese.datatype))
 
-        for chip_name in self.chip_info:
+        all_cheese = []
+        for chip_name in chip_names:
             layers_in_chip = self.design.qgeometry.get_all_unique_layers(
                 chip_name)
 
@@ -1240,14 +1438,26 @@ class QGDSRenderer(QRenderer):
                     if status == 0:
                         minx, miny, maxx, maxy = chip_box
 
-                        self._cheese_based_on_shape(minx, miny, maxx, maxy,
-                                                    chip_name, chip_layer,
-                                                    cheese_sub_layer,
-                                                    nocheese_sub_layer)
+                        a_cheese = self._cheese_based_on_shape(
+                            minx, miny, maxx, maxy, chip_name, chip_layer,
+                            cheese_sub_layer, nocheese_sub_layer)
+                        if a_cheese is not None:
+                            all_cheese.append(a_cheese)
 
-    def _cheese_based_on_shape(self, minx: float, miny: float, maxx: float,
-                               maxy: float, chip_name: str, chip_layer: int,
-                               cheese_sub_layer: int, nocheese_sub_layer: int):
+        all_arguments = [a_cheese.prepare_cheesing() for a_cheese in all_cheese]
+        to_cheese = [
+            index for index, arguments in enumerate(all_arguments)
+            if arguments is not None
+        ]
+        all_booleans = self._map_booleans(
+            cheese_booleans, [all_arguments[index] for index in to_cheese])
+        for index, booleans in zip(to_cheese, all_booleans):
+            all_cheese[index].finish_cheesing(booleans)
+
+    def _cheese_based_on_shape(
+            self, minx: float, miny: float, maxx: float, maxy: float,
+            chip_name: str, chip_layer: int, cheese_sub_layer: int,
+            nocheese_sub_layer: int) -> Union[Cheesing, None]:
         """Instantiate class to do cheesing.
 
         Args:
@@ -1261,6 +1471,10 @@ class QGDSRenderer(QRenderer):
                     sub-layer number for where to place the cheese output.
             nocheese_sub_layer (int): User defined datatype, considered a
                     sub-layer number for where to place the NO_cheese output.
+
+        Returns:
+            Union[Cheesing, None]: The cheesing of the chip and layer, which
+            is not applied yet.  None if the cheese shape is unknown.
         """
         # pylint: disable=too-many-locals
         # pylint: disable=too-many-arguments
@@ -1332,10 +1546,9 @@ class QGDSRenderer(QRenderer):
                 f'The cheese_shape={cheese_shape} is unknown in QGDSRenderer.')
             a_cheese = None
 
-        if a_cheese is not None:
-            dummy_a_lib = a_cheese.apply_cheesing()
+        return a_cheese
 
-    def _populate_no_cheese(self):
+    def _populate_no_cheese(self, chip_names: list = None):
         """Iterate through every chip and layer.  If options choose to have
         either cheese or no-cheese, a MultiPolygon is placed
         self.chip_info[chip_name][chip_layer]['no_cheese'].
@@ -1344,9 +1557,15 @@ class QGDSRenderer(QRenderer):
         cell with no-cheese at
         f'TOP_{chip_name}_{chip_layer}_NoCheese_{sub_layer}'.  The sub_layer
         is data_type and denoted in the options.
+
+        Args:
+            chip_names (list): Names of the chips to process.  Defaults to
+                               None, for all the chips in self.chip_info.
         """
 
         # pylint: disable=too-many-nested-blocks
+        if chip_names is None:
+            chip_names = list(self.chip_info)
 
         no_cheese_buffer = float(self.parse_value(
             self.options.no_cheese.buffer))
@@ -1355,7 +1574,7 @@ class QGDSRenderer(QRenderer):
 
         fab = is_true(self.options.fabricate)
 
-        for chip_name, _ in self.chip_info.items():
+        for chip_name in chip_names:
             layers_in_chip = self.design.qgeometry.get_all_unique_layers(
                 chip_name)
 
@@ -1499,19 +1718,21 @@ class QGDSRenderer(QRenderer):
 
         return layers_in_chip, rectangle_points
 
-    def _populate_poly_path_for_export(self):
+    def _populate_poly_path_for_export(self, chip_names: list = None):
         """Using the geometries for each table name in QGeometry, populate
-        self.lib to eventually write to a GDS file.
+        a new self.lib to eventually write to a GDS file.
 
         For every layer within a chip, use the same "subtraction box" for the
         elements that have subtract as true.  Every layer within a chip will
         have cell named:  f'TOP_{chip_name}_{chip_layer}'.
 
         Args:
-            file_name (str): The path and file name to write the gds file.
-                             Name needs to include desired extension,
-                             i.e. "a_path_and_name.gds".
+            chip_names (list): Names of the chips to place in self.lib.
+                               Defaults to None, for all the chips in
+                               self.chip_info.
         """
+        if chip_names is None:
+            chip_names = list(self.chip_info)
 
         precision = float(self.parse_value(self.options.precision))
         max_points = int(self.parse_value(self.options.max_points))
@@ -1519,21 +1740,26 @@ class QGDSRenderer(QRenderer):
         lib = self.new_gds_library()
 
         if is_true(self.options.ground_plane):
+            self._populate_mask_booleans(precision, max_points, chip_names)
+
             all_chips_top_name = 'TOP'
             all_chips_top = lib.new_cell(all_chips_top_name,
                                          overwrite_duplicate=True)
-            for chip_name, _ in self.chip_info.items():
+            for chip_name in chip_names:
                 chip_only_top_name = f'TOP_{chip_name}'
                 chip_only_top = lib.new_cell(chip_only_top_name,
                                              overwrite_duplicate=True)
 
-                layers_in_chip, rectangle_points = self._get_rectangle_points(
+                layers_in_chip = self.design.qgeometry.get_all_unique_layers(
                     chip_name)
 
+                if is_true(self.options.hierarchical):
+                    self.chip_info[chip_name]['repeated_qcomponents'] = \
+                        self._find_repeated_qcomponents(chip_name)
+
                 for chip_layer in layers_in_chip:
                     self._handle_photo_resist(lib, chip_only_top, chip_name,
-                                              chip_layer, rectangle_points,
-                                              precision, max_points)
+                                              chip_layer)
 
                 # If junction table, import the cell and cell to chip_only_top
                 if 'junction' in self.chip_info[chip_name]:
@@ -1547,35 +1773,113 @@ class QGDSRenderer(QRenderer):
                 else:
                     lib.remove(chip_only_top)
 
+    def _populate_mask_booleans(self,
+                                precision: float,
+                                max_points: int,
+                                chip_names: list = None):
+        """Compute the boolean of the positive or negative mask of every chip
+        and layer, which has subtract geometries, and place it in
+        self.chip_info[chip_name][chip_layer]['mask_boolean'].
+
+        The booleans are independent of each other, so they run in a process
+        pool when options.num_workers is more than one.  The boolean of a
+        layer is reused from the last export if none of its QComponents
+        changed, see _convert_layer_with_cache().
+
+        Args:
+            precision (float): Used for gdspy.
+            max_points (int): Used for gdspy. GDSpy uses 199 as the default.
+            chip_names (list): Names of the chips.  Defaults to None, for all
+                               the chips in self.chip_info.
+        """
+        if chip_names is None:
+            chip_names = list(self.chip_info)
+        keys = []
+        cache_keys = []
+        all_arguments = []
+        for chip_name in chip_names:
+            layers_in_chip, rectangle_points = self._get_rectangle_points(
+                chip_name)
+            for chip_layer in layers_in_chip:
+                layer_info = self.chip_info[chip_name][chip_layer]
+                layer_info['mask_boolean'] = None
+                if len(layer_info['q_subtract_true']) == 0:
+                    continue
+
+                is_negative = self._is_negative_mask(chip_name, chip_layer)
+                cache_key = (is_negative, tuple(rectangle_points), precision,
+                             max_points, self._gds_cache_options,
+                             layer_info['qgeometry_hash_true'],
+                             layer_info['qgeometry_hash_false']
+                             if is_negative else None)
+                cached = self._mask_boolean_cache.get((chip_name, chip_layer))
+                if cached is not None and cached[0] == cache_key:
+                    layer_info['mask_boolean'] = cached[1]
+                    continue
+
+                if is_negative:
+                    # Difference for True-False.
+                    elements_1 = layer_info['q_subtract_true']
+                    elements_2 = layer_info['q_subtract_false']
+                else:
+                    # Difference for the ground rectangle-True.
+                    elements_1 = [gdspy.Polygon(rectangle_points, chip_layer)]
+                    elements_2 = layer_info['q_subtract_true']
+                keys.append((chip_name, chip_layer))
+                cache_keys.append(cache_key)
+                all_arguments.append(
+                    (elements_1, elements_2, chip_layer, precision, max_points))
+
+        for (chip_name, chip_layer), cache_key, diff_geometry in zip(
+                keys, cache_keys,
+                self._map_booleans(gds_boolean_not, all_arguments)):
+            self.chip_info[chip_name][chip_layer][
+                'mask_boolean'] = diff_geometry
+            self._mask_boolean_cache[(chip_name, chip_layer)] = (cache_key,
+                                                                 diff_geometry)
+
+    def _map_booleans(self, function: Callable, all_arguments: list) -> list:
+        """Call the function with each of the arguments.  If
+        options.num_workers is more than one, the calls run in a pool of
+        processes, since gdspy booleans are single-threaded.
+
+        Args:
+            function (Callable): Defined at module level, so that it can be
+                                 sent to the processes.
+            all_arguments (list): A tuple of positional arguments per call.
+
+        Returns:
+            list: The results, in the order of all_arguments.
+        """
+        num_workers = int(self.parse_value(self.options.num_workers))
+        num_workers = min(num_workers, len(all_arguments))
+        if num_workers > 1:
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                return list(executor.map(function, *zip(*all_arguments)))
+        return [function(*arguments) for arguments in all_arguments]
+
     def _handle_photo_resist(self, lib: gdspy.GdsLibrary,
                              chip_only_top: gdspy.library.Cell, chip_name: str,
-                             chip_layer: int, rectangle_points: list,
-                             precision: float, max_points: int):
-        """Handle the positive vs negative mask.
+                             chip_layer: int):
+        """Handle the positive vs negative mask.  The booleans are computed
+        beforehand, by _populate_mask_booleans().
 
         Args:
             lib (gdspy.GdsLibrary): The gdspy library to export.
             chip_only_top (gdspy.library.Cell): The gdspy cell for top.
             chip_name (str): Name of chip to render.
             chip_layer (int): Layer of the chip to render.
-            rectangle_points (list): The rectangle to denote the ground
-                                    for each layer.
-            precision (float): Used for gdspy.
-            max_points (int): Used for gdspy. GDSpy uses 199 as the default.
         """
 
-        self.chip_info[chip_name]['subtract_poly'] = gdspy.Polygon(
-            rectangle_points, chip_layer)
-
         ground_cell_name = f'TOP_{chip_name}_{chip_layer}'
         ground_cell = lib.new_cell(ground_cell_name, overwrite_duplicate=True)
 
         if self._is_negative_mask(chip_name, chip_layer):
             self._negative_mask(lib, chip_only_top, ground_cell, chip_name,
-                                chip_layer, precision, max_points)
+                                chip_layer)
         else:
             self._positive_mask(lib, chip_only_top, ground_cell, chip_name,
-                                chip_layer, precision, max_points)
+                                chip_layer)
 
     def _is_negative_mask(self, chip: str, layer: int) -> bool:
         """Check options to see if negative mask is requested for the
@@ -1598,7 +1902,7 @@ class QGDSRenderer(QRenderer):
     def _negative_mask(self, lib: gdspy.GdsLibrary,
                        chip_only_top: gdspy.library.Cell,
                        ground_cell: gdspy.library.Cell, chip_name: str,
-                       chip_layer: int, precision: float, max_points: int):
+                       chip_layer: int):
         """Apply logic for negative_mask.
 
         Args:
@@ -1607,35 +1911,12 @@ class QGDSRenderer(QRenderer):
             ground_cell (gdspy.library.Cell): Cell created for each layer.
             chip_name (str): Name of chip to render.
             chip_layer (int): Layer of the chip to render.
-            precision (float): Used for gdspy.
-            max_points (int): Used for gdspy. GDSpy uses 199 as the default.
         """
         if len(self.chip_info[chip_name][chip_layer]['q_subtract_true']) != 0:
 
-            # When subtract==True for chip and layer.
-            subtract_true_cell_name = f'SUBTRACT_true_{chip_name}_{chip_layer}'
-            subtract_true_cell = lib.new_cell(subtract_true_cell_name,
-                                              overwrite_duplicate=True)
-            subtract_true_cell.add(
-                self.chip_info[chip_name][chip_layer]['q_subtract_true'])
-
-            #When subtract==False for chip and layer.
-            subtract_false_cell_name = f'SUBTRACT_false_{chip_name}_{chip_layer}'
-            subtract_false_cell = lib.new_cell(subtract_false_cell_name,
-                                               overwrite_duplicate=True)
-            subtract_false_cell.add(
-                self.chip_info[chip_name][chip_layer]['q_subtract_false'])
-
-            # Difference for True-False.
-            diff_geometry = gdspy.boolean(subtract_true_cell.get_polygons(),
-                                          subtract_false_cell.get_polygons(),
-                                          'not',
-                                          max_points=max_points,
-                                          precision=precision,
-                                          layer=chip_layer)
-
-            lib.remove(subtract_true_cell)
-            lib.remove(subtract_false_cell)
+            # Difference for True-False, from _populate_mask_booleans().
+            diff_geometry = self.chip_info[chip_name][chip_layer][
+                'mask_boolean']
 
             if diff_geometry is None:
                 self.design.logger.warning(
@@ -1649,7 +1930,7 @@ class QGDSRenderer(QRenderer):
     def _positive_mask(self, lib: gdspy.GdsLibrary,
                        chip_only_top: gdspy.library.Cell,
                        ground_cell: gdspy.library.Cell, chip_name: str,
-                       chip_layer: int, precision: float, max_points: int):
+                       chip_layer: int):
         """Apply logic for positive mask.
 
         Args:
@@ -1658,31 +1939,12 @@ class QGDSRenderer(QRenderer):
             ground_cell (gdspy.library.Cell): Cell created for each layer.
             chip_name (str): Name of chip to render.
             chip_layer (int): Layer of the chip to render.
-            precision (float): Used for gdspy.
-            max_points (int): Used for gdspy. GDSpy uses 199 as the default.
         """
         if len(self.chip_info[chip_name][chip_layer]['q_subtract_true']) != 0:
-            subtract_cell_name = f'SUBTRACT_{chip_name}_{chip_layer}'
-            subtract_cell = lib.new_cell(subtract_cell_name,
-                                         overwrite_duplicate=True)
-            subtract_cell.add(
-                self.chip_info[chip_name][chip_layer]['q_subtract_true'])
-
-            # gdspy.boolean() is not documented clearly.  If there are multiple
-            # elements to subtract (both poly & path), the way I could
-            # make it work is to put them into a cell, within lib. I used
-            # the method cell_name.get_polygons(), which appears to convert
-            # all elements within the cell to poly. After the boolean(),
-            # I deleted the cell from lib. The memory is freed up then.
-            diff_geometry = gdspy.boolean(
-                self.chip_info[chip_name]['subtract_poly'],
-                subtract_cell.get_polygons(),
-                'not',
-                max_points=max_points,
-                precision=precision,
-                layer=chip_layer)
-
-            lib.remove(subtract_cell)
+            # Difference for the ground rectangle minus the subtract
+            # geometries, from _populate_mask_booleans().
+            diff_geometry = self.chip_info[chip_name][chip_layer][
+                'mask_boolean']
 
             if diff_geometry is None:
                 self.design.logger.warning(
@@ -1695,6 +1957,7 @@ class QGDSRenderer(QRenderer):
                 ground_cell.add(gdspy.CellReference(ground_chip_layer))
 
         self._handle_q_subtract_false(chip_name, chip_layer, ground_cell)
+        self._add_repeated_qcomponents(lib, chip_name, chip_layer, ground_cell)
         QGDSRenderer._add_groundcell_to_chip_only_top(lib, chip_only_top,
                                                       ground_cell)
 
@@ -1712,12 +1975,188 @@ class QGDSRenderer(QRenderer):
             self.logger.warning(f'There is no table named '
                                 f'self.chip_info[{chip_name}][q_subtract_false]'
                                 f' to write.')
+        elif self.chip_info[chip_name].get('repeated_qcomponents'):
+            # The QComponents in repeated_qcomponents are added as
+            # references, by _add_repeated_qcomponents().
+            referenced = {
+                component
+                for group in self.chip_info[chip_name]['repeated_qcomponents']
+                for component in group.placements
+            }
+            for component, _ in self.chip_info[chip_name][chip_layer][
+                    'qgeometry_hash_false']:
+                if component not in referenced:
+                    ground_cell.add(self._gds_cache[(chip_name, chip_layer,
+                                                     'false', component)][2])
         else:
             if len(self.chip_info[chip_name][chip_layer]
                    ['q_subtract_false']) != 0:
                 ground_cell.add(
                     self.chip_info[chip_name][chip_layer]['q_subtract_false'])
 
+    def _add_repeated_qcomponents(self, lib: gdspy.GdsLibrary, chip_name: str,
+                                  chip_layer: int,
+                                  ground_cell: gdspy.library.Cell):
+        """For each group in self.chip_info[chip_name]['repeated_qcomponents'],
+        place the geometries of the layer in a new cell, and add a
+        reference to it at the position of every QComponent of the group.
+
+        Args:
+            lib (gdspy.GdsLibrary): The gdspy library to export.
+            chip_name (str): Name of chip to render.
+            chip_layer (int): Layer of the chip to render.
+            ground_cell (gdspy.library.Cell): The cell in lib to add to.
+                                            Cell created for each layer.
+        """
+        conversion_options = self._get_conversion_options()
+        for group in self.chip_info[chip_name].get('repeated_qcomponents', []):
+            if chip_layer not in group.local_rows:
+                continue
+            group_cell = lib.new_cell(f'{group.name}_{chip_name}_{chip_layer}',
+                                      overwrite_duplicate=True)
+            group_cell.add(
+                self._qgeometry_table_to_gds(group.local_rows[chip_layer],
+                                             conversion_options))
+            for pos_x, pos_y, orientation in group.placements.values():
+                ground_cell.add(
+                    gdspy.CellReference(group_cell,
+                                        origin=(pos_x, pos_y),
+                                        rotation=orientation))
+
+    def _find_repeated_qcomponents(self, chip_name: str) -> list:
+        """Find the QComponents of the chip which have the same class and
+        the same options apart from pos_x, pos_y and orientation.  The
+        geometries, which are not subtracted from the ground, of the
+        QComponents are moved back to pos_x=0, pos_y=0 and orientation=0,
+        and only the QComponents whose geometries are then the same are
+        grouped.
+
+        Returns:
+            list: One Dict per group of at least two QComponents, with keys
+            name, the name of the cells of the group, local_rows, the rows
+            of the first QComponent of the group moved back to the origin
+            for each layer, and placements, the pos_x, pos_y and orientation
+            of each QComponent id in the group.
+        """
+        # pylint: disable=protected-access
+        tolerance = float(self.parse_value(self.options.precision))
+
+        # The rows of each QComponent, by layer.
+        rows_of = dict()
+        for chip_layer in self.design.qgeometry.get_all_unique_layers(
+                chip_name):
+            for component, _ in self.chip_info[chip_name][chip_layer][
+                    'qgeometry_hash_false']:
+                rows_of.setdefault(component, dict())[chip_layer] = \
+                    self._gds_cache[(chip_name, chip_layer, 'false',
+                                     component)][1]
+
+        candidates = dict()
+        placements = dict()
+        for component in rows_of:
+            qcomponent = self.design._components[component]
+            options = qcomponent.parse_options()
+            if not all(name in options
+                       for name in ('pos_x', 'pos_y', 'orientation')):
+                continue
+            placements[component] = (float(options.pos_x), float(options.pos_y),
+                                     float(options.orientation))
+            key = (type(qcomponent),
+                   to_hashable({
+                       name: value
+                       for name, value in options.items()
+                       if name not in ('pos_x', 'pos_y', 'orientation')
+                   }))
+            candidates.setdefault(key, []).append(component)
+
+        groups = []
+        for (qcomponent_class, _), components in candidates.items():
+            while len(components) > 1:
+                local_rows = self._move_rows_to_origin(
+                    rows_of[components[0]], placements[components[0]])
+                same = [components[0]]
+                different = []
+                for component in components[1:]:
+                    if self._are_same_rows(
+                            local_rows,
+                            self._move_rows_to_origin(rows_of[component],
+                                                      placements[component]),
+                            tolerance):
+                        same.append(component)
+                    else:
+                        different.append(component)
+                if len(same) > 1:
+                    groups.append(
+                        Dict(name=f'{qcomponent_class.__name__}_{len(groups)}',
+                             local_rows=local_rows,
+                             placements={
+                                 component: placements[component]
+                                 for component in same
+                             }))
+                components = different
+        return groups
+
+    @staticmethod
+    def _move_rows_to_origin(rows_by_layer: dict, placement: tuple) -> dict:
+        """Undo the translation by pos_x, pos_y and the rotation by
+        orientation of the geometry of the rows.
+
+        Args:
+            rows_by_layer (dict): For each layer, rows of the qgeometry tables.
+            placement (tuple): The pos_x, pos_y and orientation, in degrees.
+
+        Returns:
+            dict: For each layer, a copy of the rows with the moved geometry.
+        """
+        pos_x, pos_y, orientation = placement
+        angle = np.radians(orientation)
+        # Row vectors, rotated by -orientation.
+        rotation = np.array([[np.cos(angle), -np.sin(angle)],
+                             [np.sin(angle), np.cos(angle)]])
+
+        moved = dict()
+        for chip_layer, rows in rows_by_layer.items():
+            moved[chip_layer] = rows.copy()
+            moved[chip_layer]['geometry'] = shapely.transform(
+                np.asarray(rows.geometry, dtype=object), lambda coords:
+                (coords - (pos_x, pos_y)) @ rotation)
+        return moved
+
+    @staticmethod
+    def _are_same_rows(rows_by_layer_1: dict, rows_by_layer_2: dict,
+                       tolerance: float) -> bool:
+        """Check if two sets of rows, by layer, have the same geometry,
+        width and fillet.
+
+        Args:
+            rows_by_layer_1 (dict): For each layer, rows of the qgeometry
+                                    tables.
+            rows_by_layer_2 (dict): For each layer, rows of the qgeometry
+                                    tables.
+            tolerance (float): Largest difference of the coordinates.
+
+        Returns:
+            bool: True if the rows are the same.
+        """
+        if rows_by_layer_1.keys() != rows_by_layer_2.keys():
+            return False
+        for chip_layer, rows_1 in rows_by_layer_1.items():
+            rows_2 = rows_by_layer_2[chip_layer]
+            if len(rows_1) != len(rows_2):
+                return False
+            for column in ('width', 'fillet'):
+                if column in rows_1.columns and not np.array_equal(
+                        rows_1[column].to_numpy(dtype=float),
+                        rows_2[column].to_numpy(dtype=float),
+                        equal_nan=True):
+                    return False
+            if not shapely.equals_exact(
+                    np.asarray(rows_1.geometry, dtype=object),
+                    np.asarray(rows_2.geometry, dtype=object),
+                    tolerance=tolerance).all():
+                return False
+        return True
+
     @classmethod
     def _add_groundcell_to_chip_only_top(cls, lib: gdspy.GdsLibrary,
                                          chip_only_top: gdspy.library.Cell,
@@ -2130,6 +2569,10 @@ class QGDSRenderer(QRenderer):
         QGeometry element types of both "path" and "poly", will be used, to
         convert QGeometry to GDS formatted file.
 
+        The gdspy elements of each QComponent are kept by the renderer, so on
+        the next export only the QComponents whose QGeometry changed are
+        converted again.
+
         Args:
             file_name (str): File name which can also include directory path.
                              If the file exists, it will be overwritten.
@@ -2159,6 +2602,10 @@ class QGDSRenderer(QRenderer):
         self.imported_junction_gds = None
 
         if self._create_qgeometry_for_gds(highlight_qcomponents) == 0:
+            if is_true(self.options.streaming):
+                self._write_gds_by_chip(file_name)
+                return 1
+
             # Create self.lib and populate path and poly.
             self._populate_poly_path_for_export()
 
@@ -2179,6 +2626,73 @@ class QGDSRenderer(QRenderer):
 
         return 0
 
+    def _write_gds_by_chip(self, file_name: str):
+        """Convert and populate self.lib with one chip at a time, write the
+        cells of the chip to file_name, and then free them, before the next
+        chip.  The TOP cell, which references the cells of all the chips, is
+        written last.
+
+        The gdspy elements of the chip are also evicted from self._gds_cache,
+        so that only the geometry of one chip is held at a time.
+
+        A cell which has the name of a cell that was already written, such
+        as a junction cell imported for each chip, is not written again.
+
+        Args:
+            file_name (str): File name which can also include directory path.
+        """
+        writer = gdspy.GdsWriter(file_name,
+                                 unit=self.lib.unit,
+                                 precision=self.lib.precision)
+        written = set()
+        chips_top = []
+        try:
+            for chip_name in self.chip_info:
+                if chip_name in self._ground_plane_tables:
+                    self._handle_ground_plane(
+                        chip_name, *self._ground_plane_tables.pop(chip_name))
+
+                # The junctions are imported again into the new self.lib.
+                self.imported_junction_gds = None
+                self._populate_poly_path_for_export([chip_name])
+                self._populate_no_cheese([chip_name])
+                self._populate_cheese([chip_name])
+
+                if f'TOP_{chip_name}' in self.lib.cells:
+                    # Referenced by the TOP cell.  An empty cell with the
+                    # same name, so that the content of the chip is freed.
+                    chips_top.append(
+                        gdspy.Cell(f'TOP_{chip_name}',
+                                   exclude_from_current=True))
+                for cell_name, cell in self.lib.cells.items():
+                    if cell_name != 'TOP' and cell_name not in written:
+                        writer.write_cell(cell)
+                        written.add(cell_name)
+
+                # Free the geometry of the chip.
+                for chip_layer in self.design.qgeometry.get_all_unique_layers(
+                        chip_name):
+                    for key in ('mask_boolean', 'no_cheese', 'no_cheese_gds',
+                                'q_subtract_true', 'q_subtract_false',
+                                'all_subtract_true', 'all_subtract_false'):
+                        self.chip_info[chip_name][chip_layer].pop(key, None)
+                    self._mask_boolean_cache.pop((chip_name, chip_layer), None)
+                for key in [
+                        key for key in self._gds_cache if key[0] == chip_name
+                ]:
+                    del self._gds_cache[key]
+                self.new_gds_library()
+
+            if is_true(self.options.ground_plane):
+                all_chips_top = self.lib.new_cell('TOP',
+                                                  overwrite_duplicate=True)
+                for chip_top in chips_top:
+                    all_chips_top.add(gdspy.CellReference(chip_top))
+                writer.write_cell(all_chips_top)
+        finally:
+            self._ground_plane_tables.clear()
+            writer.close()
+
     def _multipolygon_to_gds(
             self, multi_poly: shapely.geometry.multipolygon.MultiPolygon,
             layer: int, data_type: int, no_cheese_buffer: float) -> list:
@@ -2241,13 +2755,21 @@ class QGDSRenderer(QRenderer):
         return all_gds
 
     def _qgeometry_to_gds(
-        self, qgeometry_element: pd.Series
+        self,
+        qgeometry_element: pd.Series,
+        conversion_options: Dict = None
     ) -> Union['gdspy.polygon', 'gdspy.FlexPath', None]:
         """Convert the design.qgeometry table to format used by GDS renderer.
         Convert the class to a series of GDSII elements.
 
+        To convert a whole table, use _qgeometry_table_to_gds(), which gives
+        the same polygons.
+
         Args:
             qgeometry_element (pd.Series): Expect a shapely object.
+            conversion_options (Dict): The options from
+                        _get_conversion_options().  Defaults to None, in which
+                        case they are parsed from self.options.
 
         Returns:
             Union['gdspy.polygon' or 'gdspy.FlexPath' or None]: Convert the
@@ -2272,10 +2794,12 @@ class QGDSRenderer(QRenderer):
 
         # pylint: disable=too-many-locals
 
-        corners = self.options.corners
-        tolerance = self.parse_value(self.options.tolerance)
-        precision = self.parse_value(self.options.precision)
-        max_points = int(self.parse_value(self.options.max_points))
+        if conversion_options is None:
+            conversion_options = self._get_conversion_options()
+        corners = conversion_options.corners
+        tolerance = conversion_options.tolerance
+        precision = conversion_options.precision
+        max_points = conversion_options.max_points
 
         geom = qgeometry_element.geometry  # type: shapely.geometry.base.BaseGeometry
 
@@ -2318,7 +2842,7 @@ class QGDSRenderer(QRenderer):
 
             #Only fillet, if number is greater than zero.
 
-            use_width = self.parse_value(self.options.width_LineString)
+            use_width = conversion_options.width_LineString
 
             if math.isnan(qgeometry_element.width):
                 qcomponent_id = self.parse_value(qgeometry_element.component)
@@ -2371,6 +2895,215 @@ class QGDSRenderer(QRenderer):
             f'method can currently handle Polygon and FlexPath.')
         return None
 
+    def _get_conversion_options(self) -> Dict:
+        """Parse the options used to convert the qgeometry to gdspy elements,
+        so that they are parsed once per export rather than once per element.
+
+        Returns:
+            Dict: With keys corners, tolerance, precision, max_points and
+            width_LineString.
+        """
+        return Dict(corners=self.options.corners,
+                    tolerance=self.parse_value(self.options.tolerance),
+                    precision=self.parse_value(self.options.precision),
+                    max_points=int(self.parse_value(self.options.max_points)),
+                    width_LineString=self.parse_value(
+                        self.options.width_LineString))
+
+    @staticmethod
+    def _get_coordinates_of_each(geometries: np.ndarray) -> list:
+        """Coordinates of each of the geometries, extracted in one call.
+
+        Args:
+            geometries (np.ndarray): Shapely LineStrings or LinearRings.
+
+        Returns:
+            list: One array of shape (N, 2) per geometry.
+        """
+        coords, index = shapely.get_coordinates(geometries, return_index=True)
+        ends = np.cumsum(np.bincount(index, minlength=len(geometries)))
+        return np.split(coords, ends[:-1])
+
+    def _qgeometry_table_to_gds(self,
+                                table: geopandas.GeoDataFrame,
+                                conversion_options: Dict = None) -> list:
+        """Convert all the elements of a qgeometry table to gdspy elements.
+
+        Gives the same polygons as _qgeometry_to_gds() for each row, but the
+        coordinates are extracted in bulk, and the polygons without holes of
+        each layer are gathered into a single gdspy.PolygonSet.
+
+        Args:
+            table (geopandas.GeoDataFrame): Rows of the qgeometry tables.
+            conversion_options (Dict): The options from
+                        _get_conversion_options().  Defaults to None, in which
+                        case they are parsed from self.options.
+
+        Returns:
+            list: The gdspy elements.  Empty if the table is empty.
+        """
+        return self._qgeometry_table_to_gds_by_group(
+            table, np.zeros(len(table), dtype=int), 1, conversion_options)[0]
+
+    def _qgeometry_table_to_gds_by_group(
+            self,
+            table: geopandas.GeoDataFrame,
+            group: np.ndarray,
+            num_groups: int,
+            conversion_options: Dict = None) -> list:
+        """Convert all the elements of a qgeometry table to gdspy elements,
+        in bulk, but keep the elements of each group of rows apart.
+
+        Args:
+            table (geopandas.GeoDataFrame): Rows of the qgeometry tables.
+            group (np.ndarray): The group of each row, from 0 to
+                        num_groups - 1.
+            num_groups (int): Number of groups.
+            conversion_options (Dict): The options from
+                        _get_conversion_options().  Defaults to None, in which
+                        case they are parsed from self.options.
+
+        Returns:
+            list: For each group, the list of its gdspy elements.
+        """
+        # pylint: disable=too-many-locals
+        if conversion_options is None:
+            conversion_options = self._get_conversion_options()
+        precision = conversion_options.precision
+        max_points = conversion_options.max_points
+
+        gds_elements = [[] for _ in range(num_groups)]
+        if table.empty:
+            return gds_elements
+
+        geometry = np.asarray(table.geometry, dtype=object)
+        layer = table['layer'].to_numpy()
+        type_id = shapely.get_type_id(geometry)
+
+        # Polygons.  The holes are removed with a boolean, one polygon at
+        # a time, since a hole can contain a polygon of the same layer.
+        is_polygon = type_id == shapely.GeometryType.POLYGON
+        num_holes = np.zeros(len(geometry), dtype=int)
+        num_holes[is_polygon] = shapely.get_num_interior_rings(
+            geometry[is_polygon])
+        exteriors = self._get_coordinates_of_each(
+            shapely.get_exterior_ring(geometry[is_polygon]))
+        exteriors = dict(zip(np.flatnonzero(is_polygon), exteriors))
+
+        no_holes = np.flatnonzero(is_polygon & (num_holes == 0))
+        in_group_and_layer = pd.DataFrame(
+            dict(group=group[no_holes],
+                 layer=layer[no_holes])).groupby(['group', 'layer'],
+                                                 sort=False).indices
+        for (a_group, a_layer), positions in in_group_and_layer.items():
+            a_poly_set = gdspy.PolygonSet(
+                [exteriors[idx] for idx in no_holes[positions]],
+                layer=int(a_layer),
+                datatype=10)
+            gds_elements[a_group].append(
+                a_poly_set.fracture(max_points=max_points, precision=precision))
+
+        for idx in np.flatnonzero(is_polygon & (num_holes > 0)):
+            holes = [
+                np.asarray(hole.coords) for hole in geometry[idx].interiors
+            ]
+            gds_elements[group[idx]].append(
+                gdspy.boolean(gdspy.Polygon(exteriors[idx],
+                                            layer=int(layer[idx]),
+                                            datatype=10),
+                              gdspy.PolygonSet(holes,
+                                               layer=int(layer[idx]),
+                                               datatype=10),
+                              'not',
+                              max_points=max_points,
+                              precision=precision,
+                              layer=int(layer[idx]),
+                              datatype=10))
+
+        # LineStrings become FlexPaths, one per row.
+        is_line = type_id == shapely.GeometryType.LINESTRING
+        if is_line.any():
+            gds_paths = self._linestrings_to_gds(table[is_line],
+                                                 geometry[is_line],
+                                                 conversion_options)
+            for a_group, a_path in zip(group[is_line], gds_paths):
+                gds_elements[a_group].append(a_path)
+
+        for idx in np.flatnonzero(~(is_polygon | is_line)):
+            self.logger.warning(
+                f'Unexpected shapely object geometry.'
+                f'The variable qgeometry_element is {type(geometry[idx])}, '
+                f'method can currently handle Polygon and FlexPath.')
+
+        return gds_elements
+
+    def _linestrings_to_gds(self, table: geopandas.GeoDataFrame,
+                            geometry: np.ndarray,
+                            conversion_options: Dict) -> list:
+        """Convert the LineStrings of a qgeometry table to gdspy.FlexPath, same
+        as _qgeometry_to_gds().
+
+        Args:
+            table (geopandas.GeoDataFrame): Rows of the qgeometry tables,
+                        which are all LineStrings.
+            geometry (np.ndarray): The LineStrings of the rows.
+            conversion_options (Dict): The options from
+                        _get_conversion_options().
+
+        Returns:
+            list: One gdspy.FlexPath per row which has a fillet column.
+        """
+        if 'fillet' not in table.columns:
+            # Could be junction table with a linestring.
+            for _, qgeometry_element in table.iterrows():
+                self.logger.warning(
+                    f'Linestring did not have fillet in column. '
+                    f'The qgeometry_element was not drawn.\n'
+                    f'The qgeometry_element within table is:\n'
+                    f'{qgeometry_element}')
+            return []
+
+        width = table['width'].to_numpy(dtype=float)
+        fillet = table['fillet'].to_numpy(dtype=float)
+        layer = table['layer'].to_numpy()
+
+        use_width = width.copy()
+        for idx in np.flatnonzero(np.isnan(width)):
+            use_width[idx] = conversion_options.width_LineString
+            self.logger.warning(
+                f'Since width:{width[idx]} for a Path is not a number, '
+                f'it will be exported using width_LineString:'
+                f' {conversion_options.width_LineString}.  The component_id'
+                f' is:{table["component"].iloc[idx]},'
+                f' name is:{table["name"].iloc[idx]}, layer is: {layer[idx]}')
+
+        # Only fillet, if number is greater than zero, and not less than
+        # the width.
+        with np.errstate(invalid='ignore'):
+            no_fillet = np.isnan(fillet) | (fillet <= 0) | (fillet < width)
+
+        gds_paths = []
+        for idx, coords in enumerate(self._get_coordinates_of_each(geometry)):
+            if no_fillet[idx]:
+                gds_paths.append(
+                    gdspy.FlexPath(coords,
+                                   use_width[idx],
+                                   layer=int(layer[idx]),
+                                   max_points=conversion_options.max_points,
+                                   datatype=11))
+            else:
+                gds_paths.append(
+                    gdspy.FlexPath(coords,
+                                   use_width[idx],
+                                   layer=int(layer[idx]),
+                                   datatype=11,
+                                   max_points=conversion_options.max_points,
+                                   corners=conversion_options.corners,
+                                   bend_radius=fillet[idx],
+                                   tolerance=conversion_options.tolerance,
+                                   precision=conversion_options.precision))
+        return gds_paths
+
     def _get_chip_names(self) -> Dict:
         """Returns a dict of unique chip names for ALL tables within QGeometry.
         In another words, for every "path" table, "poly" table ... etc, this
@@ -14,12 +14,220 @@
 """ For GDS export, separate the logic for cheesing."""
 
 import logging
-from typing import Union
+from typing import Tuple, Union
 import gdspy
 import shapely
 import numpy as np
 
 
+def cheese_booleans(
+        one_hole: Union[gdspy.PolygonSet, None],
+        x_holes: list,
+        y_holes: list,
+        delta_x: float,
+        delta_y: float,
+        all_nocheese_gds: list,
+        ground_polygons: Union[list, None],
+        layer: int,
+        datatype_cheese: int,
+        max_points: int,
+        precision: float,
+        tile_size: int = 32) -> Tuple[list, list, Union[list, None]]:
+    """The gdspy booleans of the cheesing for one chip and layer.
+
+    The grid of holes is split into tiles of tile_size by tile_size holes.
+    Only the tiles whose bounding box touches the keepout are flattened and
+    booleaned with the nearby keepout.  The other tiles are kept as arrays
+    of holes.  The ground is sliced along the tiles, so that the holes are
+    subtracted from it one tile at a time.
+
+    Defined at module level, so that it can run in a process pool.  The
+    arguments are from Cheesing.prepare_cheesing().
+
+    Args:
+        one_hole (Union[gdspy.PolygonSet, None]): The hole at (0, 0).
+        x_holes (list): The x locations of the grid of holes.
+        y_holes (list): The y locations of the grid of holes.
+        delta_x (float): The spacing between holes in x.
+        delta_y (float): The spacing between holes in y.
+        all_nocheese_gds (list): The keepout of the cheesing.
+        ground_polygons (Union[list, None]): The polygons of the ground to
+                                cheese, for a positive mask.  Otherwise None.
+        layer (int): Layer number for calculating the cheese.
+        datatype_cheese (int): User defined datatype, considered a
+                                sub-layer number for where to place the
+                                cheese output.
+        max_points (int): Used in gdspy to identify max number of points
+                                for a Polygon.
+        precision (float): Used in gdspy to identify precision.
+        tile_size (int): Number of holes along each side of a tile.
+                                Defaults to 32.
+
+    Returns:
+        Tuple[list, list, Union[list, None]]: The holes minus the keepout, as
+        gdspy.PolygonSet, for the tiles which touch the keepout.  The tiles
+        away from the keepout, as (columns, rows, origin) of arrays of holes
+        spaced by (delta_x, delta_y).  The ground minus all the holes, as
+        gdspy.PolygonSet, None when there is no ground or no hole.
+    """
+    # pylint: disable=too-many-locals
+    diff_holes = []
+    hole_arrays = []
+    if one_hole is None or not x_holes or not y_holes:
+        return diff_holes, hole_arrays, None
+
+    hole_polygons = np.array(one_hole.polygons, dtype=object)
+    hole_min = np.min([points.min(axis=0) for points in hole_polygons], axis=0)
+    hole_max = np.max([points.max(axis=0) for points in hole_polygons], axis=0)
+
+    # Only the bounding boxes of the keepout are used to find the tiles
+    # which touch it, which is conservative.
+    temp_keepout_cell = gdspy.Cell('temp_keepout', exclude_from_current=True)
+    temp_keepout_cell.add(all_nocheese_gds)
+    keepout = temp_keepout_cell.get_polygons()
+    keepout_bounds = np.array([
+        np.concatenate((points.min(axis=0), points.max(axis=0)))
+        for points in keepout
+    ],
+                              dtype=float).reshape(-1, 4)
+    keepout_tree = shapely.STRtree(shapely.box(*keepout_bounds.T))
+
+    x_holes = np.asarray(x_holes, dtype=float)
+    y_holes = np.asarray(y_holes, dtype=float)
+    num_x, num_y = len(x_holes), len(y_holes)
+
+    # Holes of each tile, for the ground.
+    tile_holes = dict()
+    for start_x in range(0, num_x, tile_size):
+        end_x = min(start_x + tile_size, num_x)
+        for start_y in range(0, num_y, tile_size):
+            end_y = min(start_y + tile_size, num_y)
+
+            tile_box = shapely.box(x_holes[start_x] + hole_min[0],
+                                   y_holes[start_y] + hole_min[1],
+                                   x_holes[end_x - 1] + hole_max[0],
+                                   y_holes[end_y - 1] + hole_max[1])
+            near_keepout = keepout_tree.query(tile_box)
+            if len(near_keepout) == 0 and ground_polygons is None:
+                hole_arrays.append((end_x - start_x, end_y - start_y,
+                                    (x_holes[start_x], y_holes[start_y])))
+                continue
+
+            origins = np.stack(np.meshgrid(x_holes[start_x:end_x],
+                                           y_holes[start_y:end_y],
+                                           indexing='ij'),
+                               axis=-1).reshape(-1, 1, 2)
+            holes = [
+                points for polygon in hole_polygons
+                for points in polygon[np.newaxis] + origins
+            ]
+            if len(near_keepout) == 0:
+                hole_arrays.append((end_x - start_x, end_y - start_y,
+                                    (x_holes[start_x], y_holes[start_y])))
+                tile_holes[(start_x, start_y)] = holes
+                continue
+
+            a_diff = gdspy.boolean(holes,
+                                   [keepout[idx] for idx in near_keepout],
+                                   'not',
+                                   max_points=max_points,
+                                   precision=precision,
+                                   layer=layer,
+                                   datatype=datatype_cheese + 1)
+            # A tile within the keepout has no hole left.
+            if a_diff is not None:
+                diff_holes.append(a_diff)
+                tile_holes[(start_x, start_y)] = a_diff.polygons
+
+    ground_cheese = None
+    if ground_polygons is not None and tile_holes:
+        ground_cheese = _subtract_tile_holes_from_ground(
+            ground_polygons, tile_holes, x_holes, y_holes, delta_x, delta_y,
+            layer, datatype_cheese, max_points, precision, tile_size)
+
+    return diff_holes, hole_arrays, ground_cheese
+
+
+def _subtract_tile_holes_from_ground(ground_polygons: list, tile_holes: dict,
+                                     x_holes: np.ndarray, y_holes: np.ndarray,
+                                     delta_x: float, delta_y: float, layer: int,
+                                     datatype_cheese: int, max_points: int,
+                                     precision: float, tile_size: int) -> list:
+    """Slice the ground along the tiles of cheese_booleans(), and subtract
+    the holes of each tile from its slice of the ground.
+
+    Args:
+        ground_polygons (list): The polygons of the ground to cheese.
+        tile_holes (dict): The polygons of the holes of each tile, keyed by
+                           the index of the first hole of the tile in x
+                           and y.
+        x_holes (np.ndarray): The x locations of the grid of holes.
+        y_holes (np.ndarray): The y locations of the grid of holes.
+        delta_x (float): The spacing between holes in x.
+        delta_y (float): The spacing between holes in y.
+        layer (int): Layer number for calculating the cheese.
+        datatype_cheese (int): Datatype of the result.
+        max_points (int): Used in gdspy to identify max number of points
+                                for a Polygon.
+        precision (float): Used in gdspy to identify precision.
+        tile_size (int): Number of holes along each side of a tile.
+
+    Returns:
+        list: The ground minus all the holes, as gdspy.PolygonSet.
+    """
+    # pylint: disable=too-many-locals
+    # The holes are smaller than the spacing, so each tile of holes is
+    # within the half spacing around its centers.
+    starts_x = list(range(0, len(x_holes), tile_size))
+    starts_y = list(range(0, len(y_holes), tile_size))
+    cuts_x = [x_holes[0] + (idx - 0.5) * delta_x for idx in starts_x
+             ] + [x_holes[0] + (len(x_holes) - 0.5) * delta_x]
+    cuts_y = [y_holes[0] + (idx - 0.5) * delta_y for idx in starts_y
+             ] + [y_holes[0] + (len(y_holes) - 0.5) * delta_y]
+
+    def to_slices(polygons, cuts, axis):
+        return gdspy.slice(polygons,
+                           cuts,
+                           axis,
+                           precision=precision,
+                           layer=layer,
+                           datatype=datatype_cheese)
+
+    ground_cheese = []
+    columns = to_slices(ground_polygons, cuts_x, 0)
+    # Left and right of the grid of holes.
+    outside = [columns[0], columns[-1]]
+    for start_x, column in zip(starts_x, columns[1:-1]):
+        if column is None:
+            continue
+        tiles = to_slices(column, cuts_y, 1)
+        # Below and above the grid of holes.
+        outside.extend((tiles[0], tiles[-1]))
+        for start_y, tile in zip(starts_y, tiles[1:-1]):
+            if tile is None:
+                continue
+            holes = tile_holes.get((start_x, start_y))
+            if holes is None:
+                ground_cheese.append(
+                    tile.fracture(max_points=max_points, precision=precision))
+                continue
+            a_ground = gdspy.boolean(tile,
+                                     holes,
+                                     'not',
+                                     max_points=max_points,
+                                     precision=precision,
+                                     layer=layer,
+                                     datatype=datatype_cheese)
+            if a_ground is not None:
+                ground_cheese.append(a_ground)
+
+    ground_cheese.extend(
+        a_slice.fracture(max_points=max_points, precision=precision)
+        for a_slice in outside
+        if a_slice is not None)
+    return ground_cheese
+
+
 class Cheesing():
     """Create a cheese cell based on input of no-cheese locations."""
 
@@ -62,6 +270,9 @@ class Cheesing():
         # delta spacing for holes
         delta_x: float = 0.00010,
         delta_y: float = 0.00010,
+
+        # Number of holes along each side of a tile
+        tile_size: int = 32,
     ):
         """Create the cheesing based on the no-cheese multi_poly.
 
@@ -109,6 +320,11 @@ class Cheesing():
                                     Defaults to 0.000025.
             delta_x (float, optional): The spacing between holes in x.
             delta_y (float, optional): The spacing between holes in y.
+            tile_size (int, optional): The grid of holes is split into tiles
+                                    of tile_size by tile_size holes.  Only
+                                    the tiles which touch the no-cheese
+                                    region are flattened for booleans.
+                                    Defaults to 32.
         """
 
         # All the no-cheese locations.
@@ -165,6 +381,10 @@ class Cheesing():
         self.one_hole_cell = None
 
         self.hole = None
+        self.one_hole = None
+
+        # Number of holes along each side of the tiles of the grid of holes.
+        self.tile_size = tile_size
 
     def apply_cheesing(self) -> gdspy.GdsLibrary:
         """Prototype, not complete.
@@ -172,16 +392,81 @@ class Cheesing():
         Need to populate self.lib with cheese holes.
         """
 
-        if self._error_checking_hole_delta() == 0:
-            # Place hole into self.hole
-            self._make_one_hole_at_zero_zero()
+        arguments = self.prepare_cheesing()
+        if arguments is not None:
+            self.finish_cheesing(cheese_booleans(*arguments))
 
-            _ = self._hole_to_lib()
-            self._cell_with_grid()
-        else:
+        return self.lib
+
+    def prepare_cheesing(self) -> Union[tuple, None]:
+        """First step of apply_cheesing().  Place the hole into self.lib, and
+        gather the arguments of cheese_booleans(), which does not need
+        self.lib, so it can run in another process.
+
+        Returns:
+            Union[tuple, None]: The arguments of cheese_booleans(). None if
+            the cheesing is not implemented.
+        """
+        if self._error_checking_hole_delta() != 0:
             self.logger.warning('Cheesing not implemented.')
+            return None
 
-        return self.lib
+        # Place hole into self.hole
+        self._make_one_hole_at_zero_zero()
+        self.one_hole = self._hole_to_lib()
+
+        x_holes = np.arange(self.grid_minx,
+                            self.grid_maxx,
+                            self.delta_x,
+                            dtype=float).tolist()
+        y_holes = np.arange(self.grid_miny,
+                            self.grid_maxy,
+                            self.delta_y,
+                            dtype=float).tolist()
+
+        ground_polygons = None
+        ground_cell_name = f'ground_{self.chip_name}_{self.layer}'
+        if not self.is_neg_mask and ground_cell_name in self.lib.cells:
+            # Need to keep the depth at 0, otherwise all the
+            # cell references (junctions) will be added for boolean.
+            ground_polygons = self.lib.cells[ground_cell_name].get_polygons(
+                depth=0)
+
+        return (self.one_hole, x_holes, y_holes, self.delta_x, self.delta_y,
+                self.nocheese_gds, ground_polygons, self.layer,
+                self.datatype_cheese, self.max_points, self.precision,
+                self.tile_size)
+
+    def finish_cheesing(self, booleans: tuple):
+        """Last step of apply_cheesing().  Place the result of
+        cheese_booleans() into self.lib.
+
+        Args:
+            booleans (tuple): The result of cheese_booleans(), for the
+                              arguments from prepare_cheesing().
+        """
+        diff_holes, hole_arrays, ground_cheese = booleans
+        diff_holes_cell_name = f'TOP_{self.chip_name}_{self.layer}_Cheese_diff'
+        diff_holes_cell = self.lib.new_cell(diff_holes_cell_name,
+                                            overwrite_duplicate=True)
+        diff_holes_cell.add(diff_holes)
+
+        if hole_arrays:
+            # The holes of the tiles away from the keepout, as arrays.
+            diff_hole_cell = self.lib.new_cell(f'{diff_holes_cell_name}_hole',
+                                               overwrite_duplicate=True)
+            diff_hole_cell.add(
+                gdspy.PolygonSet(self.one_hole.polygons,
+                                 layer=self.layer,
+                                 datatype=self.datatype_cheese + 1))
+            for columns, rows, origin in hole_arrays:
+                diff_holes_cell.add(
+                    gdspy.CellArray(diff_hole_cell,
+                                    columns,
+                                    rows, (self.delta_x, self.delta_y),
+                                    origin=origin))
+
+        self._cell_with_grid(diff_holes_cell, ground_cheese)
 
     def _error_checking_hole_delta(self) -> int:
         """Check ratio of hole size vs hole spacing.
@@ -282,22 +567,19 @@ class Cheesing():
 
         return a_poly
 
-    def _cell_with_grid(self):
-        """Use the hole at self.one_hole_cell to create a grid.
+    def _cell_with_grid(self, diff_holes_cell: gdspy.library.Cell,
+                        ground_cheese: Union[list, None]):
+        """Place the grid of holes, without the no_cheese region, and the
+        ground with the holes subtracted, which were both computed by
+        cheese_booleans(). The cells are added to the Top_<chip_name>.
 
-        Then use the no_cheese cell to remove the holes from grid.  The
-        difference will be used subtract from the ground layer with
-        geometry. The cells are added to the Top_<chip_name>.
+        Args:
+            diff_holes_cell (gdspy.library.Cell): Holds the difference of
+                                            holes minus the keep-out region.
+            ground_cheese (Union[list, None]): The gdspy.PolygonSet of
+                            the ground minus the holes, for a positive mask.
         """
 
-        gather_holes_cell = self._get_all_holes()
-        diff_holes_cell = self._subtract_keepout_from_hole_grid(
-            gather_holes_cell)
-        self.lib.remove(gather_holes_cell)
-
-        cell_name = f'TOP_{self.chip_name}_{self.layer}'
-        cell_layer = self.lib.cells[cell_name]
-
         if self.is_neg_mask:
             #negative mask for given chip and layer
             self._move_to_under_top_chip_layer_name(diff_holes_cell)
@@ -310,7 +592,7 @@ class Cheesing():
             #positive mask for given chip and layer
             if self.fab:
                 self._subtract_from_ground_and_move_under_top_chip_layer(
-                    diff_holes_cell)
+                    diff_holes_cell, ground_cheese)
                 self._both_pos_and_neg_mask_fab()
 
                 #  This is something special still to do.
@@ -318,7 +600,7 @@ class Cheesing():
                 self._remove_ground_chip_layer()
             else:
                 self._subtract_from_ground_and_move_under_top_chip_layer(
-                    diff_holes_cell)
+                    diff_holes_cell, ground_cheese)
 
     def _both_pos_and_neg_mask_fab(self):
         """For both positive and negative mask need to have this cell removed when
@@ -334,12 +616,15 @@ class Cheesing():
             self.lib.remove(cheese_one_hole_cell_name)
 
     def _subtract_from_ground_and_move_under_top_chip_layer(
-            self, diff_holes_cell: gdspy.library.Cell):
+            self, diff_holes_cell: gdspy.library.Cell,
+            ground_cheese: Union[list, None]):
         """Get the existing chip_only_top_name cell, then add the holes to it.
         Also, add ground_cheesed_cell under chip_only_top_name
 
         Args:
             diff_holes_cell (gdspy.library.Cell): New cell with cheesed ground
+            ground_cheese (Union[list, None]): The gdspy.PolygonSet of
+                            the ground minus the holes.
         """
 
         #chip_only_top_name = f'TOP_{self.chip_name}'
@@ -350,85 +635,24 @@ class Cheesing():
                 self.lib.cells[chip_only_top_layer_name].add(
                     gdspy.CellReference(diff_holes_cell))
                 ground_cheese_cell = self._subtract_holes_from_ground(
-                    diff_holes_cell)
+                    ground_cheese)
 
                 #Move to under Top_main_layer (Top_chipname_#)
-                self._move_to_under_top_chip_layer_name(ground_cheese_cell)
+                if ground_cheese_cell is not None:
+                    self._move_to_under_top_chip_layer_name(ground_cheese_cell)
             else:
                 self.lib.remove(diff_holes_cell)
 
-    def _subtract_keepout_from_hole_grid(
-            self, gather_holes_cell: gdspy.library.Cell) -> gdspy.library.Cell:
-        """Given a cell with all the holes, subtract the keepout region.
-        Then return a new cell with the result.
-
-        Args:
-            gather_holes_cell (gdspy.library.Cell): Holds a grid of all
-                                                the holes for cheesing.
-
-        Returns:
-            gdspy.library.Cell: Newly created cell that holds the difference
-                                        of holes minus the keep=out region.
-        """
-
-        # subtact the keepout, note, Based on user options,
-        # the keepout (no_cheese) cell may not be in self.lib.
-        temp_keepout_chip_layer_cell = f'temp_keepout_{self.chip_name}_{self.layer}'
-        temp_keepout_cell = self.lib.new_cell(temp_keepout_chip_layer_cell,
-                                              overwrite_duplicate=True)
-        temp_keepout_cell.add(self.nocheese_gds)
-        diff_holes = gdspy.boolean(gather_holes_cell.get_polygonsets(),
-                                   temp_keepout_cell.get_polygonsets(),
-                                   'not',
-                                   max_points=self.max_points,
-                                   precision=self.precision,
-                                   layer=self.layer,
-                                   datatype=self.datatype_cheese + 1)
-        diff_holes_cell_name = f'TOP_{self.chip_name}_{self.layer}_Cheese_diff'
-        diff_holes_cell = self.lib.new_cell(diff_holes_cell_name,
-                                            overwrite_duplicate=True)
-        diff_holes_cell.add(diff_holes)
-
-        self.lib.remove(temp_keepout_chip_layer_cell)
-        return diff_holes_cell
-
-    def _get_all_holes(self) -> gdspy.library.Cell:
-        """Return a cell with a grid of holes. The keepout has not been
-        applied yet.
-
-        Returns:
-            gdspy.library.Cell: Cell containing all the holes.
-        """
-        gather_holes_cell_name = f'Gather_holes_{self.chip_name}_{self.layer}'
-        gather_holes_cell = self.lib.new_cell(gather_holes_cell_name,
-                                              overwrite_duplicate=True)
-
-        x_holes = np.arange(self.grid_minx,
-                            self.grid_maxx,
-                            self.delta_x,
-                            dtype=float).tolist()
-        y_holes = np.arange(self.grid_miny,
-                            self.grid_maxy,
-                            self.delta_y,
-                            dtype=float).tolist()
-
-        if self.one_hole_cell is not None:
-            for x_loc in x_holes:
-                for y_loc in y_holes:
-                    gather_holes_cell.add(
-                        gdspy.CellReference(self.one_hole_cell,
-                                            origin=(x_loc, y_loc)))
-
-        return gather_holes_cell
-
     def _subtract_holes_from_ground(
-            self, diff_holes_cell) -> Union[gdspy.library.Cell, None]:
-        """Get reference to ground cell and then subtract the holes from
-        ground. Place the difference into a new cell, which will eventually
-        be added under Top.
+            self,
+            ground_cheese: Union[list,
+                                 None]) -> Union[gdspy.library.Cell, None]:
+        """Place the ground minus the holes, from cheese_booleans(), into a
+        new cell, which will eventually be added under Top.
 
         Args:
-            diff_holes_cell ([type]): Cell which contains all the holes.
+            ground_cheese (Union[list, None]): The gdspy.PolygonSet of
+                            the ground minus the holes.
 
         Returns:
             Union[gdspy.library.Cell, None]: If worked, the new cell with
@@ -438,27 +662,24 @@ class Cheesing():
         # Still need to 'not' with Top_main_1 (ground)
         top_chip_layer_name = f'TOP_{self.chip_name}_{self.layer}'
         ground_cell_name = f'ground_{self.chip_name}_{self.layer}'
-        if top_chip_layer_name in self.lib.cells.keys():
-            ground_cell = self.lib.cells[ground_cell_name]
-            # Need to keep the depth at 0, otherwise all the
-            # cell references (junctions) will be added for boolean.
-            ground_cheese = gdspy.boolean(ground_cell.get_polygons(depth=0),
-                                          diff_holes_cell.get_polygonsets(),
-                                          'not',
-                                          max_points=self.max_points,
-                                          precision=self.precision,
-                                          layer=self.layer,
-                                          datatype=self.datatype_cheese)
-            ground_cheese_cell_name = (f'TOP_{self.chip_name}_{self.layer}'
-                                       f'_Cheese_{self.datatype_cheese}')
-            ground_cheese_cell = self.lib.new_cell(ground_cheese_cell_name,
-                                                   overwrite_duplicate=True)
-            return ground_cheese_cell.add(ground_cheese)
-
-        self.logger.warning(
-            f'The cell:{top_chip_layer_name} was not found in self.lib. '
-            f'Cheesing not implemented.')
-        return None
+        if top_chip_layer_name not in self.lib.cells.keys():
+            self.logger.warning(
+                f'The cell:{top_chip_layer_name} was not found in self.lib. '
+                f'Cheesing not implemented.')
+            return None
+        if ground_cell_name not in self.lib.cells.keys():
+            self.logger.warning(
+                f'The cell:{ground_cell_name} was not found in self.lib. '
+                f'Cheesing not implemented.')
+            return None
+
+        ground_cheese_cell_name = (f'TOP_{self.chip_name}_{self.layer}'
+                                   f'_Cheese_{self.datatype_cheese}')
+        ground_cheese_cell = self.lib.new_cell(ground_cheese_cell_name,
+                                               overwrite_duplicate=True)
+        if ground_cheese is not None:
+            ground_cheese_cell.add(ground_cheese)
+        return ground_cheese_cell
 
     def _move_to_under_top_chip_layer_name(self, a_cell: gdspy.library.Cell):
         """Move the cell to under TOP_<chip name>_<layer number>.
@@ -478,8 +699,9 @@ class Cheesing():
         """ For a lib, chip and layer, remove the Cheese_diff cell.
         """
         cell_name = f'TOP_{self.chip_name}_{self.layer}_Cheese_diff'
-        if cell_name in self.lib.cells:
-            self.lib.remove(cell_name)
+        for a_cell_name in (cell_name, f'{cell_name}_hole'):
+            if a_cell_name in self.lib.cells:
+                self.lib.remove(a_cell_name)
 
     def _remove_ground_chip_layer(self):
         """[For a lib, chip and layer, remove the ground cell
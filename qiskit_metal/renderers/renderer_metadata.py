@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2017, 2021.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+"""Names and QGeometry table data of the renderers in config.renderers_to_load.
+
+A design adds the columns of the renderers to its QGeometry tables from
+here, without importing the renderers and the packages they need, such as
+pyEPR, pyaedt, gdspy or gmsh.  The renderer classes use the same dicts as
+their element_table_data.
+"""
+
+# Dict structure MUST be same as element_extensions of QRenderer.
+
+ansys_element_table_data = dict(
+    path=dict(wire_bonds=False),
+    junction=dict(
+        # Lj, Cj and _Rj of QAnsysRenderer.default_options
+        inductance='10nH',
+        capacitance=0,
+        resistance=0,
+        # max_mesh_length_jj of QAnsysRenderer.default_options, in meters
+        mesh_kw_jj=7e-06,
+    ),
+)
+"""Element table data of QAnsysRenderer, QHFSSRenderer and QQ3DRenderer."""
+
+pyaedt_element_table_data = dict(
+    path=dict(wire_bonds=False),
+    # Lj and Cj of QPyaedt.default_options
+    junction=dict(inductance=10e-9, capacitance=0),
+)
+"""Element table data of QPyaedt, QQ3DPyaedt and QHFSSPyaedt."""
+
+gds_element_table_data = dict(
+    # Cell_name must exist in gds file with: path_filename
+    junction=dict(cell_name='my_other_junction'))
+"""Element table data of QGDSRenderer."""
+
+renderers_metadata = {
+    'qiskit_metal.renderers.renderer_ansys.hfss_renderer.QHFSSRenderer':
+        dict(name='hfss', element_table_data=ansys_element_table_data),
+    'qiskit_metal.renderers.renderer_ansys.q3d_renderer.QQ3DRenderer':
+        dict(name='q3d', element_table_data=ansys_element_table_data),
+    'qiskit_metal.renderers.renderer_gds.gds_renderer.QGDSRenderer':
+        dict(name='gds', element_table_data=gds_element_table_data),
+    'qiskit_metal.renderers.renderer_gmsh.gmsh_renderer.QGmshRenderer':
+        dict(name='gmsh', element_table_data=dict()),
+    'qiskit_metal.renderers.renderer_elmer.elmer_renderer.QElmerRenderer':
+        dict(name='elmer', element_table_data=dict()),
+    'qiskit_metal.renderers.renderer_ansys_pyaedt.q3d_renderer_aedt.QQ3DPyaedt':
+        dict(name='aedt_q3d', element_table_data=pyaedt_element_table_data),
+    'qiskit_metal.renderers.renderer_ansys_pyaedt.hfss_renderer_aedt.QHFSSPyaedt':
+        dict(name='aedt_hfss', element_table_data=pyaedt_element_table_data),
+}
+"""Name and element_table_data of the renderer classes, by the path_name and
+class_name of config.renderers_to_load, joined by a dot.  Renderers not
+listed here are imported when a design is created.
+
+Plain dicts, as Dict would copy the element_table_data of the classes."""
@@ -15,13 +15,14 @@
 import logging
 import random
 import sys
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, List, Tuple
 
 import matplotlib as mpl
 import matplotlib.patches as patches
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+import shapely
 from cycler import cycler
 from .patch import PolygonPatch
 from IPython.display import display
@@ -43,7 +44,8 @@ from .mpl_toolbox import _axis_set_watermark_img, clear_axis, get_prop_cycle
 from .. import config
 if not config.is_building_docs():
     from ...toolbox_python.utility_functions import log_error_easy
-    from qiskit_metal.toolbox_python.utility_functions import bad_fillet_idxs
+    from qiskit_metal.toolbox_python.utility_functions import fillet_coords
+    from qiskit_metal.toolbox_metal.parsing import is_true
 
 if TYPE_CHECKING:
     from ..._gui.main_window import MetalGUI
@@ -76,7 +78,16 @@ class QMplRenderer():
         self.canvas = canvas
         self.ax = None
         self.design = design
-        self.options = Dict(resolution='16',)
+        self.options = Dict(
+            resolution='16',
+            # Only draw the components near the axes limits.  The margin is
+            # a fraction of the size of the view, on each side.
+            cull_to_view='True',
+            view_margin='0.5',
+            # Simplify the outlines to about this many pixels, which mostly
+            # matters when zoomed out.  '0' to never simplify.
+            simplify_pixels='1',
+        )
 
         # Filter view options
         self.hidden_layers = set()
@@ -84,6 +95,17 @@ class QMplRenderer():
         # Set of component ids which are integers.
         self._hidden_components = set()
 
+        # The qgeometry of each component, ready to be drawn, see
+        # _update_render_cache().
+        # i.e. self._render_cache[component_id] = Dict(revision, geometry,
+        #                                    group, layer, simplified)
+        self._render_cache = dict()
+
+        # What is currently drawn by render_tables(), see _render_view().
+        self._rendered = Dict(ax=None, region=None, level=None, artists=[])
+        # Last axes limits, as (minx, miny, maxx, maxy).  None until known.
+        self._view = None
+
         self.colors = [
             '#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b',
             '#e377c2', '#7f7f7f', '#bcbd22', '#17becf'
@@ -114,7 +136,7 @@ class QMplRenderer():
             name (str): Component name
         """
         comp_id = self.design.components[name].id
-        self._hidden_components.discard(name)
+        self._hidden_components.discard(comp_id)
 
     def hide_layer(self, name):
         """Hide the layer with the given name.
@@ -137,6 +159,8 @@ class QMplRenderer():
         """
         self.design = design
         self.clear_options()
+        self._render_cache.clear()
+        self._view = None
         # TODO
 
     def clear_options(self):
@@ -166,7 +190,7 @@ class QMplRenderer():
         # not direct access to underlying internal representation
 
         mask = table.layer.isin(self.hidden_layers)
-        mask = table.component.isin(self._hidden_components)
+        mask |= table.component.isin(self._hidden_components)
 
         return ~mask  # not
 
@@ -237,28 +261,287 @@ class QMplRenderer():
 
         return kw
 
+    # The order in which the qgeometry is drawn, as (element_type,
+    # subtracted, is_line).  The lines are the paths with zero width.
+    draw_groups = (
+        ('path', True, False),
+        ('path', True, True),
+        ('path', False, False),
+        ('path', False, True),
+        ('poly', True, False),
+        ('poly', False, False),
+        ('junction', True, False),
+        ('junction', False, False),
+    )
+    """Draw groups"""
+
     def render_tables(self, ax: Axes):
         """Render the tables.
+
+        The qgeometry of each component is filleted and buffered once, and
+        cached until the component changes.  If the axes limits are known,
+        only the components near them are drawn, and the drawing is updated
+        when the limits change.
+
         Args:
             ax (Axes): The axes
         """
-        for element_type, table in self.qgeometry.tables.items():
-            # Mask the table
-            table = table[self.get_mask(table)]
+        self._update_render_cache()
+
+        # A cleared axes has no callbacks.
+        self._rendered = Dict(ax=None, region=None, level=None, artists=[])
+        if is_true(self.options.cull_to_view):
+            self._render_view(ax, self._view)
+            ax.callbacks.connect('xlim_changed', self._on_limits_changed)
+            ax.callbacks.connect('ylim_changed', self._on_limits_changed)
+        else:
+            self._render_view(ax, None)
 
-            # subtracted
-            mask = table['subtract'] == True
-            render_func = getattr(self, f'render_{element_type}')
-            render_func(table[mask], ax, subtracted=True)
+    def _update_render_cache(self):
+        """Update self._render_cache for the components whose qgeometry
+        changed, see QGeometryTables.get_component_revision().
 
-            # non-subtracted
-            table1 = table[~mask]
-            # TODO: do by layer and color
-            # self.get_color_num()
+        Each entry has, for every row of the component, the geometry to
+        draw, the index of its group in draw_groups, or -1 to not draw it,
+        and its layer.
+        """
+        # pylint: disable=protected-access
+        qgeometry = self.qgeometry
+        tables = qgeometry.tables
+        components = self.design._components
+        for component_id in set(self._render_cache) - set(components):
+            del self._render_cache[component_id]
+
+        stale = [
+            component_id for component_id in components
+            if component_id not in self._render_cache or
+            self._render_cache[component_id].revision !=
+            qgeometry.get_component_revision(component_id)
+        ]
+        if not stale:
+            return
+
+        parts = {component_id: [] for component_id in stale}
+        for element_type in ('poly', 'path', 'junction'):
+            if element_type not in tables:
+                continue
+            row_index = qgeometry._get_row_index(element_type)
+            in_table = [
+                component_id for component_id in stale
+                if component_id in row_index
+            ]
+            if not in_table:
+                continue
+            rows = tables[element_type].iloc[np.concatenate(
+                [row_index[component_id] for component_id in in_table])]
+            geometry, group = self._prepare_rows(element_type, rows)
+            layer = rows['layer'].to_numpy()
+            ends = np.cumsum(
+                [len(row_index[component_id]) for component_id in in_table])
+            for component_id, part in zip(
+                    in_table,
+                    zip(np.split(geometry,
+                                 ends[:-1]), np.split(group, ends[:-1]),
+                        np.split(layer, ends[:-1]))):
+                parts[component_id].append(part)
+
+        for component_id, component_parts in parts.items():
+            if component_parts:
+                geometry, group, layer = (
+                    np.concatenate(arrays) for arrays in zip(*component_parts))
+            else:
+                geometry = np.array([], dtype=object)
+                group = np.array([], dtype=int)
+                layer = np.array([], dtype=int)
+            self._render_cache[component_id] = Dict(
+                revision=qgeometry.get_component_revision(component_id),
+                geometry=geometry,
+                group=group,
+                layer=layer,
+                simplified=None)
+
+    def _prepare_rows(self, element_type: str,
+                      rows: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Geometry to draw for rows of a qgeometry table.  The paths are
+        filleted and, as the junctions, buffered by half their width.
+
+        Args:
+            element_type (str): 'poly', 'path' or 'junction'
+            rows (pd.DataFrame): Rows of the table
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The geometry, and the index of the
+            group in draw_groups, or -1 to not draw the row.
+        """
+        geometry = np.asarray(rows.geometry, dtype=object).copy()
+        subtract = rows['subtract'].to_numpy(dtype=bool)
+        group = np.full(len(rows), -1, dtype=int)
+
+        def group_num(is_line):
+            return np.where(
+                subtract, self.draw_groups.index((element_type, True, is_line)),
+                self.draw_groups.index((element_type, False, is_line)))
+
+        if element_type == 'poly':
+            group[:] = group_num(False)
+            return geometry, group
+
+        width = rows['width'].to_numpy(dtype=float)
+        no_width = (width == 0) | np.isnan(width)
+        if element_type == 'path':
+            fillet = rows['fillet'].to_numpy(dtype=float)
+            for idx in np.flatnonzero(~no_width & ~np.isnan(fillet) &
+                                      (fillet != 0)):
+                geometry[idx] = self.fillet_path(
+                    dict(geometry=geometry[idx], fillet=fillet[idx]))
+            group[no_width] = group_num(True)[no_width]
+        else:
+            if no_width.any():
+                self.logger.warning(
+                    'One or more junctions have zero width. Consider changing this.'
+                )
+        group[~no_width] = group_num(False)[~no_width]
+
+        geometry[~no_width] = shapely.buffer(geometry[~no_width],
+                                             width[~no_width] / 2.,
+                                             quad_segs=int(
+                                                 self.options['resolution']),
+                                             cap_style='flat',
+                                             join_style='mitre')
+        return geometry, group
+
+    def _get_detail_level(self, ax: Axes, view: Tuple[float, float, float,
+                                                      float]) -> int:
+        """Level of simplification of the outlines, for the view.
+
+        Args:
+            ax (Axes): The axes
+            view (tuple): The axes limits, as (minx, miny, maxx, maxy)
 
-            # TODO: Check that the function exists
-            render_func = getattr(self, f'render_{element_type}')
-            render_func(table1, ax, subtracted=False)
+        Returns:
+            int: The outlines are simplified with a tolerance of 2**level.
+            None to not simplify.
+        """
+        simplify_pixels = float(self.options.simplify_pixels)
+        width_pixels = ax.bbox.width
+        if view is None or simplify_pixels <= 0 or width_pixels <= 0:
+            return None
+        tolerance = simplify_pixels * (view[2] - view[0]) / width_pixels
+        if tolerance <= 0:
+            return None
+        return int(np.floor(np.log2(tolerance)))
+
+    def _on_limits_changed(self, ax: Axes):
+        """Update the drawing when the axes limits are no longer within the
+        drawn region, or the level of simplification changed.
+
+        Args:
+            ax (Axes): The axes
+        """
+        (minx, maxx), (miny,
+                       maxy) = sorted(ax.get_xlim()), sorted(ax.get_ylim())
+        self._view = (minx, miny, maxx, maxy)
+
+        rendered = self._rendered
+        region = rendered.region
+        if (rendered.ax is ax and
+                rendered.level == self._get_detail_level(ax, self._view) and
+            (region is None or (region[0] <= minx and region[1] <= miny and
+                                maxx <= region[2] and maxy <= region[3]))):
+            return
+
+        # Whoever changed the limits redraws the canvas.
+        self._render_view(ax, self._view)
+
+    def _render_view(self, ax: Axes, view: Tuple[float, float, float, float]):
+        """Draw the cached qgeometry of the components near the view, in
+        place of what was drawn before.
+
+        Args:
+            ax (Axes): The axes
+            view (tuple): The axes limits, as (minx, miny, maxx, maxy).  None
+                          to draw all the components, without simplification.
+        """
+        # pylint: disable=too-many-locals
+        for artist in self._rendered.artists:
+            artist.remove()
+
+        if view is None:
+            region = None
+            component_ids = list(self._render_cache)
+        else:
+            margin = float(self.options.view_margin)
+            minx, miny, maxx, maxy = view
+            region = (minx - margin * (maxx - minx),
+                      miny - margin * (maxy - miny),
+                      maxx + margin * (maxx - minx),
+                      maxy + margin * (maxy - miny))
+            component_ids = self.qgeometry.spatial_index.query(
+                shapely.box(*region))
+        level = self._get_detail_level(ax, view)
+
+        entries = [
+            self._get_render_entry(component_id, level)
+            for component_id in component_ids
+            if component_id not in self._hidden_components and
+            component_id in self._render_cache
+        ]
+        artists = []
+        if entries:
+            geometry, group, layer = (
+                np.concatenate(arrays) for arrays in zip(*entries))
+            if self.hidden_layers:
+                group[np.isin(layer, list(self.hidden_layers))] = -1
+
+            for num, (element_type, subtracted,
+                      is_line) in enumerate(self.draw_groups):
+                in_group = geometry[group == num]
+                in_group = in_group[~shapely.is_empty(in_group)]
+                if len(in_group) == 0:
+                    continue
+                if is_line:
+                    collection = LineCollection(
+                        [np.asarray(line.coords) for line in in_group])
+                else:
+                    kw = self.get_style(
+                        'JJ' if element_type == 'junction' else 'poly',
+                        subtracted=subtracted)
+                    collection = PatchCollection(
+                        to_poly_patch(in_group),
+                        **self.get_style('poly',
+                                         subtracted=subtracted,
+                                         extra=kw))
+                ax.add_collection(collection)
+                artists.append(collection)
+
+        self._rendered = Dict(ax=ax,
+                              region=region,
+                              level=level,
+                              artists=artists)
+
+    def _get_render_entry(
+            self, component_id: int,
+            level: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The cached geometry of a component, simplified for the level.
+
+        Args:
+            component_id (int): Unique id of the component
+            level (int): See _get_detail_level()
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The geometry, group
+            and layer of each row.
+        """
+        entry = self._render_cache[component_id]
+        geometry = entry.geometry
+        if level is not None and len(geometry) > 0:
+            if entry.simplified is None or entry.simplified[0] != level:
+                entry.simplified = (level,
+                                    shapely.simplify(geometry,
+                                                     2.0**level,
+                                                     preserve_topology=True))
+            geometry = entry.simplified[1]
+        return geometry, entry.group.copy(), entry.layer
 
     def render_junction(self,
                         table: pd.DataFrame,
@@ -328,27 +611,9 @@ class QMplRenderer():
         path = row["geometry"].coords
         if len(path) <= 2:  # only start and end points, no need to fillet
             return row["geometry"]
-        newpath = np.array([path[0]])
-
-        # Get list of vertices that can't be filleted
-        no_fillet = bad_fillet_idxs(path, row["fillet"],
-                                    self.design.template_options.PRECISION)
-
-        # Iterate through every three-vertex corner
-        for (i, (start, corner, end)) in enumerate(zip(path, path[1:],
-                                                       path[2:])):
-            if i + 1 in no_fillet:  # don't fillet this corner
-                newpath = np.concatenate((newpath, np.array([corner])))
-            else:
-                fillet = self._calc_fillet(np.array(start), np.array(corner),
-                                           np.array(end), row["fillet"],
-                                           int(self.options['resolution']))
-                if fillet is not False:
-                    newpath = np.concatenate((newpath, fillet))
-                else:
-                    newpath = np.concatenate((newpath, np.array([corner])))
-        newpath = np.concatenate((newpath, np.array([end])))
-        return LineString(newpath)
+        return LineString(
+            fillet_coords(path, row["fillet"], int(self.options['resolution']),
+                          self.design.template_options.PRECISION))
 
     def _calc_fillet(self,
                      vertex_start,
@@ -419,19 +684,10 @@ class QMplRenderer():
                                                               p1):
             theta_start, theta_end = theta_end, theta_start
 
-        # Populate the fillet corner, skipping the start point since it's already added
-        path = np.array([
-            circle_center + radius * np.array(
-                [np.cos(theta_start), np.sin(theta_start)])
-        ])
-        for theta in np.linspace(theta_start, theta_end, points)[1:]:
-            path = np.concatenate(
-                (path,
-                 np.array([
-                     circle_center + radius *
-                     np.array([np.cos(theta), np.sin(theta)])
-                 ])))
-        return path
+        # Populate the fillet corner
+        theta = np.linspace(theta_start, theta_end, points)
+        return circle_center + radius * np.stack(
+            (np.cos(theta), np.sin(theta)), axis=1)
 
     def render_path(self,
                     table: pd.DataFrame,
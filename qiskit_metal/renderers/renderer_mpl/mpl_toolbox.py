@@ -13,11 +13,17 @@
 # that they have been altered from the originals.
 """Plotting functions for shapely components using mpl."""
 
+from typing import TYPE_CHECKING
+
 import descartes  # shapely plot
 import matplotlib as mpl
 import matplotlib.cbook as cbook
+# Used as mpl.collections, etc., as pyplot is not imported with the module
+import matplotlib.collections  # pylint: disable=unused-import
+import matplotlib.font_manager  # pylint: disable=unused-import
 import matplotlib.image as image
-import matplotlib.pyplot as plt
+import matplotlib.patches  # pylint: disable=unused-import
+import matplotlib.ticker  # pylint: disable=unused-import
 import numpy as np
 import shapely
 from cycler import cycler
@@ -26,9 +32,13 @@ from shapely.geometry import LinearRing, Polygon  # Point, LineString,
 
 from ... import Dict
 from ...draw import BaseGeometry
-from .mpl_interaction import figure_pz
 from .patch import PolygonPatch
 
+if TYPE_CHECKING:
+    # pyplot, and the Qt interaction of figure_spawn, are only imported
+    # when an axis or a figure is needed.
+    import matplotlib.pyplot as plt
+
 __all__ = [
     '_render_poly_zkm', 'render_poly', 'render', 'style_axis_simple',
     'get_prop_cycle', 'style_axis_standard', 'figure_spawn',
@@ -89,7 +99,7 @@ def _render_poly_zkm(poly: Polygon, ax, kw=None, kw_hole=None):
         ax.add_collection(mpl.collections.PatchCollection(polys, **kw_hole))
 
 
-def render_poly(poly: shapely.geometry.Polygon, ax: plt.Axes, kw=None):
+def render_poly(poly: shapely.geometry.Polygon, ax: 'plt.Axes', kw=None):
     """Render an individual shapely shapely.geometry.Polygon.
 
     Args:
@@ -133,7 +143,10 @@ def render(
     #print(__depth, _iteration, components, '\n')
 
     kw = kw or {}
-    ax = ax or plt.gca()
+    if ax is None:
+        # pylint: disable=import-outside-toplevel
+        import matplotlib.pyplot as plt
+        ax = plt.gca()
 
     if labels is 'auto':
         labels = list(map(str, range(len(components))))
@@ -235,6 +248,8 @@ def style_axis_simple(ax, labels=None):
         labels (str): Label
     """
     if ax is None:
+        # pylint: disable=import-outside-toplevel
+        import matplotlib.pyplot as plt
         ax = plt.gca()
 
     # If 'box', change the physical dimensions of the Axes.
@@ -250,7 +265,7 @@ def style_axis_simple(ax, labels=None):
         ax.legend(loc='center left', bbox_to_anchor=(1, 0.5), prop=font_p)
 
 
-rcParams = plt.matplotlib.rcParams
+rcParams = mpl.rcParams
 
 
 def get_prop_cycle():
@@ -323,6 +338,10 @@ def figure_spawn(fig_kw=None):
     Returns:
         (fig_draw, ax_draw)
     """
+    # pylint: disable=import-outside-toplevel
+    import matplotlib.pyplot as plt
+    from .mpl_interaction import figure_pz
+
     if not fig_kw:
         fig_kw = {}
     fig_draw = figure_pz(**{**dict(num=1), **fig_kw})
@@ -338,7 +357,6 @@ def figure_spawn(fig_kw=None):
     ax_draw.set_xlabel('X position (mm)')
     ax_draw.set_ylabel('Y position (mm)')
 
-    # pylint: disable=import-outside-toplevel
     def clear_me():
         plt.sca(ax_draw)
         #from pyEPR.toolbox_plotting import plt_cla
@@ -363,7 +381,7 @@ def figure_spawn(fig_kw=None):
 #######################################################################
 
 
-def _axis_set_watermark_img(ax: plt.Axes, file: str, size: float = 0.25):
+def _axis_set_watermark_img(ax: 'plt.Axes', file: str, size: float = 0.25):
     """Burn the axis watermark into the image.
 
     Args:
@@ -396,7 +414,7 @@ def _axis_set_watermark_img(ax: plt.Axes, file: str, size: float = 0.25):
 #######################################################################
 
 
-def clear_axis(ax: plt.Axes):
+def clear_axis(ax: 'plt.Axes'):
     """Clear all plotted objects on an axis including lines, patches, tests, tables,
     artists, images, mouseovers, child axes, legends, collections, and containers.
     See: https://matplotlib.org/devdocs/api/_as_gen/matplotlib.axes.Axes.clear.html
@@ -26,6 +26,8 @@ import pandas as pd
 
 from qiskit_metal.analyses.quantization import lumped_capacitive
 from qiskit_metal.analyses.hamiltonian.transmon_charge_basis import Hcpb
+from qiskit_metal.analyses.hamiltonian.transmon_charge_basis import cpb_levels
+from qiskit_metal.analyses.hamiltonian.transmon_charge_basis import cpb_charge_dispersion
 from qiskit_metal.analyses.hamiltonian.HO_wavefunctions import wavefunction
 from qiskit_metal.analyses.em import cpw_calculations, kappa_calculation
 from qiskit_metal.analyses.sweep_and_optimize.sweeper import Sweeper
@@ -765,6 +767,35 @@ class TestAnalyses(unittest.TestCase, AssertionsMixin):
         hcpb = Hcpb(nlevels=15, Ej=13971.3, Ec=295.2, ng=0.001)
         self.assertAlmostEqual(hcpb.n_ij(1, 2), 1.4670047579229986)
 
+    def test_analysis_transmon_charge_basis_cpb_levels(self):
+        """Test cpb_levels in transmon_charge_basis.py matches Hcpb for
+        arrays of Ej, Ec and ng."""
+        Ej = np.array([[13971.3], [5000.]])
+        ng = np.array([-0.7, 0.001, 0.25, 0.5])
+        levels = cpb_levels(Ej, 295.2, ng, nlevels=15, num_levels=3)
+
+        self.assertEqual(levels.shape, (2, 4, 3))
+        for i, an_ej in enumerate(Ej[:, 0]):
+            for j, an_ng in enumerate(ng):
+                hcpb = Hcpb(nlevels=15, Ej=an_ej, Ec=295.2, ng=an_ng)
+                self.assertIterableAlmostEqual(levels[i, j],
+                                               hcpb.evals[:3],
+                                               rel_tol=1e-9)
+
+    def test_analysis_transmon_charge_basis_cpb_charge_dispersion(self):
+        """Test cpb_charge_dispersion in transmon_charge_basis.py."""
+        dispersion = cpb_charge_dispersion([13971.3, 5000.], 295.2)
+        self.assertEqual(dispersion.shape, (2, 2))
+        for i, an_ej in enumerate([13971.3, 5000.]):
+            self.assertAlmostEqual(
+                dispersion[i, 1],
+                Hcpb(nlevels=15, Ej=an_ej, Ec=295.2, ng=0.5).evals[1] -
+                Hcpb(nlevels=15, Ej=an_ej, Ec=295.2, ng=0.).evals[1])
+        # The ground state is lowest at ng=0, and the dispersion falls
+        # exponentially with Ej/Ec
+        self.assertTrue(np.all(dispersion[:, 0] > 0))
+        self.assertGreater(abs(dispersion[1, 1]), 10 * abs(dispersion[0, 1]))
+
     def test_analysis_kappa_calculation_kappa_in(self):
         """Test the kappa_in function in kappa_calculation.py."""
         self.assertAlmostEqual(
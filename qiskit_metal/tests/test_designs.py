@@ -21,18 +21,25 @@
 # pylint: disable-msg=import-error
 """Qiskit Metal unit tests analyses functionality."""
 
+import os
+import tempfile
 import unittest
+from unittest.mock import patch
+import numpy as np
 import pandas as pd
 
 from qiskit_metal.designs.design_base import QDesign
 from qiskit_metal.designs.design_planar import DesignPlanar
+from qiskit_metal.designs._parallel_build import make_in_processes
 from qiskit_metal.designs.interface_components import Components
 from qiskit_metal.designs.net_info import QNet
 from qiskit_metal.qlibrary.core import QComponent
 from qiskit_metal.qlibrary.qubits.transmon_pocket import TransmonPocket
 from qiskit_metal.tests.assertions import AssertionsMixin
+from qiskit_metal.toolbox_metal.import_export import _encode, read_metal_manifest
 
 from qiskit_metal.qlibrary.lumped.resonator_coil_rect import ResonatorCoilRect
+from qiskit_metal.qlibrary.tlines.straight_path import RouteStraight
 
 
 class TestDesign(unittest.TestCase, AssertionsMixin):
@@ -465,6 +472,306 @@ class TestDesign(unittest.TestCase, AssertionsMixin):
         self.assertEqual(pf['pin_name'][0], 'p1')
         self.assertEqual(pf['pin_name'][1], 'p2')
 
+    def test_design_get_dependency_graph(self):
+        """Test get_dependency_graph and get_dependents functionality in
+        design_base.py."""
+        design = DesignPlanar()
+
+        TransmonPocket(design, 'Q1', options=dict(connection_pads=dict(a={})))
+        TransmonPocket(design,
+                       'Q2',
+                       options=dict(pos_x='2mm', connection_pads=dict(a={})))
+        TransmonPocket(design, 'Q3', options=dict(pos_y='2mm'))
+        RouteStraight(
+            design,
+            'cpw',
+            options=dict(
+                pin_inputs=dict(start_pin=dict(component='Q1', pin='a'),
+                                end_pin=dict(component='Q2', pin='a'))))
+        design.add_dependency('cpw', 'Q3')
+
+        graph = design.get_dependency_graph()
+        self.assertEqual(graph, {1: {4}, 2: {4}, 3: set(), 4: {3}})
+        self.assertEqual(design.get_dependents('Q1'), {3, 4})
+        self.assertEqual(design.get_dependents('Q3'), set())
+
+        design.remove_dependency('cpw', 'Q3')
+        self.assertEqual(design.get_dependents('Q1'), {4})
+
+    def test_design_update_component(self):
+        """Test update_component functionality in design_base.py."""
+        design = DesignPlanar()
+
+        TransmonPocket(design, 'Q1', options=dict(connection_pads=dict(a={})))
+        TransmonPocket(design,
+                       'Q2',
+                       options=dict(pos_x='2mm', connection_pads=dict(a={})))
+        TransmonPocket(design, 'Q3', options=dict(pos_y='2mm'))
+        cpw = RouteStraight(
+            design,
+            'cpw',
+            options=dict(
+                pin_inputs=dict(start_pin=dict(component='Q1', pin='a'),
+                                end_pin=dict(component='Q2', pin='a'))))
+        length = cpw.length
+
+        design.components['Q2'].options.pos_x = '3mm'
+        self.assertEqual(design.update_component('Q2'), ['Q2', 'cpw'])
+        self.assertAlmostEqual(cpw.length, length + 1, places=6)
+        self.assertEqual(len(design.net_info), 4)
+
+        self.assertEqual(design.update_component('Q3'), [])
+        design.components['Q1'].options.pos_y = '0.1mm'
+        self.assertEqual(design.update_component('Q1', dependencies=False),
+                         ['Q1'])
+        self.assertEqual(design.update_component('cpw'), ['cpw'])
+        self.assertEqual(design.update_component('not-there'), [])
+
+    def test_design_rebuild_skips_unchanged(self):
+        """Test rebuild only remakes the components which changed."""
+        design = DesignPlanar()
+        design.variables['cpw_x'] = '1mm'
+
+        q1 = TransmonPocket(design,
+                            'Q1',
+                            options=dict(pos_x='-1mm',
+                                         connection_pads=dict(a={})))
+        q2 = TransmonPocket(design,
+                            'Q2',
+                            options=dict(pos_x='cpw_x',
+                                         connection_pads=dict(a={})))
+        cpw = RouteStraight(
+            design,
+            'cpw',
+            options=dict(
+                pin_inputs=dict(start_pin=dict(component='Q1', pin='a'),
+                                end_pin=dict(component='Q2', pin='a'))))
+        length = cpw.length
+
+        self.assertFalse(q1.rebuild())
+        self.assertFalse(cpw.rebuild())
+        self.assertTrue(q1.rebuild(force=True))
+        self.assertTrue(cpw.rebuild())
+        self.assertFalse(cpw.rebuild())
+
+        design.variables['cpw_x'] = '2mm'
+        self.assertEqual(design.update_component('Q2'), ['Q2', 'cpw'])
+        self.assertAlmostEqual(cpw.length, length + 1, places=6)
+        self.assertFalse(q2.rebuild())
+        self.assertEqual(len(design.net_info), 4)
+
+    def test_design_reuse_geometry(self):
+        """Test components differing by position reuse the geometry made."""
+        design = DesignPlanar()
+        options = dict(orientation=90, connection_pads=dict(a={}))
+        q1 = TransmonPocket(design, 'Q1', options=options)
+        q2 = TransmonPocket(design, 'Q2', make=False, options=options)
+        q2.options.pos_x = '1.3mm'
+        with patch.object(TransmonPocket, 'make') as make:
+            q2.rebuild()
+            make.assert_not_called()
+            q2.options.pad_gap = '40um'
+            q2.rebuild()
+            make.assert_called_once()
+
+        # Same geometry and pins as if made, up to the position
+        q2.options.pad_gap = q1.options.pad_gap
+        q2.rebuild()
+        reused = design.qgeometry.tables['poly']
+        reused = reused[reused['component'] == q2.id].geometry.values
+        pin = q2.pins['a']
+        q2.rebuild(force=True)
+        made = design.qgeometry.tables['poly']
+        made = made[made['component'] == q2.id].geometry.values
+        self.assertTrue(all(reused.geom_equals_exact(made, 0)))
+        for key in ['points', 'middle', 'normal', 'width', 'parent_name']:
+            self.assertTrue(np.array_equal(pin[key], q2.pins['a'][key]))
+
+        # A redefined class of the same name does not reuse the geometry
+        redefined = type('TransmonPocket', (TransmonPocket,),
+                         dict(__module__=TransmonPocket.__module__))
+        q3 = redefined(design, 'Q3', make=False, options=options)
+        self.assertEqual(q3.class_name, q1.class_name)
+        q3.options.pos_x = '2.6mm'
+        with patch.object(redefined, 'make') as make:
+            q3.rebuild()
+            make.assert_called_once()
+
+    def test_design_rebuild_processes(self):
+        """Test rebuild with worker processes matches rebuild without."""
+        designs = [DesignPlanar(), DesignPlanar()]
+        for design in designs:
+            design.variables['pad'] = '400um'
+            for i in range(3):
+                TransmonPocket(design,
+                               f'Q{i}',
+                               options=dict(pos_x=f'{2 * i}mm',
+                                            pad_width='pad',
+                                            orientation=30 * i,
+                                            connection_pads=dict(a={}, b={})))
+            RouteStraight(
+                design,
+                'cpw',
+                options=dict(
+                    pin_inputs=dict(start_pin=dict(component='Q0', pin='a'),
+                                    end_pin=dict(component='Q1', pin='b'))))
+            design.variables['pad'] = '420um'
+
+        serial, parallel = designs
+        serial.rebuild()
+        with patch('qiskit_metal.designs.design_base.make_in_processes',
+                   wraps=make_in_processes) as workers:
+            parallel.rebuild(processes=2)
+        self.assertEqual(list(workers.call_args[0][1]), [1, 2, 3])
+
+        self.assertEqual(len(parallel.net_info), 4)
+        for name, table in serial.qgeometry.tables.items():
+            made = parallel.qgeometry.tables[name]
+            self.assertEqual(list(made['name']), list(table['name']))
+            self.assertTrue(
+                all(
+                    made.geometry.values.geom_equals_exact(
+                        table.geometry.values, 0)))
+        for name in ['Q1', 'cpw']:
+            for pin_name, pin in serial.components[name].pins.items():
+                self.assertTrue(
+                    np.array_equal(
+                        pin.points,
+                        parallel.components[name].pins[pin_name].points))
+
+    def test_design_batch(self):
+        """Test batch functionality in design_base.py."""
+
+        def add_components(design):
+            TransmonPocket(design,
+                           'Q1',
+                           options=dict(connection_pads=dict(a={})))
+            TransmonPocket(design,
+                           'Q2',
+                           options=dict(pos_x='2mm',
+                                        connection_pads=dict(a={})))
+            for name in ['cpw', 'cpw_again']:
+                RouteStraight(
+                    design,
+                    name,
+                    options=dict(
+                        pin_inputs=dict(start_pin=dict(component='Q1', pin='a'),
+                                        end_pin=dict(component='Q2', pin='a'))))
+
+        sequential = DesignPlanar()
+        add_components(sequential)
+
+        design = DesignPlanar()
+        with design.batch():
+            with design.batch():
+                add_components(design)
+            self.assertEqual(len(design.components), 4)
+            self.assertEqual(len(design.components['Q1'].pins), 0)
+            self.assertEqual(len(design.qgeometry.tables['poly']), 0)
+
+        self.assertEqual(design.components.keys(), ['Q1', 'Q2', 'cpw'])
+        self.assertEqual(design.components['cpw_again'], None)
+        self.assertEqual(len(design.net_info), 4)
+        self.assertAlmostEqual(design.components['cpw'].length,
+                               sequential.components['cpw'].length)
+        for name, table in sequential.qgeometry.tables.items():
+            batched = design.qgeometry.tables[name]
+            self.assertEqual(list(batched['name']), list(table['name']))
+            self.assertTrue(
+                all(batched.geometry.values.geom_equals(table.geometry.values)))
+
+    def test_design_batch_raises(self):
+        """Test batch in design_base.py when the block raises."""
+        design = DesignPlanar()
+        TransmonPocket(design, 'Q1')
+        with self.assertRaises(ValueError):
+            with design.batch():
+                TransmonPocket(design, 'Q2', options=dict(pos_x='2mm'))
+                raise ValueError('Error in the block')
+
+        self.assertEqual(design.components.keys(), ['Q1'])
+        self.assertEqual(len(design._batch_pending), 0)
+        self.assertEqual(design._batch_depth, 0)
+        self.assertEqual(set(design.qgeometry.tables['poly']['component']),
+                         {design.components['Q1'].id})
+
+    def test_design_save_and_load_design(self):
+        """Test save_design and load_design round trip a design."""
+        design = DesignPlanar()
+        design.variables['cpw_x'] = '2mm'
+
+        TransmonPocket(design, 'Q1', options=dict(connection_pads=dict(a={})))
+        TransmonPocket(design,
+                       'Q2',
+                       options=dict(pos_x='cpw_x', connection_pads=dict(a={})))
+        RouteStraight(
+            design,
+            'cpw',
+            options=dict(
+                pin_inputs=dict(start_pin=dict(component='Q1', pin='a'),
+                                end_pin=dict(component='Q2', pin='a'))))
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'design.metal.zip')
+            self.assertTrue(design.save_design(path))
+
+            manifest = read_metal_manifest(path)
+            self.assertEqual([item.name for item in manifest.components],
+                             ['Q1', 'Q2', 'cpw'])
+            self.assertEqual(manifest.components[1].options.pos_x, 'cpw_x')
+
+            for geometry in ['load', 'lazy', 'rebuild']:
+                loaded = DesignPlanar.load_design(path, geometry=geometry)
+                self.assertEqual(loaded.save_path, path)
+                self.assertEqual(loaded.variables['cpw_x'], '2mm')
+                self.assertEqual(loaded.all_component_names_id(),
+                                 design.all_component_names_id())
+                self.assertEqual(len(loaded.net_info), 4)
+                self.assertTrue(loaded.components['cpw'].pins['start'].net_id)
+                self.assertEqual(bool(loaded.qgeometry._deferred),
+                                 geometry == 'lazy')
+                for table_name, table in design.qgeometry.tables.items():
+                    loaded_table = loaded.qgeometry.tables[table_name]
+                    self.assertEqual(list(loaded_table.columns),
+                                     list(table.columns))
+                    self.assertEqual(len(loaded_table), len(table))
+                    self.assertTrue(
+                        loaded_table.geometry.geom_equals_exact(
+                            table.geometry, 1e-9).all())
+
+            # The loaded design can be edited
+            loaded.variables['cpw_x'] = '3mm'
+            self.assertEqual(loaded.update_component('Q2'), ['Q2', 'cpw'])
+            self.assertAlmostEqual(loaded.components['cpw'].length,
+                                   design.components['cpw'].length + 1,
+                                   places=6)
+
+            # Editing a lazily loaded design does not decode its tables
+            lazy = DesignPlanar.load_design(path, geometry='lazy')
+            lazy.variables['cpw_x'] = '3mm'
+            self.assertEqual(lazy.update_component('Q2'), ['Q2', 'cpw'])
+            self.assertEqual(set(lazy.qgeometry._deferred),
+                             set(loaded.qgeometry.get_element_types()))
+            for table_name, table in loaded.qgeometry.tables.items():
+                lazy_table = lazy.qgeometry.tables[table_name]
+                self.assertEqual(list(lazy_table['name']), list(table['name']))
+                self.assertTrue(
+                    lazy_table.geometry.geom_equals_exact(table.geometry,
+                                                          1e-9).all())
+
+    def test_design_save_unsupported_option(self):
+        """Test that saving a design with an option of a type which can not
+        be saved fails, and names the option."""
+        design = DesignPlanar()
+        q1 = TransmonPocket(design, 'Q1')
+        q1.options.custom = dict(callback=print)
+
+        with self.assertRaisesRegex(TypeError, 'Q1.options.custom.callback'):
+            _encode(q1.options, 'Q1.options')
+        with tempfile.TemporaryDirectory() as folder:
+            self.assertFalse(
+                design.save_design(os.path.join(folder, 'design.metal.zip')))
+
     def test_design_delete_all_pins(self):
         """Test delete_all_pins functionality in design_base.py."""
         design = DesignPlanar()
@@ -518,6 +825,29 @@ class TestDesign(unittest.TestCase, AssertionsMixin):
         self.assertEqual(result['aedt_hfss_inductance'], 10e-9)
         self.assertEqual(result['aedt_hfss_capacitance'], 0)
 
+    def test_design_renderers_instantiated_when_used(self):
+        """Test that the renderers of a design are only instantiated when
+        first used, and that their columns are added to the tables before."""
+        design = DesignPlanar()
+        renderers = design.renderers
+
+        self.assertIn('gds', renderers)
+        self.assertFalse(renderers.is_instantiated('gds'))
+        self.assertIn('gds_cell_name', design.qgeometry.tables['junction'])
+        self.assertEqual(
+            design.renderer_defaults_by_table['junction']['gds']['cell_name'],
+            'my_other_junction')
+
+        gds = design.renderers.gds
+        self.assertIs(renderers['gds'], gds)
+        self.assertIs(gds.design, design)
+        self.assertTrue(renderers.is_instantiated('gds'))
+        self.assertFalse(renderers.is_instantiated('hfss'))
+        self.assertEqual(renderers.get('nope'), None)
+
+        self.assertEqual(len(renderers), len(list(renderers.values())))
+        self.assertTrue(renderers.is_instantiated('hfss'))
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
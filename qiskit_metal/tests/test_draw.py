@@ -423,6 +423,26 @@ class TestDraw(unittest.TestCase, AssertionsMixin):
         self.assertFalse(utility.check_duplicate_list(list_1))
         self.assertTrue(utility.check_duplicate_list(list_2))
 
+    def test_draw_utility_round_coordinates(self):
+        """Test round_coordinates in utility.py rounds as round() does."""
+        poly = Polygon([(0, 0), (1.0000000004, 0), (1, 2.7629535925)],
+                       [[(0.2, 0.1), (0.3, 0.10000000006), (0.3, 0.2)]])
+        line = LineString([(0.1 + 0.2, 0), (2, 6.9814887025)])
+
+        actual = utility.round_coordinates([poly, line], 9)
+
+        self.assertEqual(list(actual[0].exterior.coords), [(0, 0), (1, 0),
+                                                           (1, 2.762953593),
+                                                           (0, 0)])
+        self.assertEqual(list(actual[0].interiors[0].coords), [(0.2, 0.1),
+                                                               (0.3, 0.1),
+                                                               (0.3, 0.2),
+                                                               (0.2, 0.1)])
+        self.assertEqual(list(actual[1].coords), [(0.3, 0), (2, 6.981488703)])
+        self.assertTrue(
+            utility.round_coordinate_sequence(line,
+                                              9).equals_exact(actual[1], 0))
+
     def test_draw_utility_array_chop(self):
         """Test array_chop in utility.py."""
         my_list = [0, 1, 0.02, 2, -1, 3, 0.11, 4, 5]
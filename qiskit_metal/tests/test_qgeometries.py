@@ -22,6 +22,7 @@ import unittest
 import numpy as np
 
 from geopandas import GeoDataFrame
+from shapely.geometry import LineString
 
 from qiskit_metal import designs
 from qiskit_metal import draw
@@ -218,6 +219,95 @@ class TestElements(unittest.TestCase):
         self.assertEqual(table['poly']['chip'][0], 'main')
         self.assertEqual(str(table['poly']['fillet'][0]), str(np.nan))
 
+    def test_qgeometry_q_element_flush(self):
+        """Test that add_qgeometry stages rows until flush in QGeometryTables
+        class in element_handler.py."""
+        design = designs.DesignPlanar()
+        qgt = QGeometryTables(design)
+        qgt.clear_all_tables()
+        TransmonPocket(design, 'Q1')
+
+        a_poly = draw.rectangle(2, 2, 0, 0)
+        qgt.add_qgeometry('poly', 1, dict(cl_metal=a_poly))
+        qgt.add_qgeometry('poly', 1, dict(cl_metal_2=a_poly))
+
+        self.assertEqual(len(qgt._buffers['poly'][1]), 2)
+        self.assertEqual(len(qgt.get_component('Q1', 'poly')), 2)
+
+        qgt.flush()
+        self.assertEqual(len(qgt._buffers), 0)
+        self.assertEqual(len(qgt._tables['poly']), 2)
+        self.assertEqual(list(qgt.tables['poly']['name']),
+                         ['cl_metal', 'cl_metal_2'])
+
+        qgt.add_qgeometry('poly', 1, dict(cl_metal_3=a_poly))
+        qgt.delete_component_id(1)
+        self.assertEqual(len(qgt._buffers['poly']), 0)
+        self.assertEqual(len(qgt.tables['poly']), 0)
+
+    def test_qgeometry_q_element_row_index(self):
+        """Test that deletes are applied through the per component row index
+        in QGeometryTables class in element_handler.py."""
+        design = designs.DesignPlanar()
+        qgt = QGeometryTables(design)
+        qgt.clear_all_tables()
+        TransmonPocket(design, 'Q1')
+        TransmonPocket(design, 'Q2')
+
+        a_poly = draw.rectangle(2, 2, 0, 0)
+        qgt.add_qgeometry('poly', 1, dict(first=a_poly, second=a_poly))
+        qgt.add_qgeometry('poly', 2, dict(third=a_poly))
+        qgt.flush()
+
+        self.assertEqual(list(qgt._get_row_index('poly')[1]), [0, 1])
+        self.assertEqual(list(qgt._get_row_index('poly')[2]), [2])
+
+        qgt.delete_component_id(1)
+        self.assertEqual(qgt._deleted['poly'], {1})
+        self.assertEqual(len(qgt.get_component('Q1', 'poly')), 0)
+        self.assertEqual(len(qgt.get_component('Q2', 'poly')), 1)
+
+        qgt.add_qgeometry('poly', 1, dict(fourth=a_poly))
+        self.assertEqual(list(qgt.get_component('Q1', 'poly')['name']),
+                         ['fourth'])
+        self.assertEqual(list(qgt.tables['poly']['name']), ['third', 'fourth'])
+        self.assertEqual(len(qgt._deleted), 0)
+
+        # The flush updates the row index, rather than regroup the table
+        self.assertIs(qgt._indexed_tables['poly'], qgt._tables['poly'])
+        self.assertEqual(list(qgt._row_index['poly'][2]), [0])
+        self.assertEqual(list(qgt._row_index['poly'][1]), [1])
+
+    def test_qgeometry_q_element_spatial_index(self):
+        """Test the spatial index of QGeometryTables class in
+        element_handler.py follows changes to the qgeometry."""
+        design = designs.DesignPlanar()
+        TransmonPocket(design, 'Q1')
+        TransmonPocket(design, 'Q2', options=dict(pos_x='2mm'))
+        spatial_index = design.qgeometry.spatial_index
+
+        self.assertEqual(spatial_index.query(LineString([(-1, 0), (1, 0)])),
+                         [1])
+        self.assertEqual(spatial_index.query(LineString([(-1, 0), (3, 0)])),
+                         [1, 2])
+        self.assertEqual(spatial_index.query(LineString([(0, 2), (2, 2)])), [])
+        self.assertEqual(tuple(spatial_index.get_bounds(2)),
+                         tuple(design.components['Q2'].qgeometry_bounds()))
+        outline = spatial_index.get_outline(1)
+        self.assertEqual(outline[0], outline[-1])
+
+        revision = design.qgeometry.get_component_revision(2)
+        design.components['Q2'].options.pos_y = '2mm'
+        design.rebuild()
+        self.assertGreater(design.qgeometry.get_component_revision(2), revision)
+        self.assertEqual(spatial_index.query(LineString([(-1, 0), (3, 0)])),
+                         [1])
+        self.assertEqual(spatial_index.query(LineString([(0, 2), (2, 2)])), [2])
+
+        design.delete_component('Q1')
+        self.assertEqual(spatial_index.query(LineString([(-1, 0), (3, 2)])),
+                         [2])
+
     def test_qgeometry_q_element_clear_all_tables(self):
         """Test clear_all_tables in QGeometryTables class in
         element_handler.py."""
@@ -680,8 +680,9 @@ class TestComponentOptions(unittest.TestCase, AssertionsMixin):
         options = route_pathfinder.default_options
 
         # Test all elements of the result data against expected data
-        self.assertEqual(len(options), 2)
+        self.assertEqual(len(options), 3)
         self.assertEqual(options['step_size'], '0.25mm')
+        self.assertEqual(options['engine'], 'astar')
         self.assertEqual(len(options['advanced']), 1)
         self.assertEqual(options['advanced']['avoid_collision'], 'true')
 
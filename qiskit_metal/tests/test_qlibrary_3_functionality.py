@@ -19,6 +19,7 @@
 """Qiskit Metal unit tests components functionality."""
 
 import unittest
+from unittest.mock import patch
 import numpy as np
 
 from qiskit_metal.qlibrary.core import _parsed_dynamic_attrs
@@ -28,6 +29,7 @@ from qiskit_metal.qlibrary._template import MyQComponent
 from qiskit_metal.qlibrary.core import QComponent
 from qiskit_metal.qlibrary.core import QRoute
 from qiskit_metal.qlibrary.core import BaseQubit
+from qiskit_metal.qlibrary.core.design_check import QDesignCheck
 from qiskit_metal.qlibrary.lumped.cap_n_interdigital import CapNInterdigital
 from qiskit_metal.qlibrary.couplers.coupled_line_tee import CoupledLineTee
 from qiskit_metal.qlibrary.couplers.cap_n_interdigital_tee import CapNInterdigitalTee
@@ -38,6 +40,7 @@ from qiskit_metal.qlibrary.tlines import anchored_path
 from qiskit_metal.qlibrary.tlines.anchored_path import RouteAnchors
 from qiskit_metal.qlibrary.tlines.framed_path import RouteFramed
 from qiskit_metal.qlibrary.tlines.meandered import RouteMeander
+from qiskit_metal.qlibrary.tlines.pathfinder import RoutePathfinder
 from qiskit_metal.qlibrary.tlines import straight_path
 from qiskit_metal import designs
 from qiskit_metal.qlibrary.qubits import star_qubit
@@ -548,6 +551,114 @@ class TestComponentFunctionality(unittest.TestCase, AssertionsMixin):
             anchored_path.intersecting(np.array([1, 1]), np.array([3, 3]),
                                        np.array([5, 5]), np.array([7, 7])))
 
+    def test_qlibrary_pathfinder_grid_engine(self):
+        """Test the grid engine of RoutePathfinder in pathfinder.py routes
+        around obstacles."""
+        design = designs.DesignPlanar()
+        for num in range(6):
+            transmon_pocket.TransmonPocket(
+                design, f'W{num}', options=dict(pos_y=f'{0.6 * num - 1.5}mm'))
+        transmon_pocket.TransmonPocket(
+            design,
+            'A',
+            options=dict(pos_x='-2mm',
+                         connection_pads=dict(a=dict(loc_W=1, loc_H=1))))
+        transmon_pocket.TransmonPocket(
+            design,
+            'B',
+            options=dict(pos_x='2mm',
+                         pos_y='0.5mm',
+                         connection_pads=dict(a=dict(loc_W=-1, loc_H=1))))
+        # Far away, does not enlarge the grid
+        transmon_pocket.TransmonPocket(design,
+                                       'far',
+                                       options=dict(pos_x='40mm'))
+        with patch.object(RoutePathfinder,
+                          '_get_grid_occupancy',
+                          autospec=True,
+                          side_effect=RoutePathfinder._get_grid_occupancy
+                         ) as get_grid_occupancy, patch.object(
+                             RoutePathfinder,
+                             'connect_astar_or_simple',
+                             autospec=True,
+                             side_effect=RoutePathfinder.connect_astar_or_simple
+                         ) as connect_astar_or_simple:
+            route = RoutePathfinder(
+                design,
+                'route',
+                options=Dict(step_size='0.1mm',
+                             engine='grid',
+                             pin_inputs=Dict(start_pin=Dict(component='A',
+                                                            pin='a'),
+                                             end_pin=Dict(component='B',
+                                                          pin='a'))))
+
+        self.assertEqual(route.status, 'good')
+        self.assertTrue(get_grid_occupancy.called)
+        connect_astar_or_simple.assert_not_called()
+        for call in get_grid_occupancy.call_args_list:
+            self.assertLess(call.args[4][0], 100)
+        points = route.get_points()
+        self.assertEqual(len(points), 6)
+        for start, end in zip(points[:-1], points[1:]):
+            self.assertTrue(start[0] == end[0] or start[1] == end[1])
+        for num in range(1, len(points) - 2):
+            self.assertTrue(route.unobstructed([points[num], points[num + 1]]))
+        self.assertTrue(
+            np.allclose(points[-1], design.components['B'].pins['a'].middle))
+
+    def test_qlibrary_design_check_overlaps(self):
+        """Test check_overlaps of QDesignCheck in design_check.py."""
+        design = designs.DesignPlanar()
+        transmon_pocket.TransmonPocket(
+            design,
+            'Q1',
+            options=dict(pos_x='-1mm',
+                         connection_pads=dict(a=dict(loc_W=1, loc_H=1))))
+        transmon_pocket.TransmonPocket(
+            design,
+            'Q2',
+            options=dict(pos_x='1mm',
+                         connection_pads=dict(a=dict(loc_W=-1, loc_H=1))))
+        straight_path.RouteStraight(
+            design,
+            'cpw',
+            options=dict(
+                pin_inputs=dict(start_pin=dict(component='Q1', pin='a'),
+                                end_pin=dict(component='Q2', pin='a'))))
+        a_tester = QDesignCheck(design)
+
+        # The route is connected to the pads it touches
+        violations = a_tester.check_overlaps()
+        self.assertEqual(list(violations.columns),
+                         QDesignCheck.VIOLATION_COLUMNS)
+        self.assertEqual(len(violations), 0)
+
+        transmon_pocket.TransmonPocket(design,
+                                       'Q3',
+                                       options=dict(pos_x='-0.8mm',
+                                                    pos_y='0.1mm'))
+        violations = a_tester.check_overlaps()
+        self.assertEqual(set(violations['component_1']), {'Q1', 'cpw'})
+        self.assertEqual(set(violations['component_2']), {'Q3'})
+        self.assertEqual(set(violations['violation']), {'overlap'})
+
+        design.components['Q3'].options.pos_y = '-1.5mm'
+        design.rebuild()
+        self.assertEqual(len(a_tester.check_overlaps()), 0)
+        violations = a_tester.check_overlaps(min_spacing=1.2)
+        self.assertIn(
+            ('Q1', 'Q3'),
+            set(zip(violations['component_1'], violations['component_2'])))
+        self.assertEqual(set(violations['violation']), {'spacing'})
+        self.assertTrue((violations['distance'] > 0).all())
+
+        # No tables to check
+        violations = a_tester.check_overlaps(table_names=())
+        self.assertEqual(list(violations.columns),
+                         QDesignCheck.VIOLATION_COLUMNS)
+        self.assertEqual(len(violations), 0)
+
     @staticmethod
     def generate_spiral_list(x: int, y: int):
         """Helper function to generate a sprital list.
@@ -19,9 +19,17 @@
 # pylint: disable-msg=protected-access
 """Qiskit Metal unit tests analyses functionality."""
 
+import importlib
+import os
+import tempfile
 import unittest
-from unittest.mock import MagicMock
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+import gdspy
 import matplotlib.pyplot as _plt
+import numpy as np
+import pandas as pd
 
 from qiskit_metal import designs
 from qiskit_metal.renderers import setup_default
@@ -30,10 +38,15 @@ from qiskit_metal.renderers.renderer_ansys.q3d_renderer import QQ3DRenderer
 from qiskit_metal.renderers.renderer_ansys.hfss_renderer import QHFSSRenderer
 from qiskit_metal.renderers.renderer_base.renderer_base import QRenderer
 from qiskit_metal.renderers.renderer_base.renderer_gui_base import QRendererGui
-from qiskit_metal.renderers.renderer_gds.gds_renderer import QGDSRenderer
+from qiskit_metal.renderers.renderer_gds.gds_renderer import QGDSRenderer, gds_boolean_not
+from qiskit_metal.renderers.renderer_gds.make_cheese import cheese_booleans
+from qiskit_metal.renderers.renderer_metadata import renderers_metadata
 from qiskit_metal.renderers.renderer_mpl.mpl_interaction import MplInteraction
+from qiskit_metal.renderers.renderer_mpl.mpl_renderer import QMplRenderer
 from qiskit_metal.renderers.renderer_gmsh.gmsh_renderer import QGmshRenderer
+from qiskit_metal.renderers.renderer_elmer import elmer_renderer
 from qiskit_metal.renderers.renderer_elmer.elmer_renderer import QElmerRenderer
+from qiskit_metal.renderers.renderer_elmer.elmer_runner import run_elmer_case
 from qiskit_metal.renderers.renderer_ansys_pyaedt.hfss_renderer_eigenmode_aedt import QHFSSEigenmodePyaedt
 from qiskit_metal.renderers.renderer_ansys_pyaedt.hfss_renderer_drivenmodal_aedt import QHFSSDrivenmodalPyaedt
 from qiskit_metal.renderers.renderer_ansys_pyaedt.q3d_renderer_aedt import QQ3DPyaedt
@@ -323,7 +336,7 @@ class TestRenderers(unittest.TestCase):
         renderer = QGDSRenderer(design)
         options = renderer.default_options
 
-        self.assertEqual(len(options), 17)
+        self.assertEqual(len(options), 20)
         self.assertEqual(options['short_segments_to_not_fillet'], 'True')
         self.assertEqual(options['check_short_segments_by_scaling_fillet'],
                          '2.0')
@@ -338,6 +351,9 @@ class TestRenderers(unittest.TestCase):
                          '../resources/Fake_Junctions.GDS')
         self.assertEqual(options['junction_pad_overlap'], '5um')
         self.assertEqual(options['max_points'], '199')
+        self.assertEqual(options['num_workers'], '1')
+        self.assertEqual(options['hierarchical'], 'False')
+        self.assertEqual(options['streaming'], 'False')
         self.assertEqual(options['bounding_box_scale_x'], '1.2')
         self.assertEqual(options['bounding_box_scale_y'], '1.2')
 
@@ -457,6 +473,102 @@ class TestRenderers(unittest.TestCase):
         renderer = QElmerRenderer(design, initiate=False)
         self.assertEqual(renderer.name, 'elmer')
 
+    def test_renderer_elmer_runner_run_elmer_case(self):
+        """Test run_elmer_case runs ElmerGrid and ElmerSolver in the
+        simulation folder of a sweep variant."""
+        with tempfile.TemporaryDirectory() as folder:
+            # Stand-ins for the Elmer executables
+            elmergrid = os.path.join(folder, 'ElmerGrid')
+            with open(elmergrid, 'w', encoding='utf-8') as f:
+                f.write('#!/bin/sh\nmkdir -p ../out\n'
+                        'echo "$@" > ../out/mesh.header\n')
+            elmersolver = os.path.join(folder, 'ElmerSolver')
+            with open(elmersolver, 'w', encoding='utf-8') as f:
+                f.write('#!/bin/sh\necho "$@" > solved.txt\n')
+            os.chmod(elmergrid, 0o755)
+            os.chmod(elmersolver, 0o755)
+
+            sim_dir = os.path.join(folder, 'variant_0', 'simdata')
+            os.makedirs(sim_dir)
+            self.assertEqual(
+                run_elmer_case(sim_dir,
+                               'out.msh',
+                               'case.sif',
+                               elmergrid=elmergrid,
+                               elmersolver=elmersolver), sim_dir)
+
+            with open(os.path.join(sim_dir, 'mesh.header'),
+                      encoding='utf-8') as f:
+                self.assertEqual(f.read().split(), ['14', '2', '../out.msh'])
+            with open(os.path.join(sim_dir, 'solved.txt'),
+                      encoding='utf-8') as f:
+                self.assertEqual(f.read().split(), ['case.sif'])
+            self.assertFalse(
+                os.path.exists(os.path.join(folder, 'variant_0', 'out')))
+
+    def test_renderer_qelmer_renderer_flatten_variant(self):
+        """Test _flatten_variant in QElmerRenderer."""
+        flat = QElmerRenderer._flatten_variant(
+            dict(Q1=dict(pad_gap='30um',
+                         connection_pads=dict(a=dict(pad_width='100um'))),
+                 Q2=dict(pos_x='1mm')))
+        self.assertEqual(
+            flat, {
+                'Q1.pad_gap': '30um',
+                'Q1.connection_pads.a.pad_width': '100um',
+                'Q2.pos_x': '1mm'
+            })
+
+    def test_renderer_qelmer_renderer_run_sweep(self):
+        """Test run_sweep in QElmerRenderer, with Gmsh and Elmer mocked."""
+        design = designs.DesignPlanar()
+        TransmonPocket(design, 'Q1')
+        renderer = QElmerRenderer(design, initiate=False)
+        renderer.gmsh = MagicMock()
+        renderer.gmsh.export_mesh.side_effect = lambda path: open(
+            path, 'w', encoding='utf-8').close()
+
+        def render_design(**kwargs):
+            renderer.nets = {0: ['Q1_pad_top'], 1: ['Q1_pad_bot'], 'gnd': []}
+
+        def fake_run_elmer_case(sim_dir, meshfile, sif_name, **kwargs):
+            os.makedirs(sim_dir, exist_ok=True)
+            filename = renderer.default_setup['capacitance'][
+                'Capacitance_Matrix_Filename']
+            with open(os.path.join(sim_dir, filename), 'w',
+                      encoding='utf-8') as f:
+                f.write('1e-13 -2e-14\n-2e-14 1e-13\n')
+
+        variants = [dict(Q1=dict(pad_gap=gap)) for gap in ['20um', '40um']]
+        with patch.object(renderer, 'render_design',
+                          side_effect=render_design), patch.object(
+                              renderer, 'add_solution_setup'):
+            with patch.object(elmer_renderer,
+                              'run_elmer_case',
+                              side_effect=fake_run_elmer_case), patch.object(
+                                  elmer_renderer,
+                                  'ProcessPoolExecutor',
+                                  side_effect=ThreadPoolExecutor) as pool:
+                with tempfile.TemporaryDirectory() as folder:
+                    table = renderer.run_sweep(variants,
+                                               sweep_dir=folder,
+                                               num_workers=2)
+                    for i in range(len(variants)):
+                        self.assertTrue(
+                            os.path.isdir(os.path.join(folder, f'variant_{i}')))
+
+        pool.assert_called_once_with(max_workers=2)
+        self.assertEqual(table.shape, (18, 5))
+        self.assertEqual(
+            list(table.columns),
+            ['variant', 'Q1.pad_gap', 'net_1', 'net_2', 'capacitance'])
+        self.assertEqual(list(table.index), list(range(18)))
+        self.assertEqual(list(table['variant']), [0] * 9 + [1] * 9)
+        self.assertEqual(list(table['Q1.pad_gap']), ['20um'] * 9 + ['40um'] * 9)
+        self.assertEqual(set(table['net_1']),
+                         {'Q1_pad_top', 'Q1_pad_bot', 'ground_plane'})
+        self.assertEqual(design.components['Q1'].options.pad_gap, '30um')
+
     def test_renderer_gdsrenderer_inclusive_bound(self):
         """Test functionality of inclusive_bound in gds_renderer.py."""
         design = designs.DesignPlanar()
@@ -530,6 +642,25 @@ class TestRenderers(unittest.TestCase):
         self.assertEqual(etd['junction']['resistance'], 0)
         self.assertEqual(etd['junction']['mesh_kw_jj'], 7e-06)
 
+        # Same as the default options, see renderer_metadata
+        options = QAnsysRenderer.default_options
+        self.assertEqual(etd['junction']['inductance'], options['Lj'])
+        self.assertEqual(etd['junction']['capacitance'], options['Cj'])
+        self.assertEqual(etd['junction']['resistance'], options['_Rj'])
+        self.assertEqual(
+            etd['junction']['mesh_kw_jj'],
+            ansys_renderer.parse_units(options['max_mesh_length_jj']))
+
+    def test_renderer_renderer_metadata(self):
+        """Test renderer_metadata matches the renderer classes."""
+        for path, metadata in renderers_metadata.items():
+            path_name, class_name = path.rsplit('.', 1)
+            renderer_class = getattr(importlib.import_module(path_name),
+                                     class_name)
+            self.assertEqual(renderer_class.name, metadata['name'])
+            self.assertEqual(renderer_class.element_table_data,
+                             metadata['element_table_data'])
+
     def test_renderer_gdsrenderer_high_level(self):
         """Test that high level defaults were not accidentally changed in
         gds_renderer.py."""
@@ -585,12 +716,234 @@ class TestRenderers(unittest.TestCase):
             for y, _ in enumerate(expected[x][0]):
                 self.assertTrue(_ in actual[x][0])
 
+    def test_renderer_gdsrenderer_partition_by_layer(self):
+        """Test partition_by_layer in gds_renderer.py."""
+        design = designs.DesignPlanar()
+        TransmonPocket(design, 'Q1')
+        TransmonPocket(design, 'Q2', options=dict(pos_x='1mm', layer='2'))
+        tables = [
+            design.qgeometry.tables['poly'], design.qgeometry.tables['path']
+        ]
+
+        by_layer = QGDSRenderer._partition_by_layer(tables, [1, 2, 3])
+
+        self.assertEqual(sorted(by_layer), [1, 2, 3])
+        self.assertEqual(
+            len(by_layer[1]) + len(by_layer[2]),
+            sum(len(table) for table in tables))
+        self.assertEqual(len(by_layer[3]), 0)
+        self.assertTrue((by_layer[2]['layer'] == 2).all())
+        self.assertEqual(set(by_layer[2]['component']),
+                         {design.components['Q2'].id})
+        self.assertIn('index', by_layer[1].columns)
+
+    def test_renderer_gdsrenderer_qgeometry_table_to_gds(self):
+        """Test qgeometry_table_to_gds in gds_renderer.py gives the same
+        polygons as qgeometry_to_gds."""
+        design = designs.DesignPlanar()
+        TransmonPocket(design, 'Q1')
+        renderer = QGDSRenderer(design)
+        table = pd.concat(
+            [design.qgeometry.tables['poly'], design.qgeometry.tables['path']])
+        table.loc[table.index[0],
+                  'geometry'] = draw.Polygon([(0, 0), (1, 0), (1, 1), (0, 1)],
+                                             holes=[[(0.2, 0.2), (0.4, 0.2),
+                                                     (0.4, 0.4)]])
+        table['fillet'] = 0.01
+
+        def get_polygons(elements):
+            cell = gdspy.Cell('test', exclude_from_current=True)
+            cell.add(list(elements))
+            polygons = cell.get_polygons(by_spec=True)
+            return {
+                spec: sorted(np.round(points, 9).tolist() for points in value)
+                for spec, value in polygons.items()
+            }
+
+        expected = get_polygons(table.apply(renderer._qgeometry_to_gds, axis=1))
+        actual = get_polygons(renderer._qgeometry_table_to_gds(table))
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(renderer._qgeometry_table_to_gds(table.iloc[0:0]), [])
+
+    def test_renderer_gdsrenderer_export_cache(self):
+        """Test export_to_gds in gds_renderer.py only converts the changed
+        QComponents again, and gives the same ground as a new renderer."""
+        design = designs.DesignPlanar()
+        TransmonPocket(design, 'Q1')
+        TransmonPocket(design, 'Q2', options=dict(pos_x='1mm'))
+        renderer = QGDSRenderer(design)
+        q1_key = ('main', 1, 'true', design.components['Q1'].id)
+        q2_key = ('main', 1, 'true', design.components['Q2'].id)
+
+        with tempfile.TemporaryDirectory() as folder:
+            file_name = os.path.join(folder, 'test.gds')
+            renderer.export_to_gds(file_name)
+            q1_entry = renderer._gds_cache[q1_key]
+            q2_entry = renderer._gds_cache[q2_key]
+
+            design.components['Q2'].options.pos_y = '1mm'
+            design.rebuild()
+            renderer.export_to_gds(file_name)
+
+            a_renderer = QGDSRenderer(design)
+            a_renderer.export_to_gds(file_name)
+
+        self.assertIs(renderer._gds_cache[q1_key], q1_entry)
+        self.assertIsNot(renderer._gds_cache[q2_key], q2_entry)
+        self.assertIsNone(
+            gdspy.boolean(renderer.chip_info['main'][1]['mask_boolean'],
+                          a_renderer.chip_info['main'][1]['mask_boolean'],
+                          'xor'))
+
+    def test_renderer_gdsrenderer_hierarchical(self):
+        """Test export_to_gds in gds_renderer.py places the repeated
+        QComponents as references to one cell."""
+        design = designs.DesignPlanar()
+        TransmonPocket(design, 'Q1')
+        TransmonPocket(design,
+                       'Q2',
+                       options=dict(pos_x='2mm', pos_y='1mm', orientation='90'))
+        TransmonPocket(design, 'Q3', options=dict(pos_x='-2mm', pad_gap='40um'))
+        renderer = QGDSRenderer(design)
+        renderer.options.hierarchical = 'True'
+
+        with tempfile.TemporaryDirectory() as folder:
+            renderer.export_to_gds(os.path.join(folder, 'test.gds'))
+
+        groups = renderer.chip_info['main']['repeated_qcomponents']
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(
+            sorted(groups[0].placements),
+            sorted([design.components['Q1'].id, design.components['Q2'].id]))
+        self.assertEqual(groups[0].placements[design.components['Q2'].id],
+                         (2, 1, 90))
+
+        top_main_1 = renderer.lib.cells['TOP_main_1']
+        references = [
+            reference for reference in top_main_1.references
+            if reference.ref_cell.name == 'TransmonPocket_0_main_1'
+        ]
+        self.assertEqual(len(references), 2)
+        # Same area as the pads of Q2, placed without the reference.
+        cell_area = renderer.lib.cells['TransmonPocket_0_main_1'].area()
+        q2_elements = renderer._gds_cache[('main', 1, 'false',
+                                           design.components['Q2'].id)][2]
+        self.assertAlmostEqual(cell_area,
+                               sum(element.area() for element in q2_elements))
+
+    def test_renderer_gdsrenderer_streaming(self):
+        """Test export_to_gds in gds_renderer.py writes the same cells when
+        streaming."""
+        design = designs.DesignPlanar()
+        TransmonPocket(design, 'Q1')
+        TransmonPocket(design, 'Q2', options=dict(pos_x='1mm'))
+        renderer = QGDSRenderer(design)
+
+        with tempfile.TemporaryDirectory() as folder:
+            file_name = os.path.join(folder, 'test.gds')
+            renderer.export_to_gds(file_name)
+            expected = gdspy.GdsLibrary(infile=file_name)
+
+            renderer.options.streaming = 'True'
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                renderer.export_to_gds(file_name)
+            actual = gdspy.GdsLibrary(infile=file_name)
+
+        self.assertFalse(
+            [item for item in caught if 'GDSPY' in str(item.message)])
+        self.assertEqual(sorted(actual.cells), sorted(expected.cells))
+        self.assertEqual(list(renderer.lib.cells), ['TOP'])
+        # The gdspy elements of the chips are not kept
+        self.assertEqual(renderer._gds_cache, {})
+        self.assertEqual([cell.name for cell in actual.top_level()], ['TOP'])
+        for spec, area in expected.cells['TOP'].area(by_spec=True).items():
+            self.assertAlmostEqual(actual.cells['TOP'].area(by_spec=True)[spec],
+                                   area)
+
+    def test_renderer_gdsrenderer_map_booleans(self):
+        """Test map_booleans in gds_renderer.py gives the same result with
+        a process pool."""
+        design = designs.DesignPlanar()
+        renderer = QGDSRenderer(design)
+        all_arguments = [([gdspy.Rectangle(
+            (0, 0), (2, 2),
+            layer=layer)], [gdspy.Rectangle((1, 1), (3, 3),
+                                            layer=layer)], layer, 1e-9, 199)
+                         for layer in (1, 2, 3)]
+
+        renderer.options.num_workers = '1'
+        expected = renderer._map_booleans(gds_boolean_not, all_arguments)
+        renderer.options.num_workers = '2'
+        actual = renderer._map_booleans(gds_boolean_not, all_arguments)
+
+        self.assertEqual(len(actual), 3)
+        for layer, a_result, an_expected in zip((1, 2, 3), actual, expected):
+            self.assertEqual(a_result.layers, [layer])
+            self.assertAlmostEqual(a_result.area(), 3)
+            self.assertTrue(
+                np.array_equal(a_result.polygons[0], an_expected.polygons[0]))
+
+    def test_renderer_gds_cheese_booleans(self):
+        """Test cheese_booleans in make_cheese.py keeps the tiles away from
+        the keepout as arrays of holes."""
+        one_hole = gdspy.Rectangle((-0.5, -0.5), (0.5, 0.5), layer=1)
+        x_holes = list(np.arange(0, 10, 2.0))
+        y_holes = list(np.arange(0, 10, 2.0))
+        keepout = [gdspy.Rectangle((-1, -1), (3, 3), layer=1)]
+        ground = [gdspy.Rectangle((-1, -1), (9, 9), layer=1)]
+
+        diff_holes, hole_arrays, ground_cheese = cheese_booleans(
+            one_hole, x_holes, y_holes, 2, 2, keepout, ground, 1, 100, 199,
+            1e-9, 2)
+
+        # Tiles of 2 by 2 holes: only the tile at the origin is in the keepout
+        self.assertEqual(diff_holes, [])
+        self.assertEqual(len(hole_arrays), 8)
+        self.assertEqual(
+            sum(columns * rows for columns, rows, _ in hole_arrays), 21)
+        self.assertAlmostEqual(sum(a_poly.area() for a_poly in ground_cheese),
+                               100 - 21)
+
     def test_renderer_mpl_interaction_disconnect(self):
         """Test disconnect in MplInteraction in mpl_interaction.py."""
         mpl = MplInteraction(_plt)
         mpl.disconnect()
         self.assertEqual(mpl.figure, None)
 
+    def test_renderer_mpl_render_cache(self):
+        """Test render in mpl_renderer.py caches the geometry, and only
+        draws the components near the axes limits."""
+        design = designs.DesignPlanar()
+        TransmonPocket(design, 'Q1')
+        q_2 = TransmonPocket(design, 'Q2', options=dict(pos_x='3mm'))
+        renderer = QMplRenderer(None, design, design.logger)
+        axes = _plt.figure().add_subplot(111)
+
+        def num_patches():
+            return sum(
+                len(a_collection.get_paths())
+                for a_collection in axes.collections)
+
+        renderer.render(axes)
+        self.assertEqual(sorted(renderer._render_cache), [1, 2])
+        all_patches = num_patches()
+        self.assertGreater(all_patches, 0)
+
+        axes.set_xlim(-0.5, 0.5)
+        axes.set_ylim(-0.5, 0.5)
+        self.assertEqual(num_patches(), all_patches / 2)
+
+        revision = renderer._render_cache[2].revision
+        q_2.options.pos_x = '0.2mm'
+        q_2.rebuild()
+        axes.clear()
+        renderer.render(axes)
+        self.assertNotEqual(renderer._render_cache[2].revision, revision)
+        self.assertEqual(num_patches(), all_patches)
+        _plt.close(axes.figure)
+
     def test_renderer_gds_check_cheese(self):
         """Test check_cheese in gds_renderer.py."""
         design = designs.DesignPlanar()
@@ -198,6 +198,25 @@ class TestToolboxMetal(unittest.TestCase, AssertionsMixin):
         self.assertEqual(parsing._parse_string_to_float(12), 12)
         self.assertEqual(parsing._parse_string_to_float('12.2.3'), '12.2.3')
 
+    def test_toolbox_metal_parse_string_to_float_fast_path(self):
+        """Test the cached conversion of _parse_string_to_float gives the same
+        result as pint."""
+        for expr in [
+                '10um', '-1.5e-3 mm', '+.25 cm', '7 mm', '2*130um', '3 GHz',
+                '1e', '4 inch'
+        ]:
+            try:
+                expected = parsing.UREG.Quantity(expr).to('mm').magnitude
+            except Exception:  # pylint: disable=broad-except
+                expected = expr
+            result = parsing._parse_string_to_float(expr)
+            self.assertEqual(result, expected)
+            self.assertEqual(type(result), type(expected))
+            self.assertEqual(parsing._parse_string_to_float(expr), result)
+
+        self.assertEqual(parsing._parse_string_to_float('7mm'), 7)
+        self.assertIsInstance(parsing._parse_string_to_float('7mm'), int)
+
     def test_toolbox_metal_is_variable_name(self):
         """Test is_variable_name in toolbox_metal.py."""
         self.assertTrue(parsing.is_variable_name('ok'))
@@ -18,6 +18,8 @@
 """Qiskit Metal unit tests analyses functionality."""
 
 import unittest
+import numpy as np
+
 from qiskit_metal.toolbox_python.display import Headings
 from qiskit_metal.toolbox_python.display import Color
 from qiskit_metal.toolbox_python.display import MetalTutorialMagics
@@ -149,6 +151,43 @@ class TestToolboxPython(unittest.TestCase):
                                                     0.1)
         self.assertEqual(results, [1, 2])
 
+    def test_utility_bad_fillet_idxs_closed(self):
+        """Test bad_fillet_idxs in utility_functions.py for a polygon."""
+        results = utility_functions.bad_fillet_idxs([(0, 0), (1, 0), (1, 0.1),
+                                                     (0, 0.1)],
+                                                    0.1,
+                                                    isclosed=True)
+        self.assertEqual(results, [0, 1, 2, 3])
+        results = utility_functions.bad_fillet_idxs([(0, 0), (1, 0), (1, 1),
+                                                     (0, 1)],
+                                                    0.1,
+                                                    isclosed=True)
+        self.assertEqual(results, [])
+
+    def test_utility_fillet_coords(self):
+        """Test functionality of fillet_coords in utility_functions.py."""
+        # One right angle corner
+        results = utility_functions.fillet_coords([(0, 0), (1, 0), (1, 1)],
+                                                  0.25,
+                                                  points=5)
+        self.assertEqual(results.shape, (7, 2))
+        self.assertTrue(
+            np.allclose(results[[0, 1, -2, -1]], [(0, 0), (0.75, 0), (1, 0.25),
+                                                  (1, 1)]))
+        # All the arc is at the radius from the center of the fillet
+        self.assertTrue(
+            np.allclose(np.linalg.norm(results[1:-1] - (0.75, 0.25), axis=1),
+                        0.25))
+
+        # The short middle segment can't be filleted, nor the collinear vertex
+        results = utility_functions.fillet_coords([(0, 0), (1, 0), (1, 0.1),
+                                                   (2, 0.1), (3, 0.1)],
+                                                  0.25,
+                                                  points=5)
+        self.assertTrue(
+            np.array_equal(results, [(0, 0), (1, 0), (1, 0.1), (2, 0.1),
+                                     (3, 0.1)]))
+
     def test_utility_clean_name(self):
         """Test clean_name in utility_function.py."""
         self.assertEqual(
@@ -27,7 +27,6 @@ import inspect
 import platform
 import webbrowser
 import numpy
-import qutip
 
 from qiskit_metal.toolbox_python.display import Color, style_colon_list
 
@@ -47,6 +46,7 @@ def about():
         str: About message
     """
     import qiskit_metal
+    import qutip
     from PySide2.QtCore import __version__ as QT_VERSION_STR
     from PySide2 import __version__ as PYSIDE_VERSION_STR
 
@@ -15,71 +15,505 @@
 # pylint: disable=protected-access
 # pylint: disable-msg=relative-beyond-top-level
 # pylint: disable-msg=broad-except
-"""Saving and load metal data."""
+"""Saving and load metal data.
 
+Designs are saved to a versioned zip archive, which holds:
+
+* ``manifest.json``: the design variables, chips, metadata, net_info and
+  the class, options and pins of each component.
+* ``qgeometry/<table>.json``: one file per qgeometry table, with the
+  geometry stored as hex WKB.
+
+The manifest can be read on its own, with `read_metal_manifest`, to inspect
+the options of a design without loading it. When loading, the qgeometry can
+be decoded right away, decoded lazily when first used, or regenerated from
+the options.
+
+Designs saved as pickle, by earlier versions, can still be loaded.
+"""
+
+import importlib
+import json
 import pickle
-#from ..designs.base
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import shapely
+from geopandas import GeoDataFrame
+
+from .. import Dict, __version__
 from ..toolbox_python.utility_functions import log_error_easy
 
-__all__ = ['save_metal', 'load_metal_design']
+__all__ = ['save_metal', 'load_metal_design', 'read_metal_manifest']
 
+FORMAT_NAME = 'qiskit-metal-design'
+"""Name of the format, written in the manifest"""
 
-def save_metal(filename: str, design):
-    """Save metal0.
+FORMAT_VERSION = 1
+"""Version of the format, increased when the layout changes"""
+
+_MANIFEST = 'manifest.json'
+_TABLE_PATH = 'qgeometry/{}.json'
+_GEOMETRY_MODES = ('load', 'lazy', 'rebuild')
+
+######### JSON encoding ###################################################
+
+
+def _encode(value, name: str = 'value'):
+    """Convert a value to JSON compatible types.
+
+    Types that JSON does not have, such as tuples, numpy arrays and dicts
+    with non-string keys, are stored as a dict with a ``__type__`` key.
 
     Args:
-        filename (str): File path
-        design (QDesign): Design obejct Metal_Design_Base
+        value (Any): Value to encode
+        name (str): Name of the value, such as 'Q1.options', used in the
+            error message.  Defaults to 'value'.
 
     Returns:
-        bool: True is sucessful, False otherwise
+        Any: JSON compatible value
 
     Raises:
-        Exception: Save error
+        TypeError: The value, or an item of it, has a type which can not be
+            saved
     """
-    result = False
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, OrderedDict):
+        return dict(__type__='OrderedDict',
+                    items=[[_encode(k, name),
+                            _encode(v, f'{name}.{k}')]
+                           for k, v in value.items()])
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value) and '__type__' not in value:
+            return {k: _encode(v, f'{name}.{k}') for k, v in value.items()}
+        return dict(__type__='dict',
+                    items=[[_encode(k, name),
+                            _encode(v, f'{name}.{k}')]
+                           for k, v in value.items()])
+    if isinstance(value, list):
+        return [
+            _encode(item, f'{name}[{num}]') for num, item in enumerate(value)
+        ]
+    if isinstance(value, tuple):
+        return dict(__type__='tuple',
+                    items=[
+                        _encode(item, f'{name}[{num}]')
+                        for num, item in enumerate(value)
+                    ])
+    if isinstance(value, (set, frozenset)):
+        return dict(__type__='set',
+                    items=[_encode(item, name) for item in value])
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        return dict(__type__='ndarray',
+                    dtype=value.dtype.str,
+                    shape=list(value.shape),
+                    data=value.ravel().tolist())
+    if isinstance(value, shapely.geometry.base.BaseGeometry):
+        return dict(__type__='wkb', data=shapely.to_wkb(value, hex=True))
+    raise TypeError(f'Can not save {name}: values of type '
+                    f'{type(value).__name__} are not supported.')
 
-    # Do not pickle the following -- THis is issue with picking
-    self = design  # cludge for lazy tying
-    logger = self.logger
-    self.logger = None
 
-    # Pickle
-    # TODO: Right now just does pickle. Need to serialize object into JSON
-    # or similar. Then recreate components.
-    try:
-        pickle.dump(self, open(filename, "wb"))
+def _decode(value):
+    """Inverse of `_encode`.  JSON objects are returned as addict Dicts.
+
+    Args:
+        value (Any): Value read from JSON
+
+    Returns:
+        Any: Decoded value
+
+    Raises:
+        ValueError: Unknown encoded type
+    """
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    kind = value.get('__type__')
+    if kind is None:
+        return Dict({k: _decode(v) for k, v in value.items()})
+    if kind == 'OrderedDict':
+        return OrderedDict((_decode(k), _decode(v)) for k, v in value['items'])
+    if kind == 'dict':
+        return Dict((_decode(k), _decode(v)) for k, v in value['items'])
+    if kind == 'tuple':
+        return tuple(_decode(item) for item in value['items'])
+    if kind == 'set':
+        return set(_decode(item) for item in value['items'])
+    if kind == 'ndarray':
+        return np.array(value['data'],
+                        dtype=np.dtype(value['dtype'])).reshape(value['shape'])
+    if kind == 'wkb':
+        return shapely.from_wkb(value['data'])
+    raise ValueError(f'Unknown encoded type {kind}')
+
+
+def _table_to_json(table: GeoDataFrame) -> dict:
+    """Encode a qgeometry table, column by column.
+
+    Args:
+        table (GeoDataFrame): The table
+
+    Returns:
+        dict: With keys dtypes and columns.  The geometry column holds hex
+        WKB strings.
+    """
+    columns = dict()
+    for name in table.columns:
+        if name == 'geometry':
+            columns[name] = shapely.to_wkb(np.asarray(table.geometry,
+                                                      dtype=object),
+                                           hex=True).tolist()
+        elif table[name].dtype == object:
+            columns[name] = [
+                _encode(item, f'qgeometry column {name}')
+                for item in table[name]
+            ]
+        else:
+            columns[name] = table[name].tolist()
+    return dict(dtypes={name: str(table[name].dtype) for name in table.columns},
+                columns=columns)
+
+
+def _table_from_json(data: dict, empty_table: GeoDataFrame) -> GeoDataFrame:
+    """Decode a qgeometry table written by `_table_to_json`.
+
+    Args:
+        data (dict): The encoded table
+        empty_table (GeoDataFrame): Empty table of the design, which gives
+            the order of the columns
+
+    Returns:
+        GeoDataFrame: The table
+    """
+    columns = dict()
+    for name, values in data['columns'].items():
+        if name == 'geometry':
+            columns[name] = shapely.from_wkb(np.array(values, dtype=object))
+        elif data['dtypes'][name] == 'object':
+            columns[name] = [_decode(item) for item in values]
+        else:
+            columns[name] = values
+    table = pd.DataFrame(columns)
+
+    for name, dtype in data['dtypes'].items():
+        if name != 'geometry':
+            try:
+                table[name] = table[name].astype(dtype)
+            except (TypeError, ValueError):
+                pass
+
+    order = list(empty_table.columns)
+    order += [name for name in table.columns if name not in order]
+    return GeoDataFrame(table.reindex(columns=order), geometry='geometry')
+
+
+######### Saving ##########################################################
+
+
+def _get_design_manifest(design) -> dict:
+    """Collect everything but the qgeometry of the design, as JSON
+    compatible values.
+
+    Args:
+        design (QDesign): The design
+
+    Returns:
+        dict: The manifest
+    """
+    components = []
+    for component_id, component in design._components.items():
+        record = dict(id=component_id,
+                      name=component.name,
+                      class_name=component.class_name,
+                      options=_encode(component.options,
+                                      f'{component.name}.options'),
+                      status=component.status,
+                      made=component._made,
+                      pins=_encode(component.pins, f'{component.name}.pins'),
+                      metadata=_encode(component.metadata,
+                                       f'{component.name}.metadata'),
+                      qgeometry_table_usage=_encode(
+                          component.qgeometry_table_usage,
+                          f'{component.name}.qgeometry_table_usage'))
+        if hasattr(component, 'type'):
+            # Route type, passed to the init of QRoute
+            record['type'] = component.type
+        components.append(record)
+
+    return dict(
+        format=FORMAT_NAME,
+        version=FORMAT_VERSION,
+        qiskit_metal_version=__version__,
+        design=dict(class_name=f'{design.__class__.__module__}.'
+                    f'{design.__class__.__name__}',
+                    name=design.name,
+                    overwrite_enabled=design.overwrite_enabled,
+                    metadata=_encode(design._metadata, 'design.metadata'),
+                    variables=_encode(design._variables, 'design.variables'),
+                    chips=_encode(design._chips, 'design.chips'),
+                    latest_assigned_id=design._qcomponent_latest_assigned_id,
+                    latest_name_id=_encode(design._qcomponent_latest_name_id,
+                                           'design.latest_name_id'),
+                    dependencies={
+                        str(parent): sorted(children)
+                        for parent, children in design._dependencies.items()
+                    }),
+        net_info=dict(
+            latest_assigned_id=design._qnet.qnet_latest_assigned_id,
+            records=[[
+                int(net_id), int(component_id),
+                str(pin_name)
+            ] for net_id, component_id, pin_name in design.net_info.itertuples(
+                index=False)]),
+        components=components)
+
+
+def _save_archive(filename: str, design):
+    """Write the design to a zip archive, see the module documentation.
+
+    Args:
+        filename (str): File path
+        design (QDesign): The design
+    """
+    # Gather everything before opening the file, since the tables of a
+    # design loaded lazily may still be read from the same file.
+    manifest = _get_design_manifest(design)
+    tables = {
+        table_name: _table_to_json(table)
+        for table_name, table in design.qgeometry.tables.items()
+    }
+    manifest['qgeometry_tables'] = list(tables)
+
+    with zipfile.ZipFile(filename, 'w',
+                         compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(_MANIFEST, json.dumps(manifest, indent=1))
+        for table_name, table in tables.items():
+            archive.writestr(_TABLE_PATH.format(table_name), json.dumps(table))
+
 
+def save_metal(filename: str, design):
+    """Save metal0, as the zip archive described in the module
+    documentation.
+
+    Args:
+        filename (str): File path
+        design (QDesign): Design obejct Metal_Design_Base
+
+    Returns:
+        bool: True is sucessful, False otherwise
+    """
+    try:
+        _save_archive(filename, design)
         result = True
     except Exception as e:
         # handle errors here? such as PermissionError
         text = f'ERROR WHILE SAVING: {e}'
-        log_error_easy(logger, post_text=text)
-        # print(text)
-        # logger.error(text)
+        log_error_easy(design.logger, post_text=text)
         result = False
 
-    # restore -- also need to do in the load function
-    self.logger = logger
     return result
 
 
+######### Loading #########################################################
+
+
+def _import_class(class_name: str):
+    """Import a class from its full name.
+
+    Args:
+        class_name (str): Such as
+            'qiskit_metal.qlibrary.qubits.transmon_pocket.TransmonPocket'
+
+    Returns:
+        type: The class
+    """
+    module_path, _, name = class_name.rpartition('.')
+    return getattr(importlib.import_module(module_path), name)
+
+
+def read_metal_manifest(filename: str) -> Dict:
+    """Read the manifest of a saved design, without loading the design or
+    its qgeometry.  Use to inspect the options of the components.
+
+    Args:
+        filename (str): File path of a design saved as an archive
+
+    Returns:
+        Dict: With keys format, version, qiskit_metal_version, design,
+        net_info and components.  Each component has the keys id, name,
+        class_name, options, status, made, pins and metadata.
+    """
+    with zipfile.ZipFile(filename) as archive:
+        manifest = json.loads(archive.read(_MANIFEST))
+    if manifest.get('format') != FORMAT_NAME:
+        raise ValueError(f'{filename} is not a saved Metal design')
+
+    manifest = Dict(manifest)
+    manifest.design.update(
+        _decode({
+            key: manifest.design[key]
+            for key in ('metadata', 'variables', 'chips', 'latest_name_id')
+        }))
+    manifest.components = [
+        Dict(
+            component,
+            **_decode({
+                key: component[key] for key in ('options', 'pins', 'metadata',
+                                                'qgeometry_table_usage')
+            })) for component in manifest.components
+    ]
+    return manifest
+
+
+def _make_table_loader(filename: str, table_name: str,
+                       empty_table: GeoDataFrame):
+    """Return a function that reads a qgeometry table from the archive.
+
+    Args:
+        filename (str): File path of the archive
+        table_name (str): Element table name ('poly', 'path', etc.)
+        empty_table (GeoDataFrame): Empty table of the design
+
+    Returns:
+        Callable[[], GeoDataFrame]: The loader
+    """
+
+    def loader() -> GeoDataFrame:
+        with zipfile.ZipFile(filename) as archive:
+            data = json.loads(archive.read(_TABLE_PATH.format(table_name)))
+        return _table_from_json(data, empty_table)
+
+    return loader
+
+
+def _load_archive(filename: str, geometry: str):
+    """Recreate a design saved by `_save_archive`.
+
+    Args:
+        filename (str): File path
+        geometry (str): 'load', 'lazy' or 'rebuild', see `load_metal_design`
+
+    Returns:
+        QDesign: The design
+    """
+    # pylint: disable-msg=import-outside-toplevel
+    from .. import logger
+
+    manifest = read_metal_manifest(filename)
+    if manifest.version > FORMAT_VERSION:
+        logger.warning(
+            f'{filename} was saved in format version {manifest.version}, '
+            f'by qiskit-metal {manifest.qiskit_metal_version}. This version '
+            f'reads up to format version {FORMAT_VERSION}.')
+
+    info = manifest.design
+    design = _import_class(
+        info.class_name)(overwrite_enabled=info.overwrite_enabled)
+    design.name = info.name
+    design._metadata = info.metadata
+    design._variables = info.variables
+    design._chips = info.chips
+
+    # Recreate the components, in order of id, without making them.  The pins
+    # are restored unconnected, so that the pin_inputs of the later
+    # components pass the checks of their init.
+    for record in manifest.components:
+        kwargs = dict(make=False)
+        if 'type' in record:
+            kwargs['type'] = record.type
+        design._qcomponent_latest_assigned_id = record.id - 1
+        try:
+            component = _import_class(record.class_name)(design,
+                                                         record.name,
+                                                         options=record.options,
+                                                         **kwargs)
+        except Exception as error:
+            logger.error(f'Could not recreate component {record.name} of '
+                         f'class {record.class_name}: {error}')
+            continue
+        if component.id != record.id:
+            logger.error(f'Could not recreate component {record.name}: '
+                         f'{component._error_message}')
+            continue
+        component.options = record.options
+        component.metadata = record.metadata
+        component.qgeometry_table_usage = record.qgeometry_table_usage
+        component.pins = Dict(record.pins)
+        for pin in component.pins.values():
+            pin.net_id = 0
+        component._made = record.made
+        component.status = record.status
+
+    design._qcomponent_latest_assigned_id = info.latest_assigned_id
+    design._qcomponent_latest_name_id = info.latest_name_id
+    design._dependencies = Dict({
+        int(parent): set(children)
+        for parent, children in info.dependencies.items()
+    })
+
+    # Connect the pins
+    design._qnet._net_info = pd.DataFrame(manifest.net_info.records,
+                                          columns=design._qnet.column_names,
+                                          dtype=object)
+    design._qnet._qnet_latest_assigned_id = manifest.net_info.latest_assigned_id
+    for record in manifest.components:
+        component = design._components.get(record.id)
+        if component is not None:
+            for name, pin in record.pins.items():
+                component.pins[name].net_id = pin.net_id
+
+    if geometry == 'rebuild':
+        design.rebuild(force=True)
+    else:
+        for table_name in manifest.get('qgeometry_tables', []):
+            if table_name not in design.qgeometry._tables:
+                continue
+            loader = _make_table_loader(filename, table_name,
+                                        design.qgeometry._tables[table_name])
+            design.qgeometry.defer_table(table_name, loader)
+        if geometry == 'load':
+            _ = design.qgeometry.tables
+
+    return design
+
+
 # pylint: disable-msg=import-outside-toplevel
-def load_metal_design(filename: str):
+def load_metal_design(filename: str, geometry: str = 'load'):
     """Load metal design.
 
     Args:
         filename (str): File path
+        geometry (str): How to restore the qgeometry of a design saved as an
+            archive.  'load' decodes all the tables, 'lazy' decodes each table
+            only when it is first used, and 'rebuild' remakes the components
+            from their options instead.  Defaults to 'load'.  Ignored for
+            pickled designs.
 
     Returns:
-        picked QDesign: The pickled design object and updates if asked the param dicts for defaults
+        QDesign: The design.  For pickled designs, the pickled design object
+        and updates if asked the param dicts for defaults
     """
-    design = pickle.load(open(filename, "rb"))
-    design.save_path = str(
-        filename)  # Set the place from where we loaded the design
+    if geometry not in _GEOMETRY_MODES:
+        raise ValueError(f'Unknown geometry mode {geometry}, '
+                         f'expected one of {_GEOMETRY_MODES}')
 
-    # Restore
-    from .. import logger
-    design.logger = logger  #TODO: fix from save pikcle
+    if zipfile.is_zipfile(filename):
+        design = _load_archive(filename, geometry)
+    else:
+        design = pickle.load(open(filename, "rb"))
+
+        # Restore
+        from .. import logger
+        design.logger = logger  #TODO: fix from save pikcle
+
+    # Set the place from where we loaded the design
+    design.save_path = str(filename)
 
     return design
@@ -171,10 +171,12 @@ Returns:
 
 from collections.abc import Iterable
 from collections.abc import Mapping
+from functools import lru_cache
 from numbers import Number
 from typing import Union
 
 import ast
+import re
 import numpy as np
 import pint
 from pint import UnitRegistry
@@ -225,6 +227,64 @@ UREG = pint.UnitRegistry()
 units = config.DefaultMetalOptions.default_generic.units
 
 
+# Plain '<number><unit>' strings, such as '10um' or '-1.5e-3 mm'. These are
+# converted with a cached unit factor, rather than by the pint parser.
+_NUMBER_UNIT_RE = re.compile(
+    r'\s*([+-]?)(\d+|\d+\.\d*|\.\d+)([eE][+-]?\d+)?\s*([a-df-zA-DF-Z][a-zA-Z_]*)\s*'
+)
+
+
+@lru_cache(maxsize=None)
+def _get_unit_factor(unit: str, to_units: str):
+    """Factor to convert a value in unit to to_units.
+
+    Args:
+        unit (str): Units of the value, such as 'um'
+        to_units (str): Units to convert to, such as 'mm'
+
+    Returns:
+        float: Conversion factor, or None if unit can not be converted.
+    """
+    try:
+        return UREG.Quantity(1, unit).to(to_units).magnitude
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _convert_string_to_float(expr: str, to_units: str):
+    """Cached conversion used by _parse_string_to_float.
+
+    Args:
+        expr (str): String expression such as '1nm'.
+        to_units (str): Units to convert the value to, such as 'mm'.
+
+    Returns:
+        float: Converted value, such as float(1e-6)
+    """
+    match = _NUMBER_UNIT_RE.fullmatch(expr) if isinstance(expr, str) else None
+    if match:
+        sign, number, exponent, unit = match.groups()
+        factor = _get_unit_factor(unit, to_units)
+        if factor is not None:
+            # Same type and value pint gives: int for integers, else float.
+            if exponent or '.' in number:
+                value = float(sign + number + (exponent or ''))
+            else:
+                value = int(sign + number)
+            return value * factor
+
+    try:
+        return UREG.Quantity(expr).to(to_units).magnitude
+
+    except Exception:
+        # DimensionalityError, UndefinedUnitError, TypeError
+        try:
+            return float(expr)
+        except Exception:
+            return expr
+
+
 def _parse_string_to_float(expr: str):
     """Extract the value of a string.
 
@@ -251,14 +311,10 @@ def _parse_string_to_float(expr: str):
         Exception: Errors in parsing
     """
     try:
-        return UREG.Quantity(expr).to(units).magnitude
-
-    except Exception:
-        # DimensionalityError, UndefinedUnitError, TypeError
-        try:
-            return float(expr)
-        except Exception:
-            return expr
+        return _convert_string_to_float(expr, units)
+    except TypeError:
+        # Unhashable, can not be cached
+        return _convert_string_to_float.__wrapped__(expr, units)
 
 
 #########################################################################
@@ -19,10 +19,12 @@ import re
 import sys
 import traceback
 import warnings
+from collections.abc import Mapping
 from copy import deepcopy
 from typing import Dict, List, TYPE_CHECKING, Tuple, Callable, Union
 import inspect
 
+import numpy as np
 import pandas as pd
 
 from qiskit_metal.draw import Vector
@@ -32,11 +34,12 @@ if TYPE_CHECKING:
     from qiskit_metal import logger
 
 __all__ = [
-    'copy_update', 'dict_start_with', 'data_frame_empty_typed', 'clean_name',
-    'enable_warning_traceback', 'get_traceback', 'print_traceback_easy',
-    'log_error_easy', 'monkey_patch', 'can_write_to_path',
-    'can_write_to_path_with_warning', 'toggle_numbers', 'bad_fillet_idxs',
-    'compress_vertex_list', 'get_range_of_vertex_to_not_fillet'
+    'copy_update', 'dict_start_with', 'data_frame_empty_typed', 'to_hashable',
+    'clean_name', 'enable_warning_traceback', 'get_traceback',
+    'print_traceback_easy', 'log_error_easy', 'monkey_patch',
+    'can_write_to_path', 'can_write_to_path_with_warning', 'toggle_numbers',
+    'bad_fillet_idxs', 'fillet_coords', 'compress_vertex_list',
+    'get_range_of_vertex_to_not_fillet'
 ]
 
 ####################################################################################
@@ -135,6 +138,35 @@ def data_frame_empty_typed(column_types: dict):
     return df
 
 
+def to_hashable(value):
+    """Convert a nested structure, such as parsed options, into a hashable
+    value that compares equal exactly when the contents are equal.
+
+    Mappings become tuples of (key, value) pairs sorted by key; lists, tuples
+    and numpy arrays become tuples. Other unhashable values are replaced
+    by their repr.
+
+    Args:
+        value (object): Value to convert
+
+    Returns:
+        object: Hashable version of value
+    """
+    if isinstance(value, Mapping):
+        return tuple(
+            sorted(((str(k), to_hashable(v)) for k, v in value.items()),
+                   key=lambda item: item[0]))
+    if isinstance(value, np.ndarray):
+        return (value.shape, tuple(value.ravel().tolist()))
+    if isinstance(value, (list, tuple)):
+        return tuple(to_hashable(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
 def clean_name(text: str):
     """Clean a string to a proper variable name in python.
 
@@ -359,6 +391,8 @@ def bad_fillet_idxs(coords: list,
     Get list of vertex indices in a linestring (isclosed = False) or polygon (isclosed = True) that cannot be filleted based on
     proximity to neighbors. By default, this list excludes the first and last vertices if the shape is a linestring.
 
+    The length of every segment is computed at once with numpy.
+
     Args:
         coords (list): Ordered list of tuples of vertex coordinates.
         fradius (float): User-specified fillet radius from QGeometry table.
@@ -368,35 +402,116 @@ def bad_fillet_idxs(coords: list,
     Returns:
         list: List of indices of vertices too close to their neighbors to be filleted.
     """
+    coords = np.asarray(coords, dtype=float)
     length = len(coords)
-    get_dist = Vector.get_distance
     if isclosed:
-        return [
-            i for i in range(length)
-            if min(get_dist(coords[i - 1], coords[i], precision),
-                   get_dist(coords[i], coords[(i + 1) %
-                                              length], precision)) < 2 * fradius
-        ]
+        if length == 0:
+            return []
+        # seg_lengths[i] is the length of the segment from vertex i to i+1
+        seg_lengths = np.round(
+            np.linalg.norm(np.roll(coords, -1, axis=0) - coords, axis=1),
+            int(precision))
+        is_bad = np.minimum(np.roll(seg_lengths, 1), seg_lengths) < 2 * fradius
+        return np.flatnonzero(is_bad).tolist()
     if length < 3:
         return []
-    if length == 3:
-        return [] if min(get_dist(coords[0], coords[1], precision),
-                         get_dist(coords[1], coords[2],
-                                  precision)) >= fradius else [1]
-    if (get_dist(coords[0], coords[1], precision) < fradius) or (get_dist(
-            coords[1], coords[2], precision) < 2 * fradius):
-        badlist = [1]
-    else:
-        badlist = []
-    for i in range(2, length - 2):
-        if min(get_dist(coords[i - 1], coords[i], precision),
-               get_dist(coords[i], coords[i + 1], precision)) < 2 * fradius:
-            badlist.append(i)
-    if (get_dist(coords[length - 3], coords[length - 2], precision)
-            < 2 * fradius) or (get_dist(coords[length - 2], coords[length - 1],
-                                        precision) < fradius):
-        badlist.append(length - 2)
-    return badlist
+    seg_lengths = np.round(np.linalg.norm(np.diff(coords, axis=0), axis=1),
+                           int(precision))
+    # The first and last segments only need room for one fillet.
+    min_lengths = np.full(length - 1, 2 * fradius)
+    min_lengths[[0, -1]] = fradius
+    is_short = seg_lengths < min_lengths
+    # Vertex i, excluding the endpoints, is between segments i-1 and i
+    is_bad = is_short[:-1] | is_short[1:]
+    return (np.flatnonzero(is_bad) + 1).tolist()
+
+
+def _unit_vectors(theta: np.ndarray) -> np.ndarray:
+    """Unit vectors at the given angles, stacked on a new last axis."""
+    return np.stack((np.cos(theta), np.sin(theta)), axis=-1)
+
+
+def fillet_coords(coords: list,
+                  fradius: float,
+                  points: int = 16,
+                  precision: int = 9) -> np.ndarray:
+    """Fillet the corners of a linestring with arcs of the given radius.
+
+    All the corners are filleted at once with numpy.  A corner is left as is
+    when its vertex is too close to its neighbors, see bad_fillet_idxs, when
+    the segments are collinear, or when the arc does not fit in the corner.
+
+    Args:
+        coords (list): Ordered list of tuples of vertex coordinates, or an
+                       (N, 2) array.
+        fradius (float): Fillet radius.
+        points (int, optional): Number of points of each arc.  Defaults to 16.
+        precision (int, optional): Digits of precision used for round().
+                                   Defaults to 9.
+
+    Returns:
+        np.ndarray: (M, 2) coordinates of the filleted linestring.
+    """
+    coords = np.asarray(coords, dtype=float)[:, :2]
+    length = len(coords)
+    if length <= 2:
+        return coords
+
+    corners = np.ones(length, dtype=bool)
+    corners[[0, -1]] = False
+    corners[bad_fillet_idxs(coords, fradius, precision)] = False
+    idx = np.flatnonzero(corners)
+
+    # Vectors pointing from corner to start and end vertices, respectively
+    sc_vec = coords[idx - 1] - coords[idx]
+    ec_vec = coords[idx + 1] - coords[idx]
+    sc_norm = np.linalg.norm(sc_vec, axis=1)
+    ec_norm = np.linalg.norm(ec_vec, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sc_uvec = sc_vec / sc_norm[:, None]
+        ec_uvec = ec_vec / ec_norm[:, None]
+
+        # Angle between the segments. Start, corner, and end vertices must be
+        # distinct, and can't be collinear.
+        end_angle = np.arccos(
+            np.clip(np.sum(sc_uvec * ec_uvec, axis=1), -1., 1.))
+        net_vec = sc_uvec + ec_uvec
+        net_norm = np.linalg.norm(net_vec, axis=1)
+        keep = ((sc_norm > 0) & (ec_norm > 0) & (net_norm > 0) &
+                (end_angle != 0) & (end_angle != np.pi))
+        # Fillet circle must be small enough to fit inside corner
+        keep[keep] = fradius / np.tan(end_angle[keep] / 2) <= np.minimum(
+            sc_norm[keep], ec_norm[keep])
+    idx, end_angle = idx[keep], end_angle[keep]
+
+    # Center of the fillet circle, along the bisector of the corner
+    net_uvec = net_vec[keep] / net_norm[keep][:, None]
+    circle_center = coords[idx] + net_uvec * (fradius /
+                                              np.sin(end_angle / 2))[:, None]
+
+    # Sweep symmetrically around the angle from the center to the corner,
+    # starting from the end of the arc closest to the start vertex
+    delta = coords[idx] - circle_center
+    theta_mid = np.arctan2(delta[:, 1], delta[:, 0])
+    half_sweep = (np.pi - end_angle) / 2
+    to_start = coords[idx - 1] - circle_center
+    first_closer = (np.sum(
+        to_start * _unit_vectors(theta_mid - half_sweep), axis=1) >= np.sum(
+            to_start * _unit_vectors(theta_mid + half_sweep), axis=1))
+    theta_start = np.where(first_closer, theta_mid - half_sweep,
+                           theta_mid + half_sweep)
+    sweep = np.where(first_closer, 2 * half_sweep, -2 * half_sweep)
+    theta = theta_start[:, None] + sweep[:, None] * np.linspace(0, 1, points)
+    arcs = circle_center[:, None, :] + fradius * _unit_vectors(theta)
+
+    # Each filleted corner is replaced by the points of its arc
+    counts = np.ones(length, dtype=int)
+    counts[idx] = points
+    filleted = np.repeat(coords, counts, axis=0)
+    offsets = np.cumsum(counts) - counts
+    filleted[(offsets[idx][:, None] +
+              np.arange(points)).ravel()] = arcs.reshape(-1, 2)
+    return filleted
 
 
 def good_fillet_idxs(coords: list,